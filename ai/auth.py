@@ -0,0 +1,24 @@
+"""
+API key check for admin endpoints
+
+Admin endpoints (snapshot import/export, bulk imports) require the
+X-API-Key header to match ADMIN_API_KEY. They are disabled when
+ADMIN_API_KEY is not set.
+"""
+
+import os
+import hmac
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+ADMIN_API_KEY = os.getenv("ADMIN_API_KEY")
+
+
+def require_admin_key(x_api_key: Optional[str] = Header(None)):
+    """FastAPI dependency rejecting requests without the admin API key"""
+    if not ADMIN_API_KEY:
+        raise HTTPException(status_code=503, detail="Admin API key not configured")
+    # Constant-time comparison so the key cannot be guessed from response timing
+    if x_api_key is None or not hmac.compare_digest(x_api_key.encode(), ADMIN_API_KEY.encode()):
+        raise HTTPException(status_code=401, detail="Invalid API key")
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Scale benchmark for the database layer of the generator and resolver
+
+Fills the database at DATABASE_URL (or --database-url) with synthetic but
+realistic markets and resolutions, then times the read paths through the
+real FastAPI apps (listings, pages deep into a cursor, details, outcomes,
+search), the resolver's due-market selection, serialization and the
+archive jobs, and records the query plan of each hot query. The report is
+JSON (benchmark-report.json by default), so runs at different scales or
+commits can be compared by a script.
+
+Usage:
+    python benchmark.py --rows 100000
+    python benchmark.py --rows 1000000 --database-url postgresql://localhost/pmw_bench --output pg.json
+
+The archive jobs modify the data, so they run last (skip them with
+--skip-archive). Refuses to write into a database that already has
+markets unless --reset (delete all markets and resolutions first) or
+--skip-generate (benchmark the existing data) is given.
+"""
+
+import os
+import sys
+import re
+import json
+import time
+import random
+import logging
+import argparse
+import statistics
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+GENERATE_BATCH_SIZE = 10000
+
+SUBJECTS = [
+    "Bitcoin", "Ethereum", "Flare", "Solana", "gold", "the S&P 500", "the Federal Reserve",
+    "SpaceX", "Apple", "Nvidia", "OpenAI", "US inflation", "the Lakers", "Real Madrid",
+    "the ECB", "Tesla", "oil prices", "the UK election", "Nintendo", "the World Cup",
+]
+TEMPLATES = [
+    "Will {subject} reach a new all-time high before {date}?",
+    "Will {subject} announce a major partnership by {date}?",
+    "Will {subject} be in the headlines for a price drop of 10% before {date}?",
+    "Will {subject} beat analyst expectations by {date}?",
+    "Will {subject} make an official statement about regulation before {date}?",
+]
+STATUS_WEIGHTS = {"active": 0.6, "expired": 0.25, "resolved": 0.15}
+
+
+def synthetic_rows(count: int, seed: int = 42) -> Iterator[Dict[str, List[Dict[str, Any]]]]:
+    """Batches of {"markets": rows, "resolutions": rows} with realistic spreads
+
+    Close times range from a year ago to three months ahead; resolved
+    markets and half of the expired ones have a resolution.
+    """
+    # Imported here so DATABASE_URL can be set first
+    from database import Market, Resolution, with_derived_columns
+
+    rng = random.Random(seed)
+    now = datetime.now()
+    statuses, weights = zip(*STATUS_WEIGHTS.items())
+
+    for start in range(0, count, GENERATE_BATCH_SIZE):
+        markets, resolutions = [], []
+        for i in range(start, min(start + GENERATE_BATCH_SIZE, count)):
+            market_id = f"bench-{i:08d}"
+            status = rng.choices(statuses, weights)[0]
+            if status == "active":
+                close_time = now + timedelta(days=rng.uniform(0, 90))
+            else:
+                close_time = now - timedelta(days=rng.uniform(0, 365))
+            created_time = close_time - timedelta(days=rng.uniform(1, 120))
+            subject = rng.choice(SUBJECTS)
+            title = rng.choice(TEMPLATES).format(subject=subject, date=close_time.strftime("%B %d, %Y"))
+            yes_probability = round(rng.uniform(0.05, 0.95), 2)
+            confidence = round(rng.uniform(0.3, 1.0), 2)
+            outcome = rng.choice(["YES", "NO"]) if status == "resolved" else None
+            resolved_time = close_time + timedelta(hours=rng.uniform(1, 72)) if status == "resolved" else None
+
+            markets.append(with_derived_columns(Market, {
+                "id": market_id,
+                "title": title,
+                "description": f"Resolves YES if {subject} meets the condition in the title, according to major news sources.",
+                "prompt": title,
+                "close_time_iso": close_time.isoformat(),
+                "outcomes": ["YES", "NO"],
+                "initial_prob": yes_probability,
+                "validation": {
+                    "is_valid": True,
+                    "confidence": confidence,
+                    "reasoning": f"Clear, verifiable question about {subject}.",
+                    "yes_probability": yes_probability,
+                    "no_probability": round(1 - yes_probability, 2),
+                    "reliable_sources": ["reuters.com", "bloomberg.com"],
+                    "resolution_date": close_time.date().isoformat(),
+                    "auto_expire": rng.random() < 0.3,
+                },
+                "created_at": created_time.isoformat(),
+                "status": status,
+                "outcome": outcome,
+                "resolved_at": resolved_time.isoformat() if resolved_time else None,
+                "resolution_confidence": round(rng.uniform(0.7, 1.0), 2) if outcome else None,
+            }))
+
+            if status == "resolved" or (status == "expired" and rng.random() < 0.5):
+                resolution_time = resolved_time or close_time + timedelta(days=rng.uniform(0, 7))
+                resolutions.append(with_derived_columns(Resolution, {
+                    "id": market_id,
+                    "market_id": market_id,
+                    "outcome": outcome or "NO",
+                    "confidence": round(rng.uniform(0.7, 1.0), 2),
+                    "reasoning": "Synthetic resolution",
+                    "evidence_sources": ["https://example.com/evidence"],
+                    "resolved_at": resolution_time.isoformat(),
+                    "auto_expired": outcome is None,
+                }))
+        yield {"markets": markets, "resolutions": resolutions}
+
+
+def generate_dataset(rows: int, seed: int) -> Dict[str, Any]:
+    """Insert the synthetic dataset with batched executemany inserts"""
+    from database import engine, Market, Resolution
+
+    counts = {"markets": 0, "resolutions": 0}
+    start = time.perf_counter()
+    for batch in synthetic_rows(rows, seed):
+        with engine.begin() as conn:
+            conn.execute(Market.__table__.insert(), batch["markets"])
+            if batch["resolutions"]:
+                conn.execute(Resolution.__table__.insert(), batch["resolutions"])
+        counts["markets"] += len(batch["markets"])
+        counts["resolutions"] += len(batch["resolutions"])
+        logger.info(f"Generated {counts['markets']}/{rows} markets")
+    return {**counts, "seconds": round(time.perf_counter() - start, 3)}
+
+
+def measure(fn: Callable[[], Any], runs: int) -> Dict[str, Any]:
+    """Wall-clock statistics of fn over several runs, in milliseconds"""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return {
+        "runs": runs,
+        "min_ms": round(times[0], 3),
+        "median_ms": round(statistics.median(times), 3),
+        "p95_ms": round(times[min(len(times) - 1, int(len(times) * 0.95))], 3),
+        "max_ms": round(times[-1], 3),
+    }
+
+
+def measure_once(fn: Callable[[], Any]) -> Dict[str, Any]:
+    """Duration and result of a single run of fn (for jobs that modify data)"""
+    start = time.perf_counter()
+    result = fn()
+    return {"ms": round((time.perf_counter() - start) * 1000, 3), "result": result}
+
+
+# Hot tables whose full scans are regressions; the archives are only read
+# through their own indexes, and a plain scan of a subquery is fine
+HOT_TABLES = ("markets", "resolutions")
+
+
+def plan_full_scan(dialect: str, plan: List[str]) -> bool:
+    """Whether a query plan walks a whole hot table or one of its indexes
+
+    In SQLite plans a SCAN of a table is a full pass even when it goes
+    through an index (SCAN markets USING INDEX ...); only SEARCH lines are
+    bounded index lookups or ranges.
+    """
+    tables = "|".join(HOT_TABLES)
+    if dialect == "sqlite":
+        pattern = rf"\bSCAN ({tables})(?!\w)"
+    else:
+        pattern = rf"Seq Scan on ({tables})(?!\w)"
+    return any(re.search(pattern, line) for line in plan)
+
+
+def query_plan(statement) -> Dict[str, Any]:
+    """The database's plan for a select, and whether it fully scans a hot table"""
+    from sqlalchemy.ext.compiler import compiles
+    from sqlalchemy.sql.expression import ClauseElement, Executable
+    from database import engine
+
+    class Explain(Executable, ClauseElement):
+        inherit_cache = False
+
+        def __init__(self, statement):
+            self.statement = statement
+
+    @compiles(Explain)
+    def compile_explain(element, compiler, **kw):
+        prefix = "EXPLAIN QUERY PLAN " if compiler.dialect.name == "sqlite" else "EXPLAIN "
+        return prefix + compiler.process(element.statement, **kw)
+
+    with engine.connect() as conn:
+        rows = conn.execute(Explain(statement)).all()
+    plan = [str(row[-1]) for row in rows]
+    full_scan = plan_full_scan(engine.dialect.name, plan)
+    return {"plan": plan, "full_scan": full_scan}
+
+
+def run_benchmark(args) -> Dict[str, Any]:
+    """Generate the dataset (unless skipped) and time every path"""
+    # Imported here so DATABASE_URL can be set first
+    import orjson
+    from fastapi.testclient import TestClient
+    from sqlalchemy import select, delete, func
+    from database import engine, init_db, SessionLocal, Market, MarketArchive, Resolution, ResolutionArchive
+    from response_cache import response_cache
+    from search import market_search_statement
+    from pagination import encode_cursor
+    from generator import server as generator
+    from resolver import server as resolver
+
+    init_db()
+    report: Dict[str, Any] = {
+        "database": engine.dialect.name,
+        "rows": args.rows,
+        "started_at": datetime.now().isoformat(),
+    }
+
+    with SessionLocal() as db:
+        existing = db.scalar(select(func.count()).select_from(Market))
+    if not args.skip_generate:
+        if existing and not args.reset:
+            raise SystemExit(f"Database already has {existing} markets; use --reset or --skip-generate")
+        if args.reset:
+            with engine.begin() as conn:
+                for model in (ResolutionArchive, Resolution, MarketArchive, Market):
+                    conn.execute(delete(model))
+        report["generate"] = generate_dataset(args.rows, args.seed)
+
+    with SessionLocal() as db:
+        report["table_rows"] = {
+            model.__tablename__: db.scalar(select(func.count()).select_from(model))
+            for model in (Market, MarketArchive, Resolution, ResolutionArchive)
+        }
+        market_ids = db.scalars(select(Market.id).order_by(func.random()).limit(1000)).all()
+        resolution_ids = db.scalars(select(Resolution.id).order_by(func.random()).limit(1000)).all()
+    rng = random.Random(args.seed)
+
+    generator_client = TestClient(generator.app)
+    resolver_client = TestClient(resolver.app)
+
+    def get(client, path, **params):
+        response = client.get(path, params=params)
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {path} returned {response.status_code}: {response.text[:200]}")
+        return response
+
+    def uncached(fn):
+        # Measure the database and serialization path, not the response cache
+        def run():
+            response_cache.clear()
+            resolver.final_outcomes.clear()
+            return fn()
+        return run
+
+    def deep_page(client, path, pages):
+        def run():
+            cursor = None
+            for _ in range(pages):
+                data = get(client, path, limit=100, **({"cursor": cursor} if cursor else {})).json()
+                cursor = data["next_cursor"]
+                if not cursor:
+                    break
+        return run
+
+    reads = {
+        "markets_page": lambda: get(generator_client, "/markets", limit=100),
+        "markets_page_summary": lambda: get(generator_client, "/markets", limit=100, view="summary"),
+        "markets_10_pages": deep_page(generator_client, "/markets", 10),
+        "markets_active_page": lambda: get(generator_client, "/markets/active", limit=100),
+        "markets_archived_page": lambda: get(generator_client, "/markets/archived", limit=100),
+        "markets_search": lambda: get(generator_client, "/markets/search", q=rng.choice(SUBJECTS), limit=20),
+        "market_detail": lambda: get(generator_client, f"/markets/{rng.choice(market_ids)}"),
+        "market_outcome": lambda: get(generator_client, f"/markets/{rng.choice(market_ids)}/outcome"),
+        "resolutions_page": lambda: get(resolver_client, "/resolutions", limit=100),
+        "resolutions_active_page": lambda: get(resolver_client, "/resolutions/active", limit=100),
+        "resolution_detail": lambda: get(resolver_client, f"/resolutions/{rng.choice(resolution_ids)}"),
+        "resolution_outcome": lambda: get(resolver_client, f"/resolutions/{rng.choice(resolution_ids)}/outcome"),
+    }
+    report["reads"] = {name: measure(uncached(fn), args.runs) for name, fn in reads.items()}
+
+    cached_path = f"/resolutions/{resolution_ids[0]}/outcome" if resolution_ids else "/resolutions"
+    get(generator_client, "/markets", limit=100)
+    get(resolver_client, cached_path)
+    report["cached_reads"] = {
+        "markets_page": measure(lambda: get(generator_client, "/markets", limit=100), args.runs),
+        "resolution_outcome": measure(lambda: get(resolver_client, cached_path), args.runs),
+    }
+
+    with SessionLocal() as db:
+        rows = db.execute(select(*Market.__table__.columns).limit(1000)).all()
+        report["serialization"] = {
+            "serialize_1000_markets": measure(
+                lambda: orjson.dumps([generator.serialize_market(row) for row in rows]), args.runs
+            ),
+        }
+        source = resolver.DatabaseMarketSource()
+        report["resolve_all_selection"] = measure_once(lambda: len(source.load_due_markets(db)))
+
+        # Plan pages behind a cursor from the middle of each table, as pollers
+        # and deep pagination run them. A first page has no lower bound, so
+        # its LIMIT-bounded walk of the sort index would read as a SCAN.
+        def middle_cursor(model, sort_column):
+            count = db.scalar(select(func.count()).select_from(model))
+            row = db.execute(
+                select(sort_column, model.id).order_by(sort_column, model.id).offset(count // 2).limit(1)
+            ).first()
+            return encode_cursor(*row) if row else None
+
+        market_cursor = middle_cursor(Market, Market.created_time)
+        resolution_cursor = middle_cursor(Resolution, Resolution.resolved_time)
+        archive_cutoff = datetime.now()
+        report["plans"] = {
+            "due_markets": query_plan(source.due_markets_statement()),
+            "markets_active_page": query_plan(generator.market_page_statement(
+                generator.market_select(None).where(Market.status == "active"), market_cursor, 100
+            )),
+            "markets_page": query_plan(generator.all_markets_page_statement(None, market_cursor, 100)),
+            "archive_expired_scan": query_plan(
+                select(Market.id)
+                .where((Market.status == "active") & (Market.close_time <= archive_cutoff))
+                .limit(generator.MAINTENANCE_BATCH_SIZE)
+            ),
+            "resolutions_page": query_plan(resolver.all_resolutions_page_statement(resolution_cursor, 100)),
+            "markets_search": query_plan(market_search_statement(db, SUBJECTS[0])),
+        }
+
+    if not args.skip_archive:
+        with SessionLocal() as db:
+            report["archive"] = {
+                "archive_expired_markets": measure_once(lambda: generator.archive_expired_markets(db)),
+                "move_markets_to_archive": measure_once(lambda: generator.move_markets_to_archive(db)),
+                "archive_old_resolutions": measure_once(lambda: resolver.archive_old_resolutions_db(db, 30)),
+                "move_resolutions_to_archive": measure_once(lambda: resolver.move_resolutions_to_archive(db)),
+            }
+        report["archived_reads"] = {
+            "markets_archived_page": measure(uncached(reads["markets_archived_page"]), args.runs),
+            "market_detail": measure(uncached(reads["market_detail"]), args.runs),
+        }
+
+    report["finished_at"] = datetime.now().isoformat()
+    return report
+
+
+def main():
+    """Run the benchmark and write the JSON report"""
+    parser = argparse.ArgumentParser(description="Benchmark the market database layer at scale")
+    parser.add_argument("--rows", type=int, default=10000, help="Synthetic markets to generate (e.g. 10000, 100000, 1000000)")
+    parser.add_argument("--database-url", help="Database to benchmark (defaults to DATABASE_URL)")
+    parser.add_argument("--runs", type=int, default=20, help="Timed runs per read path")
+    parser.add_argument("--seed", type=int, default=42)
+    # Not stdout: the services log there
+    parser.add_argument("--output", default="benchmark-report.json", help="Where to write the JSON report")
+    parser.add_argument("--reset", action="store_true", help="Delete existing markets and resolutions first")
+    parser.add_argument("--skip-generate", action="store_true", help="Benchmark the data already in the database")
+    parser.add_argument("--skip-archive", action="store_true", help="Do not run the archive jobs (they modify data)")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    report = run_benchmark(args)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Benchmark report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Python port of the ProveMeWrong bonding curve
+
+Mirrors `mint` and `_updatePricesWithBondingCurve` from
+contracts/contracts/ProveMeWrong.sol using the same uint256 integer
+arithmetic, so quotes match what the contract would do for the same state.
+"""
+
+from decimal import Decimal
+from typing import NamedTuple, Union, Sequence
+import numpy as np
+
+# Contract constants (ProveMeWrong.sol)
+PRICE_SCALE = 10**18
+CURVE_FACTOR = 10**15  # 0.1% curve steepness
+FEE_PERCENTAGE = 10**15  # 0.1% fee (1e15 = 0.1% of 1e18)
+
+
+class MarketState(NamedTuple):
+    """On-chain pricing state of a market (all values in wei)"""
+    yes_price: int
+    no_price: int
+    yes_supply: int = 0
+    no_supply: int = 0
+
+
+class MintQuote(NamedTuple):
+    """Result of minting `amount` against a MarketState"""
+    amount: int
+    fee: int
+    bet_amount: int
+    tokens: int
+    state: MarketState  # state after the mint
+
+
+def probabilities_to_prices(yes_probability: float, no_probability: float) -> MarketState:
+    """Convert AI probabilities to the prices passed to createMarket
+
+    Scaled to wei through Decimal and normalized with integer division, so
+    the prices are exact (0.45 becomes 450000000000000000, not a float
+    rounding of it) and always sum to PRICE_SCALE.
+    """
+    yes_price = int(Decimal(str(yes_probability)) * PRICE_SCALE)
+    no_price = int(Decimal(str(no_probability)) * PRICE_SCALE)
+
+    total_price = yes_price + no_price
+    if total_price != PRICE_SCALE:
+        yes_price = (yes_price * PRICE_SCALE) // total_price
+        no_price = PRICE_SCALE - yes_price
+
+    return MarketState(yes_price=yes_price, no_price=no_price)
+
+
+def adjustment_factor(total_supply: int) -> int:
+    """Price adjustment rate for the given total token supply"""
+    if total_supply > PRICE_SCALE:
+        # Decrease adjustment rate as supply increases
+        return (CURVE_FACTOR * PRICE_SCALE) // (PRICE_SCALE + (total_supply - PRICE_SCALE) // 10)
+    return CURVE_FACTOR
+
+
+def quote_mint(state: MarketState, amount: int, outcome: bool) -> MintQuote:
+    """Quote a single mint exactly as ProveMeWrong.mint would execute it"""
+    if amount <= 0:
+        raise ValueError("Amount must be greater than 0")
+
+    yes_price, no_price, yes_supply, no_supply = state
+    if (yes_price if outcome else no_price) <= 0:
+        # The contract reverts with a division by zero
+        raise ValueError("Outcome price must be greater than 0")
+
+    # Calculate fee (0.1% of the bet amount)
+    fee = (amount * FEE_PERCENTAGE) // PRICE_SCALE
+    bet_amount = amount - fee
+
+    # Tokens are priced before the curve moves; supply is read after minting
+    if outcome:
+        tokens = (bet_amount * PRICE_SCALE) // yes_price
+        yes_supply += tokens
+    else:
+        tokens = (bet_amount * PRICE_SCALE) // no_price
+        no_supply += tokens
+
+    factor = adjustment_factor(yes_supply + no_supply)
+    yes_delta = (factor * yes_price) // PRICE_SCALE
+    no_delta = (factor * no_price) // PRICE_SCALE
+    if outcome:
+        yes_price = yes_price + yes_delta
+        no_price = no_price - no_delta
+    else:
+        no_price = no_price + no_delta
+        yes_price = yes_price - yes_delta
+
+    # Normalize to ensure prices sum to PRICE_SCALE
+    total_price = yes_price + no_price
+    yes_price = (yes_price * PRICE_SCALE) // total_price
+    no_price = (no_price * PRICE_SCALE) // total_price
+
+    return MintQuote(
+        amount=amount,
+        fee=fee,
+        bet_amount=bet_amount,
+        tokens=tokens,
+        state=MarketState(yes_price, no_price, yes_supply, no_supply),
+    )
+
+
+def quote_mint_array(
+    yes_price,
+    no_price,
+    yes_supply,
+    no_supply,
+    amounts,
+    outcome: Union[bool, Sequence[bool], np.ndarray],
+    exact: bool = True,
+):
+    """Vectorized quote_mint over NumPy arrays
+
+    All arguments broadcast against each other, so this prices many sizes
+    against one state or steps many independent states at once. With
+    exact=True values are held as Python ints (object arrays) and results
+    match quote_mint bit for bit; with exact=False everything runs in
+    float64 with floor division, which is much faster but no longer exact
+    once values exceed 2**53.
+
+    Returns (fee, tokens, yes_price, no_price, yes_supply, no_supply).
+    """
+    dtype = object if exact else np.float64
+
+    def as_array(value):
+        array = np.asarray(value, dtype=dtype)
+        if exact:
+            # Normalize numpy scalars to Python ints so nothing overflows
+            array = np.vectorize(int, otypes=[object])(array)
+        return array
+
+    yes_price = as_array(yes_price)
+    no_price = as_array(no_price)
+    yes_supply = as_array(yes_supply)
+    no_supply = as_array(no_supply)
+    amounts = as_array(amounts)
+    is_yes = np.asarray(outcome, dtype=bool)
+
+    fee = (amounts * FEE_PERCENTAGE) // PRICE_SCALE
+    bet_amount = amounts - fee
+
+    tokens = (bet_amount * PRICE_SCALE) // np.where(is_yes, yes_price, no_price)
+    yes_supply = yes_supply + np.where(is_yes, tokens, 0)
+    no_supply = no_supply + np.where(is_yes, 0, tokens)
+
+    total_supply = yes_supply + no_supply
+    # np.maximum keeps the untaken branch free of negative floor divisions
+    excess = np.maximum(total_supply - PRICE_SCALE, 0)
+    factor = np.where(
+        total_supply > PRICE_SCALE,
+        (CURVE_FACTOR * PRICE_SCALE) // (PRICE_SCALE + excess // 10),
+        CURVE_FACTOR,
+    )
+
+    yes_delta = (factor * yes_price) // PRICE_SCALE
+    no_delta = (factor * no_price) // PRICE_SCALE
+    yes_price = np.where(is_yes, yes_price + yes_delta, yes_price - yes_delta)
+    no_price = np.where(is_yes, no_price - no_delta, no_price + no_delta)
+
+    total_price = yes_price + no_price
+    yes_price = (yes_price * PRICE_SCALE) // total_price
+    no_price = (no_price * PRICE_SCALE) // total_price
+
+    return fee, tokens, yes_price, no_price, yes_supply, no_supply
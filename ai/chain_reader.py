@@ -0,0 +1,280 @@
+"""
+Batched on-chain reads for ProveMeWrong markets
+
+Aggregates many `getMarket(bytes32)` calls (and PMW20 `totalSupply()`
+calls for pricing) into Multicall3 `aggregate3` eth_calls, chunked by
+calldata size. ChainStateReader caches the decoded results for a short
+TTL so list endpoints can include live prices cheaply; PricingIndex keeps
+the bonding-curve state of active markets current in the background so
+quotes never wait on the chain.
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Any, Tuple
+
+from eth_abi import decode
+from web3 import Web3
+
+from bonding_curve import MarketState
+
+logger = logging.getLogger(__name__)
+
+# Multicall3 is deployed at the same address on most EVM chains
+MULTICALL3_ADDRESS = os.getenv("MULTICALL3_ADDRESS", "0xcA11bde05977b3631167028862bE2a173976CA11")
+CHAIN_STATE_TTL_SECONDS = float(os.getenv("CHAIN_STATE_TTL_SECONDS", 5))
+MULTICALL_MAX_CALLDATA_BYTES = int(os.getenv("MULTICALL_MAX_CALLDATA_BYTES", 32000))
+PRICING_INDEX_INTERVAL_SECONDS = float(os.getenv("PRICING_INDEX_INTERVAL_SECONDS", 5))
+
+GET_MARKET_SELECTOR = Web3.keccak(text="getMarket(bytes32)")[:4]
+GET_MARKET_OUTPUT_TYPES = ["bytes32", "address", "address", "uint256", "uint256", "address", "uint256"]
+TOTAL_SUPPLY_SELECTOR = Web3.keccak(text="totalSupply()")[:4]
+
+# ABI-encoded size of one Call3 entry besides its calldata (offset, target,
+# allowFailure, bytes offset, bytes length and padding)
+CALL3_OVERHEAD_BYTES = 6 * 32
+
+
+def get_multicall3_abi():
+    """Get the Multicall3 ABI for the aggregate3 function"""
+    return [
+        {
+        "inputs": [
+            {
+            "components": [
+                {
+                "internalType": "address",
+                "name": "target",
+                "type": "address"
+                },
+                {
+                "internalType": "bool",
+                "name": "allowFailure",
+                "type": "bool"
+                },
+                {
+                "internalType": "bytes",
+                "name": "callData",
+                "type": "bytes"
+                }
+            ],
+            "internalType": "struct Multicall3.Call3[]",
+            "name": "calls",
+            "type": "tuple[]"
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+            "components": [
+                {
+                "internalType": "bool",
+                "name": "success",
+                "type": "bool"
+                },
+                {
+                "internalType": "bytes",
+                "name": "returnData",
+                "type": "bytes"
+                }
+            ],
+            "internalType": "struct Multicall3.Result[]",
+            "name": "returnData",
+            "type": "tuple[]"
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function"
+        }
+    ]
+
+
+def chain_market_id(market_id: str) -> bytes:
+    """On-chain bytes32 market ID for a database market ID"""
+    return Web3.keccak(primitive=Web3.to_bytes(text=market_id))
+
+
+def decode_market(return_data: bytes) -> Optional[Dict[str, Any]]:
+    """Decode getMarket return data, or None if the market was never created"""
+    request_hash, yes, no, yes_price, no_price, pool, outcome = decode(GET_MARKET_OUTPUT_TYPES, return_data)
+    if request_hash == b"\x00" * 32:
+        return None
+    # uint256 prices are returned as decimal strings to survive JSON number precision
+    return {
+        "yes_price": str(yes_price),
+        "no_price": str(no_price),
+        "outcome": outcome,  # 0 = no, 1 = yes, 2 = unknown
+        "pool": Web3.to_checksum_address(pool),
+        "yes_token": Web3.to_checksum_address(yes),
+        "no_token": Web3.to_checksum_address(no),
+    }
+
+
+class ChainStateReader:
+    """Reads market state for many markets per eth_call through Multicall3"""
+
+    def __init__(
+        self,
+        w3: Web3,
+        pmw_address: str,
+        multicall_address: str = MULTICALL3_ADDRESS,
+        ttl: float = CHAIN_STATE_TTL_SECONDS,
+        max_calldata_bytes: int = MULTICALL_MAX_CALLDATA_BYTES,
+    ):
+        self.pmw_address = Web3.to_checksum_address(pmw_address)
+        self.multicall = w3.eth.contract(
+            address=Web3.to_checksum_address(multicall_address),
+            abi=get_multicall3_abi()
+        )
+        self.ttl = ttl
+        self.max_calldata_bytes = max_calldata_bytes
+        self._cache: Dict[str, tuple] = {}  # market_id -> (expires_at, state)
+        self._lock = threading.Lock()
+
+    def _chunks(self, calls: List[tuple]) -> List[List[tuple]]:
+        """Split calls so each aggregate3 calldata stays under the size limit"""
+        call_size = CALL3_OVERHEAD_BYTES + len(GET_MARKET_SELECTOR) + 32
+        per_chunk = max(1, self.max_calldata_bytes // call_size)
+        return [calls[i:i + per_chunk] for i in range(0, len(calls), per_chunk)]
+
+    def _aggregate(self, calls: List[tuple]) -> List[tuple]:
+        """(success, return_data) of each (target, calldata) call, one aggregate3 call per chunk"""
+        results = []
+        for chunk in self._chunks(calls):
+            results.extend(self.multicall.functions.aggregate3(
+                [(target, True, calldata) for target, calldata in chunk]
+            ).call())
+        return results
+
+    def _fetch(self, market_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Read market state from the chain"""
+        states = {}
+        results = self._aggregate([
+            (self.pmw_address, GET_MARKET_SELECTOR + chain_market_id(market_id))
+            for market_id in market_ids
+        ])
+        for market_id, (success, return_data) in zip(market_ids, results):
+            if not success:
+                logger.warning(f"getMarket call failed in multicall for market: {market_id}")
+                states[market_id] = None
+                continue
+            states[market_id] = decode_market(return_data)
+        return states
+
+    def _get_cached(self, keys: List[str], fetch: Callable[[List[str]], Dict[str, Any]]) -> Dict[str, Any]:
+        """Cached values for keys, fetching the missing or expired ones in one batch"""
+        now = time.monotonic()
+        values = {}
+        missing = []
+        with self._lock:
+            for key in keys:
+                cached = self._cache.get(key)
+                if cached and cached[0] > now:
+                    values[key] = cached[1]
+                else:
+                    missing.append(key)
+
+        if missing:
+            fetched = fetch(missing)
+            expires_at = time.monotonic() + self.ttl
+            with self._lock:
+                # Drop expired entries so deleted markets do not accumulate
+                self._cache = {key: value for key, value in self._cache.items() if value[0] > now}
+                for key, value in fetched.items():
+                    self._cache[key] = (expires_at, value)
+            values.update(fetched)
+
+        return values
+
+    def get_markets(self, market_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Get on-chain state for the given markets, None for markets not on chain"""
+        return self._get_cached(market_ids, self._fetch)
+
+
+class PricingEntry(NamedTuple):
+    """Indexed pricing state of one market"""
+    state: Optional[MarketState]  # None while the market is not on chain
+    outcome: Optional[int]  # on-chain outcome: 0 = no, 1 = yes, 2 = unknown
+    tokens: Optional[Tuple[str, str]]  # YES and NO outcome token addresses
+
+
+class PricingIndex:
+    """Local index of the bonding-curve state (prices and supplies) of markets
+
+    Reads never touch the chain; refresh() brings the given markets up to
+    date, and the generator runs it for every active market every
+    PRICING_INDEX_INTERVAL_SECONDS. Outcome token addresses never change
+    once a market is created, so after a market's first refresh its
+    getMarket and both totalSupply calls go out in the same aggregate3
+    call; only markets seen for the first time need a getMarket round trip
+    before their supplies can be read.
+    """
+
+    def __init__(self, reader: ChainStateReader):
+        self.reader = reader
+        self._entries: Dict[str, PricingEntry] = {}
+        self._lock = threading.Lock()
+
+    def get(self, market_id: str) -> Optional[PricingEntry]:
+        """Indexed entry for a market, None if it has not been indexed yet"""
+        with self._lock:
+            return self._entries.get(market_id)
+
+    def refresh(self, market_ids: Iterable[str]) -> None:
+        """Re-read the pricing state of the given markets from the chain"""
+        market_ids = list(market_ids)
+        with self._lock:
+            tokens = {
+                market_id: self._entries[market_id].tokens
+                for market_id in market_ids
+                if market_id in self._entries and self._entries[market_id].tokens
+            }
+
+        entries = {}
+        new = [market_id for market_id in market_ids if market_id not in tokens]
+        if new:
+            for market_id, market in self.reader._fetch(new).items():
+                if market:
+                    tokens[market_id] = (market["yes_token"], market["no_token"])
+                else:
+                    entries[market_id] = PricingEntry(None, None, None)
+
+        deployed = [market_id for market_id in market_ids if market_id in tokens]
+        results = self.reader._aggregate([
+            call
+            for market_id in deployed
+            for call in (
+                (self.reader.pmw_address, GET_MARKET_SELECTOR + chain_market_id(market_id)),
+                (tokens[market_id][0], TOTAL_SUPPLY_SELECTOR),
+                (tokens[market_id][1], TOTAL_SUPPLY_SELECTOR),
+            )
+        ])
+        for index, market_id in enumerate(deployed):
+            (market_ok, market_data), (yes_ok, yes_data), (no_ok, no_data) = results[3 * index:3 * index + 3]
+            if not (market_ok and yes_ok and no_ok):
+                # Keep the last known state rather than guessing
+                logger.warning(f"Pricing calls failed in multicall for market: {market_id}")
+                continue
+            market = decode_market(market_data)
+            entries[market_id] = PricingEntry(
+                state=MarketState(
+                    yes_price=int(market["yes_price"]),
+                    no_price=int(market["no_price"]),
+                    yes_supply=decode(["uint256"], yes_data)[0],
+                    no_supply=decode(["uint256"], no_data)[0],
+                ),
+                outcome=market["outcome"],
+                tokens=tokens[market_id],
+            )
+
+        with self._lock:
+            self._entries.update(entries)
+
+    def sync(self, market_ids: Iterable[str]) -> None:
+        """Refresh exactly these markets and forget all others"""
+        market_ids = set(market_ids)
+        self.refresh(market_ids)
+        with self._lock:
+            self._entries = {market_id: entry for market_id, entry in self._entries.items() if market_id in market_ids}
@@ -0,0 +1,235 @@
+"""
+Shared helpers for admin wallet transactions
+
+Every chain write is simulated with eth_call against the pending block
+before it is signed, so transactions that would revert are rejected with
+their decoded revert reason instead of costing gas and a receipt wait.
+
+Fees follow EIP-1559 using cached eth_feeHistory percentiles, and a
+transaction that is not mined within a few blocks is re-broadcast with
+bumped fees so one underpriced send cannot stall the admin nonce sequence.
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from eth_abi import decode
+from web3 import Web3
+from web3.exceptions import ContractLogicError, TransactionNotFound
+
+logger = logging.getLogger(__name__)
+
+# Fee engine configuration
+FEE_HISTORY_BLOCKS = int(os.getenv("FEE_HISTORY_BLOCKS", 10))
+FEE_REWARD_PERCENTILE = float(os.getenv("FEE_REWARD_PERCENTILE", 50))
+FEE_CACHE_SECONDS = float(os.getenv("FEE_CACHE_SECONDS", 6))
+
+# Stuck transaction handling
+TX_SPEEDUP_AFTER_BLOCKS = int(os.getenv("TX_SPEEDUP_AFTER_BLOCKS", 3))
+TX_FEE_BUMP_PERCENT = max(10, int(os.getenv("TX_FEE_BUMP_PERCENT", 25)))  # nodes require >= 10%
+TX_MAX_FEE_BUMPS = int(os.getenv("TX_MAX_FEE_BUMPS", 5))
+TX_RECEIPT_TIMEOUT_SECONDS = float(os.getenv("TX_RECEIPT_TIMEOUT_SECONDS", 300))
+TX_POLL_INTERVAL_SECONDS = float(os.getenv("TX_POLL_INTERVAL_SECONDS", 1))
+
+ERROR_SELECTOR = bytes.fromhex("08c379a0")  # Error(string)
+PANIC_SELECTOR = bytes.fromhex("4e487b71")  # Panic(uint256)
+
+PANIC_CODES = {
+    0x01: "assertion failed",
+    0x11: "arithmetic overflow or underflow",
+    0x12: "division or modulo by zero",
+    0x21: "invalid enum value",
+    0x22: "invalid storage byte array",
+    0x31: "pop on empty array",
+    0x32: "array index out of bounds",
+    0x41: "out of memory",
+    0x51: "call to invalid internal function",
+}
+
+SIMULATION_CACHE_SIZE = 1024
+
+# Fee fields a built transaction may carry: EIP-1559, or legacy gasPrice
+FEE_FIELDS = ("maxFeePerGas", "maxPriorityFeePerGas", "gasPrice")
+
+
+class TransactionSimulationError(Exception):
+    """Raised when a transaction would revert, carrying the decoded reason"""
+
+    def __init__(self, reason: str):
+        super().__init__(f"Transaction would revert: {reason}")
+        self.reason = reason
+
+
+def decode_revert_reason(data: Any) -> Optional[str]:
+    """Decode Error(string) and Panic(uint256) revert data"""
+    if not data:
+        return None
+    if isinstance(data, str):
+        try:
+            data = bytes.fromhex(data[2:] if data.startswith("0x") else data)
+        except ValueError:
+            return None
+
+    selector, payload = data[:4], data[4:]
+    try:
+        if selector == ERROR_SELECTOR:
+            return decode(["string"], payload)[0]
+        if selector == PANIC_SELECTOR:
+            code = decode(["uint256"], payload)[0]
+            return f"panic: {PANIC_CODES.get(code, hex(code))}"
+    except Exception:
+        return None
+    return f"custom error {Web3.to_hex(selector)}"
+
+
+# (block number, from, to, data, value) -> revert reason, None when the call succeeds
+_simulation_cache: "OrderedDict[tuple, Optional[str]]" = OrderedDict()
+_simulation_lock = threading.Lock()
+
+
+def simulate_transaction(w3: Web3, transaction: Dict[str, Any]) -> None:
+    """Simulate a built transaction with eth_call against the pending block
+
+    Raises TransactionSimulationError if it would revert. Results are cached
+    per block for identical calldata, so retries of the same doomed request
+    are rejected without another RPC round-trip.
+    """
+    call = {
+        key: transaction[key]
+        for key in ("from", "to", "data", "value", "gas")
+        if key in transaction
+    }
+    block_number = w3.eth.block_number
+    key = (block_number, call.get("from"), call.get("to"), call.get("data"), call.get("value", 0))
+
+    with _simulation_lock:
+        cached = key in _simulation_cache
+        reason = _simulation_cache.get(key)
+
+    if not cached:
+        try:
+            w3.eth.call(call, "pending")
+            reason = None
+        except ContractLogicError as e:
+            reason = decode_revert_reason(e.data) or e.message or "execution reverted"
+
+        with _simulation_lock:
+            _simulation_cache[key] = reason
+            while len(_simulation_cache) > SIMULATION_CACHE_SIZE:
+                _simulation_cache.popitem(last=False)
+
+    if reason is not None:
+        logger.error(f"❌ Pre-flight simulation failed: {reason}")
+        raise TransactionSimulationError(reason)
+
+
+# RPC endpoint -> (expires_at, fee fields)
+_fee_cache: Dict[Optional[str], tuple] = {}
+_fee_lock = threading.Lock()
+
+
+def suggest_fees(w3: Web3) -> Dict[str, int]:
+    """Suggest fee fields for build_transaction from recent fee history
+
+    Returns EIP-1559 maxFeePerGas/maxPriorityFeePerGas, sized so the max
+    fee survives two full base fee increases, or a legacy gasPrice on
+    chains without a base fee. Cached briefly per RPC endpoint.
+    """
+    endpoint = getattr(w3.provider, "endpoint_uri", None)
+    now = time.monotonic()
+    with _fee_lock:
+        cached = _fee_cache.get(endpoint)
+        if cached and cached[0] > now:
+            return dict(cached[1])
+
+    history = w3.eth.fee_history(FEE_HISTORY_BLOCKS, "pending", [FEE_REWARD_PERCENTILE])
+    base_fees = history.get("baseFeePerGas") or []
+    # The last entry is the base fee of the next block
+    next_base_fee = base_fees[-1] if base_fees else 0
+
+    if next_base_fee:
+        rewards = sorted(reward[0] for reward in history.get("reward") or [] if reward)
+        priority_fee = rewards[len(rewards) // 2] if rewards else w3.eth.max_priority_fee
+        priority_fee = max(priority_fee, 1)
+        fees = {
+            "maxPriorityFeePerGas": priority_fee,
+            "maxFeePerGas": 2 * next_base_fee + priority_fee,
+        }
+    else:
+        fees = {"gasPrice": w3.eth.gas_price}
+
+    with _fee_lock:
+        _fee_cache[endpoint] = (now + FEE_CACHE_SECONDS, fees)
+    return dict(fees)
+
+
+def fee_fields(transaction: Dict[str, Any]) -> Dict[str, int]:
+    """The fee fields present in a transaction (EIP-1559 or legacy)"""
+    return {field: transaction[field] for field in FEE_FIELDS if field in transaction}
+
+
+def bump_fees(transaction: Dict[str, Any], suggested: Dict[str, int]) -> Dict[str, Any]:
+    """Raise a transaction's fees enough to replace it in the mempool"""
+    bumped = dict(transaction)
+    for field, value in fee_fields(transaction).items():
+        minimum = value * (100 + TX_FEE_BUMP_PERCENT) // 100 + 1
+        bumped[field] = max(minimum, suggested.get(field, 0))
+    # A fresh tip estimate may outgrow the bumped max fee; keep the max fee >= tip
+    if "maxFeePerGas" in bumped and bumped["maxFeePerGas"] < bumped["maxPriorityFeePerGas"]:
+        bumped["maxFeePerGas"] = bumped["maxPriorityFeePerGas"]
+    return bumped
+
+
+def send_transaction(w3: Web3, transaction: Dict[str, Any], private_key: str):
+    """Simulate, sign and send a transaction, speeding it up until it is mined
+
+    If no receipt appears within TX_SPEEDUP_AFTER_BLOCKS blocks, the same
+    nonce is re-signed with bumped fees and re-broadcast, up to
+    TX_MAX_FEE_BUMPS times. Returns the receipt of whichever version was
+    mined.
+    """
+    simulate_transaction(w3, transaction)
+
+    signed = w3.eth.account.sign_transaction(transaction, private_key)
+    tx_hashes = [w3.eth.send_raw_transaction(signed.rawTransaction)]
+    logger.info(f"📤 Sent transaction {tx_hashes[-1].hex()} (nonce {transaction['nonce']})")
+
+    deadline = time.monotonic() + TX_RECEIPT_TIMEOUT_SECONDS
+    sent_at_block = w3.eth.block_number
+    bumps = 0
+
+    while True:
+        for tx_hash in tx_hashes:
+            try:
+                return w3.eth.get_transaction_receipt(tx_hash)
+            except TransactionNotFound:
+                continue
+
+        if time.monotonic() > deadline:
+            raise TimeoutError(
+                f"Transaction not mined after {TX_RECEIPT_TIMEOUT_SECONDS}s: "
+                f"{', '.join(tx_hash.hex() for tx_hash in tx_hashes)}"
+            )
+
+        block_number = w3.eth.block_number
+        if block_number - sent_at_block >= TX_SPEEDUP_AFTER_BLOCKS and bumps < TX_MAX_FEE_BUMPS:
+            transaction = bump_fees(transaction, suggest_fees(w3))
+            signed = w3.eth.account.sign_transaction(transaction, private_key)
+            try:
+                tx_hashes.append(w3.eth.send_raw_transaction(signed.rawTransaction))
+                logger.warning(
+                    f"⏫ Transaction not mined after {block_number - sent_at_block} blocks, "
+                    f"re-broadcast with bumped fees: {tx_hashes[-1].hex()}"
+                )
+            except ValueError as e:
+                # An earlier version was mined in the meantime (nonce too low)
+                # or the node still prefers it; keep polling the known hashes
+                logger.warning(f"Fee bump rejected by node: {e}")
+            sent_at_block = block_number
+            bumps += 1
+
+        time.sleep(TX_POLL_INTERVAL_SECONDS)
@@ -0,0 +1,32 @@
+"""
+Shared pytest setup
+
+database.py creates its engines from DATABASE_URL at import time, so
+point it at a throwaway SQLite file before any test module imports the
+services (the default ./markets.db is real data).
+"""
+
+import os
+import tempfile
+
+import pytest
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='pmw-tests-')}/markets.db"
+
+
+@pytest.fixture(scope="session")
+def schema():
+    """The database module, with tables and migrations applied once per run"""
+    import database
+    database.init_db()
+    return database
+
+
+@pytest.fixture
+def db(schema):
+    """A session on empty tables"""
+    with schema.SessionLocal() as session:
+        for table in reversed(schema.Base.metadata.sorted_tables):
+            session.execute(table.delete())
+        session.commit()
+        yield session
@@ -1,6 +1,10 @@
-from sqlalchemy import create_engine, Column, String, Float, DateTime, Boolean, Text, JSON
+from sqlalchemy import create_engine, event, Column, String, Float, Integer, DateTime, Boolean, Text, JSON, Index, select, update, delete
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.dialects import postgresql, sqlite
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 import os
 import logging
 
@@ -19,19 +23,93 @@ if DATABASE_URL.startswith("postgres://"):
 
 logger.info(f"Using database URL: {DATABASE_URL}")
 
+# Connection pool settings (PostgreSQL)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))  # seconds, below typical proxy idle timeouts
+
+# SQLite settings
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+
+def is_sqlite(url: str) -> bool:
+    """Whether a database URL points at SQLite"""
+    return url.startswith("sqlite")
+
+def engine_options(url: str) -> dict:
+    """create_engine keyword arguments for the given database URL"""
+    if is_sqlite(url):
+        return {
+            # Sessions are used from FastAPI worker threads and background threads
+            "connect_args": {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+        }
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Per-connection SQLite settings: WAL lets readers run alongside the writer"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    finally:
+        cursor.close()
+
 # Create engine
-engine = create_engine(DATABASE_URL, echo=False)
+engine = create_engine(DATABASE_URL, echo=False, **engine_options(DATABASE_URL))
+if is_sqlite(DATABASE_URL):
+    event.listen(engine, "connect", set_sqlite_pragmas)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def async_database_url(url: str) -> str:
+    """Same database with an asyncio driver (aiosqlite or asyncpg)"""
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
+
+ASYNC_DATABASE_URL = async_database_url(DATABASE_URL)
+
+def new_async_engine(**kwargs):
+    """Create an async engine for DATABASE_URL with the same tuning as the sync engine
+
+    Async connections belong to the event loop that opened them, so code
+    that runs its own loop (e.g. asyncio.run in a background thread)
+    should create a separate engine with poolclass=NullPool and dispose
+    it afterwards.
+    """
+    options = engine_options(DATABASE_URL)
+    if "poolclass" in kwargs:
+        for key in ("pool_size", "max_overflow", "pool_timeout", "pool_recycle"):
+            options.pop(key, None)
+    options.update(kwargs)
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=False, **options)
+    if is_sqlite(DATABASE_URL):
+        event.listen(async_engine.sync_engine, "connect", set_sqlite_pragmas)
+    return async_engine
+
+# Create async engine and session factory for async endpoints
+async_engine = new_async_engine()
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
 # Create base class for models
 Base = declarative_base()
 
-# Market model
-class Market(Base):
-    __tablename__ = "markets"
-    
+# Market columns, shared by the hot table and its archive
+class MarketColumns:
     id = Column(String, primary_key=True, index=True)
     title = Column(String, nullable=False)
     description = Column(Text, nullable=False)
@@ -41,15 +119,53 @@ class Market(Base):
     initial_prob = Column(Float, nullable=False)
     validation = Column(JSON, nullable=False)  # MarketValidation dict
     created_at = Column(String, nullable=False)
-    status = Column(String, default="active")  # active, resolved, expired
+    status = Column(String, default="active", index=True)  # active, resolved, expired
     outcome = Column(String, nullable=True)  # YES, NO, or None
     resolved_at = Column(String, nullable=True)
     resolution_confidence = Column(Float, nullable=True)
 
-# Resolution model
-class Resolution(Base):
-    __tablename__ = "resolutions"
-    
+    # Typed copies of the ISO string fields for indexed range queries,
+    # kept in sync on every ORM insert/update (see sync_time_columns)
+    close_time = Column(DateTime, nullable=True)
+    created_time = Column(DateTime, nullable=False, index=True)  # pagination key, never NULL
+    resolved_time = Column(DateTime, nullable=True)
+
+    # Validation fields copied out of the validation JSON for indexed
+    # queries (see sync_market_validation)
+    confidence = Column(Float, nullable=True)
+    yes_probability = Column(Float, nullable=True)
+    auto_expire = Column(Boolean, nullable=True)
+    resolution_date = Column(DateTime, nullable=True)
+
+# Market model: active markets and recently resolved or expired ones
+class Market(MarketColumns, Base):
+    __tablename__ = "markets"
+
+    __table_args__ = (
+        # Expiry scans: active markets past their close time
+        Index("ix_markets_status_close_time", "status", "close_time"),
+        # Paginated listings filtered by status, in creation order
+        Index("ix_markets_status_created_time", "status", "created_time"),
+        # Archive scans: resolved markets older than a cutoff
+        Index("ix_markets_status_resolved_time", "status", "resolved_time"),
+        # Resolver due-market selection: closing soon or high confidence
+        Index("ix_markets_close_time", "close_time"),
+        Index("ix_markets_confidence", "confidence"),
+        Index("ix_markets_auto_expire_close_time", "auto_expire", "close_time"),
+        Index("ix_markets_yes_probability", "yes_probability"),
+        Index("ix_markets_resolution_date", "resolution_date"),
+    )
+
+# Markets resolved or expired for ARCHIVE_AFTER_DAYS, moved out of markets
+class MarketArchive(MarketColumns, Base):
+    __tablename__ = "markets_archive"
+
+    __table_args__ = (
+        Index("ix_markets_archive_status_created_time", "status", "created_time"),
+    )
+
+# Resolution columns, shared by the hot table and its archive
+class ResolutionColumns:
     id = Column(String, primary_key=True, index=True)
     market_id = Column(String, nullable=False, index=True)
     outcome = Column(String, nullable=False)  # YES, NO, or EXPIRED
@@ -59,6 +175,200 @@ class Resolution(Base):
     resolved_at = Column(String, nullable=False)
     auto_expired = Column(Boolean, default=False)
 
+    # Typed copy of resolved_at (see sync_time_columns); pagination key, never NULL
+    resolved_time = Column(DateTime, nullable=False, index=True)
+
+# Resolution model
+class Resolution(ResolutionColumns, Base):
+    __tablename__ = "resolutions"
+
+    __table_args__ = (
+        # Archive scans: non-archived resolutions older than a cutoff
+        Index("ix_resolutions_auto_expired_resolved_time", "auto_expired", "resolved_time"),
+    )
+
+# Archived resolutions older than ARCHIVE_AFTER_DAYS, moved out of resolutions
+class ResolutionArchive(ResolutionColumns, Base):
+    __tablename__ = "resolutions_archive"
+
+# FDC proof model (proofs are immutable once a voting round is finalized)
+class FdcProof(Base):
+    __tablename__ = "fdc_proofs"
+    
+    id = Column(String, primary_key=True, index=True)  # "<voting round>:<request hash>"
+    market_id = Column(String, nullable=True, index=True)
+    voting_round_id = Column(Integer, nullable=False)
+    request_bytes = Column(Text, nullable=False)
+    proof = Column(JSON, nullable=False)  # DA layer response
+    fetched_at = Column(String, nullable=False)
+
+def parse_iso_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Parse a stored ISO timestamp into a naive local datetime
+
+    Timezone-aware values (including a trailing 'Z') are converted to local
+    time so they compare correctly with datetime.now(). Returns None for
+    missing or unparseable values.
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+# Maps each ISO string column to its typed copy
+MARKET_TIME_COLUMNS = {
+    "close_time_iso": "close_time",
+    "created_at": "created_time",
+    "resolved_at": "resolved_time",
+}
+RESOLUTION_TIME_COLUMNS = {
+    "resolved_at": "resolved_time",
+}
+
+TIME_COLUMNS = {
+    Market: MARKET_TIME_COLUMNS,
+    MarketArchive: MARKET_TIME_COLUMNS,
+    Resolution: RESOLUTION_TIME_COLUMNS,
+    ResolutionArchive: RESOLUTION_TIME_COLUMNS,
+}
+
+# Keyset pagination keys. A NULL key would compare as unknown against a
+# cursor and end the listing early, so rows whose timestamp cannot be
+# parsed get UNKNOWN_TIME and sort first.
+UNKNOWN_TIME = datetime(1970, 1, 1)
+SORT_KEY_COLUMNS = {
+    Market: "created_time",
+    MarketArchive: "created_time",
+    Resolution: "resolved_time",
+    ResolutionArchive: "resolved_time",
+}
+
+def typed_time_values(model, values: Dict[str, Any]) -> Dict[str, Optional[datetime]]:
+    """Typed time column values for the ISO strings present in values"""
+    typed = {}
+    for iso_column, typed_column in TIME_COLUMNS[model].items():
+        if iso_column in values:
+            parsed = parse_iso_datetime(values[iso_column])
+            if parsed is None and typed_column == SORT_KEY_COLUMNS[model]:
+                parsed = UNKNOWN_TIME
+            typed[typed_column] = parsed
+    return typed
+
+@event.listens_for(Market, "before_insert")
+@event.listens_for(Market, "before_update")
+@event.listens_for(MarketArchive, "before_insert")
+@event.listens_for(MarketArchive, "before_update")
+@event.listens_for(Resolution, "before_insert")
+@event.listens_for(Resolution, "before_update")
+@event.listens_for(ResolutionArchive, "before_insert")
+@event.listens_for(ResolutionArchive, "before_update")
+def sync_time_columns(mapper, connection, target):
+    """Keep the typed time columns in step with the ISO strings"""
+    model = type(target)
+    values = {iso_column: getattr(target, iso_column) for iso_column in TIME_COLUMNS[model]}
+    for typed_column, value in typed_time_values(model, values).items():
+        setattr(target, typed_column, value)
+
+def _as_float(value) -> Optional[float]:
+    try:
+        return float(value) if value is not None and not isinstance(value, bool) else None
+    except (TypeError, ValueError):
+        return None
+
+def market_validation_values(validation: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Values of the validation columns for a market's validation dict"""
+    validation = validation if isinstance(validation, dict) else {}
+    return {
+        "confidence": _as_float(validation.get("confidence")),
+        "yes_probability": _as_float(validation.get("yes_probability")),
+        "auto_expire": bool(validation.get("auto_expire", False)),
+        "resolution_date": parse_iso_datetime(validation.get("resolution_date")),
+    }
+
+@event.listens_for(Market, "before_insert")
+@event.listens_for(Market, "before_update")
+@event.listens_for(MarketArchive, "before_insert")
+@event.listens_for(MarketArchive, "before_update")
+def sync_market_validation(mapper, connection, target):
+    """Keep the validation columns in step with the validation JSON"""
+    for column, value in market_validation_values(target.validation).items():
+        setattr(target, column, value)
+
+def with_derived_columns(model, row: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the typed time (and validation) columns for a row written without the ORM"""
+    row = dict(row)
+    row.update(typed_time_values(model, row))
+    if model in (Market, MarketArchive) and "validation" in row:
+        row.update(market_validation_values(row["validation"]))
+    return row
+
+def upsert(db: Session, model, rows: List[Dict[str, Any]]) -> None:
+    """Insert rows, or overwrite the given columns of rows whose id already exists
+
+    Uses the dialect's native INSERT ... ON CONFLICT DO UPDATE, so there is
+    no separate existence check and concurrent writers cannot race between
+    check and insert. Executed with executemany in the session's current
+    transaction; the caller decides when to commit.
+    """
+    if not rows:
+        return
+    rows = [with_derived_columns(model, row) for row in rows]
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        insert = postgresql.insert
+    elif dialect == "sqlite":
+        insert = sqlite.insert
+    else:
+        # No native upsert; fall back to the ORM's per-row merge
+        for row in rows:
+            db.merge(model(**row))
+        return
+
+    statement = insert(model.__table__)
+    statement = statement.on_conflict_do_update(
+        index_elements=[model.id],
+        set_={column: statement.excluded[column] for column in rows[0] if column != "id"}
+    )
+    db.execute(statement, rows)
+
+def insert_missing(db: Session, model, rows: List[Dict[str, Any]]) -> List[str]:
+    """Insert rows whose id does not exist yet, leaving existing rows untouched; returns the inserted ids
+
+    One INSERT ... ON CONFLICT DO NOTHING RETURNING id, so a row inserted
+    concurrently is skipped rather than overwritten. Runs in the session's
+    current transaction; the caller decides when to commit.
+    """
+    if not rows:
+        return []
+    rows = [with_derived_columns(model, row) for row in rows]
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        insert = postgresql.insert
+    elif dialect == "sqlite":
+        insert = sqlite.insert
+    else:
+        # No native ON CONFLICT; check and insert row by row
+        inserted = []
+        for row in rows:
+            if db.get(model, row["id"]) is None:
+                db.add(model(**row))
+                inserted.append(row["id"])
+        db.flush()
+        return inserted
+
+    statement = (
+        insert(model.__table__)
+        .on_conflict_do_nothing(index_elements=[model.id])
+        .returning(model.id)
+    )
+    return list(db.scalars(statement, rows))
+
 def get_db():
     """Get database session"""
     db = SessionLocal()
@@ -67,10 +377,73 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """Get async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def batched_update(db: Session, model, condition, values: dict, batch_size: int = 1000) -> int:
+    """Apply an UPDATE to all rows matching condition in bounded batches
+
+    Each batch is a single indexed UPDATE ... WHERE id IN (SELECT ... LIMIT n)
+    committed on its own, so locks stay short. The values must make rows
+    stop matching the condition, otherwise the loop never ends.
+    Returns the number of rows updated.
+    """
+    total = 0
+    while True:
+        batch_ids = select(model.id).where(condition).limit(batch_size)
+        result = db.execute(
+            update(model)
+            .where(model.id.in_(batch_ids))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        total += result.rowcount
+        if result.rowcount < batch_size:
+            return total
+
+def move_to_archive(db: Session, model, archive_model, condition, batch_size: int = 1000) -> int:
+    """Move rows matching condition from a hot table to its archive table in batches
+
+    Each batch copies up to batch_size rows with INSERT ... SELECT and
+    deletes them from the hot table in the same transaction, so a row is
+    always in exactly one of the two tables. Rows already in the archive
+    (e.g. an id that was reused) are replaced. Returns the number of rows
+    moved.
+    """
+    columns = [column.name for column in archive_model.__table__.columns]
+    total = 0
+    while True:
+        batch_ids = db.scalars(select(model.id).where(condition).limit(batch_size)).all()
+        if not batch_ids:
+            return total
+        db.execute(delete(archive_model).where(archive_model.id.in_(batch_ids)))
+        db.execute(
+            archive_model.__table__.insert().from_select(
+                columns,
+                select(*(model.__table__.c[name] for name in columns)).where(model.id.in_(batch_ids))
+            )
+        )
+        db.execute(
+            delete(model)
+            .where(model.id.in_(batch_ids))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        total += len(batch_ids)
+        if len(batch_ids) < batch_size:
+            return total
+
 def init_db():
     """Initialize database tables"""
     try:
         Base.metadata.create_all(bind=engine)
+        # create_all skips tables that already exist, so bring older
+        # databases up to date (new columns, indexes, backfills)
+        from migrate import run_migrations
+        run_migrations()
         logger.info("Database tables created successfully")
     except Exception as e:
         logger.error(f"Error creating database tables: {e}")
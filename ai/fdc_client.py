@@ -0,0 +1,186 @@
+"""
+Client for the Flare FDC verifier and data-availability layer
+
+Keeps a pooled keep-alive session with deadline-aware retries, caches
+prepared requests per URL and request fees per request shape, and stores
+fetched proofs in the database so each proof is only downloaded once.
+"""
+
+import os
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import Web3
+
+from database import SessionLocal, FdcProof
+
+logger = logging.getLogger(__name__)
+
+FDC_VERIFIER_URL = os.getenv("FDC_VERIFIER_URL", "https://jq-verifier-test.flare.rocks")
+FDC_DA_LAYER_URL = os.getenv("FDC_DA_LAYER_URL", "https://ctn2-data-availability.flare.network")
+FDC_API_KEY = os.getenv("FDC_API_KEY", "flare-oxford-2025")
+
+FDC_ATTEMPT_TIMEOUT_SECONDS = float(os.getenv("FDC_ATTEMPT_TIMEOUT_SECONDS", 10))
+FDC_DEADLINE_SECONDS = float(os.getenv("FDC_DEADLINE_SECONDS", 30))
+FDC_FEE_CACHE_SECONDS = float(os.getenv("FDC_FEE_CACHE_SECONDS", 600))
+
+ATTESTATION_TYPE = "0x494a736f6e417069000000000000000000000000000000000000000000000000"
+SOURCE_ID = "0x5745423200000000000000000000000000000000000000000000000000000000"
+ABI_SIGNATURE = "{\"components\": [{\"internalType\": \"uint256\",\"name\": \"outcome\",\"type\": \"uint256\"}],\"name\": \"task\",\"type\": \"tuple\"}"
+
+# Status codes worth another attempt before the deadline
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class FdcClient:
+    """Pooled, caching client for FDC request preparation, fees and proofs"""
+
+    def __init__(
+        self,
+        verifier_url: str = FDC_VERIFIER_URL,
+        da_layer_url: str = FDC_DA_LAYER_URL,
+        api_key: str = FDC_API_KEY,
+    ):
+        self.verifier_url = verifier_url.rstrip("/")
+        self.da_layer_url = da_layer_url.rstrip("/")
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "X-API-KEY": api_key,
+            "Content-Type": "application/json"
+        })
+
+        self._prepared: Dict[str, str] = {}  # URL -> abiEncodedRequest
+        self._fees: Dict[tuple, tuple] = {}  # (fee config, request shape) -> (expires_at, fee)
+        self._lock = threading.Lock()
+
+    def _post(self, url: str, body: Dict[str, Any], deadline_seconds: float = FDC_DEADLINE_SECONDS) -> Optional[requests.Response]:
+        """POST with retries on transient failures, bounded by an overall deadline"""
+        deadline = time.monotonic() + deadline_seconds
+        backoff = 0.5
+        attempt = 0
+
+        while True:
+            attempt += 1
+            remaining = deadline - time.monotonic()
+            try:
+                response = self.session.post(url, json=body, timeout=min(FDC_ATTEMPT_TIMEOUT_SECONDS, remaining))
+                if response.status_code not in RETRY_STATUS_CODES:
+                    return response
+                logger.warning(f"FDC request to {url} returned {response.status_code} (attempt {attempt})")
+            except (requests.ConnectionError, requests.Timeout) as e:
+                logger.warning(f"FDC request to {url} failed (attempt {attempt}): {e}")
+                response = None
+
+            # Only retry if the backoff still leaves time for a useful attempt
+            if time.monotonic() + backoff >= deadline:
+                return response
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 5)
+
+    def prepare_request(self, url: str) -> Optional[str]:
+        """Get the abiEncodedRequest for a resolution URL (cached per URL)"""
+        with self._lock:
+            if url in self._prepared:
+                return self._prepared[url]
+
+        body = {
+            "attestationType": ATTESTATION_TYPE,
+            "sourceId": SOURCE_ID,
+            "requestBody": {
+                "url": url,
+                "postprocessJq": ".",
+                "abi_signature": ABI_SIGNATURE
+            }
+        }
+
+        try:
+            response = self._post(f"{self.verifier_url}/JsonApi/prepareRequest", body)
+            if response is None or not response.ok:
+                logger.error(f"FDC request failed with status: {response.status_code if response is not None else 'no response'}")
+                return None
+
+            data = response.json()
+            if data.get("status") != "VALID":
+                logger.error(f"FDC request returned invalid status: {data.get('status')}")
+                return None
+
+            encoded_request = data.get("abiEncodedRequest")
+            with self._lock:
+                self._prepared[url] = encoded_request
+            return encoded_request
+        except Exception as e:
+            logger.error(f"Error preparing FDC request: {e}")
+            return None
+
+    def get_request_fee(self, w3: Web3, fee_config_address: str, fee_abi, encoded_request: str) -> int:
+        """Get the attestation fee, cached per fee config and request shape"""
+        # The fee depends only on the attestation type and source ID, which
+        # are the first two 32-byte words of the encoded request
+        shape = (fee_config_address.lower(), encoded_request[:2 + 128].lower())
+        now = time.monotonic()
+        with self._lock:
+            cached = self._fees.get(shape)
+            if cached and cached[0] > now:
+                return cached[1]
+
+        fee = w3.eth.contract(
+            address=Web3.to_checksum_address(fee_config_address),
+            abi=fee_abi
+        ).functions.getRequestFee(encoded_request).call()
+
+        with self._lock:
+            self._fees[shape] = (now + FDC_FEE_CACHE_SECONDS, fee)
+        return fee
+
+    def get_proof(self, voting_round_id: int, request_bytes: str, market_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Get the proof for a request in a voting round, from the database if already fetched"""
+        proof_id = f"{voting_round_id}:{Web3.keccak(hexstr=request_bytes).hex()}"
+
+        db = SessionLocal()
+        try:
+            stored = db.query(FdcProof).filter(FdcProof.id == proof_id).first()
+            if stored:
+                return stored.proof
+
+            response = self._post(
+                f"{self.da_layer_url}/api/v1/fdc/proof-by-request-round",
+                {
+                    "votingRoundId": voting_round_id,
+                    "requestBytes": request_bytes
+                }
+            )
+            if response is None or not response.ok:
+                logger.error(f"FDC proof request failed with status: {response.status_code if response is not None else 'no response'}")
+                return None
+
+            data = response.json()
+            # Only finalized proofs are immutable and safe to keep
+            if data.get("proof") is not None:
+                db.add(FdcProof(
+                    id=proof_id,
+                    market_id=market_id,
+                    voting_round_id=voting_round_id,
+                    request_bytes=request_bytes,
+                    proof=data,
+                    fetched_at=datetime.now().isoformat()
+                ))
+                db.commit()
+            return data
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error getting FDC proof: {e}")
+            return None
+        finally:
+            db.close()
+
+
+fdc_client = FdcClient()
@@ -1,19 +1,39 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError, field_validator
 import requests
 import json
 import os
 import re
-from typing import List, Optional, Dict, Any
+from typing import List, NamedTuple, Optional, Dict, Any
 from datetime import datetime, timedelta
 import logging
 import uuid
+import queue
+import tempfile
+import math
+import threading
+import time
+from sqlalchemy import select, union_all
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from database import get_db, init_db, Market, SessionLocal
+from database import get_db, get_async_db, init_db, batched_update, insert_missing, move_to_archive, parse_iso_datetime, upsert, Market, MarketArchive, SessionLocal
+from pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, paginate, page_results, parse_time_filter
+from serialization import compile_serializer
+from export import ndjson_export
+from auth import require_admin_key
+from snapshot import snapshot_chunks, load_snapshot
+from search import market_search_statement
+from response_cache import response_cache, response_cache_key, cached_response, cache_json_response, mark_changed
+from bonding_curve import MarketState, probabilities_to_prices, quote_mint
+from chain_reader import PRICING_INDEX_INTERVAL_SECONDS, ChainStateReader, PricingIndex, chain_market_id
+from chain_tx import TransactionSimulationError, fee_fields, send_transaction, suggest_fees
 from web3 import Web3
 from eth_account import Account
 
@@ -58,6 +78,20 @@ logger.info(f"   PMW_POOL_ADDRESS from env: {'✅ Set' if os.getenv('PMW_POOL_AD
 logger.info(f"   ADMIN_PRIVATE_KEY from env: {'✅ Set' if os.getenv('ADMIN_PRIVATE_KEY') else '❌ Not set'}")
 logger.info(f"   CHAIN_ID from env: {os.getenv('CHAIN_ID', 'Not set')}")
 
+# Maintenance job configuration
+MAINTENANCE_INTERVAL_SECONDS = int(os.getenv("MAINTENANCE_INTERVAL_SECONDS", 300))
+MAINTENANCE_BATCH_SIZE = int(os.getenv("MAINTENANCE_BATCH_SIZE", 1000))
+# Resolved or expired markets move to markets_archive after this many days
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", 30))
+
+# Snapshot uploads larger than this are buffered on disk instead of in memory
+SNAPSHOT_SPOOL_BYTES = 64 * 1024 * 1024
+
+# Bulk imports: chain deployments are sent in batches by a background worker
+IMPORT_MAX_MARKETS = int(os.getenv("IMPORT_MAX_MARKETS", 10000))
+IMPORT_DEPLOY_BATCH_SIZE = int(os.getenv("IMPORT_DEPLOY_BATCH_SIZE", 50))
+IMPORT_DEPLOY_PAUSE_SECONDS = float(os.getenv("IMPORT_DEPLOY_PAUSE_SECONDS", 1))
+
 # ASI-1 Mini API Configuration
 ASI_API_URL = "https://api.asi1.ai/v1/chat/completions"
 ASI_API_KEY = os.getenv("ASI_API_KEY", "sk_a1d55fd6b1ba47ddadc98bd1e8048e56ff00c4736c844a9db4aab791d33f0989")
@@ -94,6 +128,23 @@ class MarketData(BaseModel):
     resolved_at: Optional[str] = None
     resolution_confidence: Optional[float] = None
 
+class ImportedMarketData(MarketData):
+    """A partner-supplied market; stricter than stored markets, which may predate the checks"""
+
+    @field_validator("close_time_iso", "created_at")
+    @classmethod
+    def check_iso_timestamp(cls, value: str) -> str:
+        """Reject timestamps the typed time columns could not be derived from"""
+        if parse_iso_datetime(value) is None:
+            raise ValueError("expected an ISO 8601 timestamp")
+        return value
+
+# Row -> MarketData.dict() without re-validating stored markets
+serialize_market = compile_serializer(MarketData)
+
+# Built once: validates a whole JSON import body straight from bytes
+MARKET_IMPORT_ADAPTER = TypeAdapter(List[ImportedMarketData])
+
 class MarketResponse(BaseModel):
     success: bool
     market: Optional[MarketData] = None
@@ -163,6 +214,48 @@ def get_contract_abi():
         },                      
     ]
 
+# Shared Multicall3 reader for live market state, created on first use
+chain_state_reader: Optional[ChainStateReader] = None
+
+def get_chain_state_reader() -> Optional[ChainStateReader]:
+    """Get the batched chain state reader, or None if the chain is not configured"""
+    global chain_state_reader
+    if chain_state_reader is None:
+        if PMW_ADDRESS is None:
+            logger.warning("PMW_ADDRESS not configured, chain state will be skipped")
+            return None
+        w3 = get_web3_instance()
+        if not w3:
+            return None
+        chain_state_reader = ChainStateReader(w3, PMW_ADDRESS)
+    return chain_state_reader
+
+# Local index of active markets' bonding-curve state, for quotes
+pricing_index: Optional[PricingIndex] = None
+
+def get_pricing_index() -> Optional[PricingIndex]:
+    """Get the pricing index, or None if the chain is not configured"""
+    global pricing_index
+    if pricing_index is None:
+        reader = get_chain_state_reader()
+        if reader is None:
+            return None
+        pricing_index = PricingIndex(reader)
+    return pricing_index
+
+def attach_chain_state(markets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Add live on-chain state to serialized markets (None when unavailable)"""
+    states = {}
+    reader = get_chain_state_reader()
+    if reader:
+        try:
+            states = reader.get_markets([market["id"] for market in markets])
+        except Exception as e:
+            logger.error(f"Error reading chain state: {e}")
+    for market in markets:
+        market["chain_state"] = states.get(market["id"])
+    return markets
+
 def deploy_market(
     market_id: str,
     title: str,
@@ -228,25 +321,17 @@ def deploy_market(
         logger.info(f"   Request hash: {request_hash.hex()}")
         
         logger.info("💰 Converting probabilities to price format...")
-        # Convert probabilities to price format (1e18 = 100%)
-        yes_price = int(yes_probability * 1e18)
-        no_price = int(no_probability * 1e18)
-        
-        # Ensure prices sum to 1e18 (100%)
-        total_price = yes_price + no_price
-        if total_price != 1e18:
-            # Normalize prices
-            yes_price = (yes_price * 1e18) // total_price
-            no_price = 1e18 - yes_price
+        # Convert probabilities to price format (1e18 = 100%), normalized to sum to 1e18
+        yes_price, no_price, _, _ = probabilities_to_prices(yes_probability, no_probability)
         
         logger.info(f"   YES price: {yes_price} (wei)")
         logger.info(f"   NO price: {no_price} (wei)")
-        logger.info(f"   Total price: {total_price} (wei)")
+        logger.info(f"   Total price: {yes_price + no_price} (wei)")
         
         logger.info("📝 Building transaction...")
         # Build transaction
         transaction = contract.functions.createMarket(
-            Web3.keccak(primitive=Web3.to_bytes(text=market_id)),
+            chain_market_id(market_id),
             request_hash,
             int(yes_price),  # Explicitly convert to int
             int(no_price),   # Explicitly convert to int
@@ -254,27 +339,22 @@ def deploy_market(
         ).build_transaction({
             'from': account.address,
             'gas': 2000000,  # Adjust gas limit as needed
-            'gasPrice': w3.eth.gas_price,
-            'nonce': w3.eth.get_transaction_count(account.address),
-            'chainId': CHAIN_ID
+            'nonce': w3.eth.get_transaction_count(account.address, 'pending'),
+            'chainId': CHAIN_ID,
+            **suggest_fees(w3)
         })
         
-        logger.info(f"   Gas price: {w3.eth.gas_price}")
-        logger.info(f"   Nonce: {w3.eth.get_transaction_count(account.address)}")
+        logger.info(f"   Fees: {fee_fields(transaction)}")
+        logger.info(f"   Nonce: {transaction['nonce']}")
         logger.info(f"   Chain ID: {CHAIN_ID}")
         logger.info(f"   YES price type: {type(yes_price)}, value: {yes_price}")
         logger.info(f"   NO price type: {type(no_price)}, value: {no_price}")
         
-        logger.info("✍️ Signing transaction...")
-        # Sign and send transaction
-        signed_txn = w3.eth.account.sign_transaction(transaction, ADMIN_PRIVATE_KEY)
-        logger.info("📤 Sending transaction...")
-        tx_hash = w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+        logger.info("✍️ Simulating, signing and sending transaction...")
+        # Simulated first, then re-broadcast with bumped fees if it is not mined promptly
+        receipt = send_transaction(w3, transaction, ADMIN_PRIVATE_KEY)
+        tx_hash = receipt['transactionHash']
         logger.info(f"   Transaction hash: {tx_hash.hex()}")
-        
-        logger.info("⏳ Waiting for transaction receipt...")
-        # Wait for transaction receipt
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
         logger.info(f"   Block number: {receipt['blockNumber']}")
         logger.info(f"   Gas used: {receipt['gasUsed']}")
         logger.info(f"   Status: {receipt['status']}")
@@ -287,6 +367,9 @@ def deploy_market(
             logger.error(f"❌ Transaction failed: {tx_hash.hex()}")
             return False
             
+    except TransactionSimulationError:
+        # Surface the revert reason to the caller instead of a bare failure
+        raise
     except Exception as e:
         logger.error(f"❌ Error deploying market to blockchain: {e}")
         logger.error(f"   Exception type: {type(e).__name__}")
@@ -321,70 +404,308 @@ def load_markets_from_db(db: Session) -> Dict[str, MarketData]:
     
     return markets
 
-def save_market_to_db(db: Session, market: MarketData):
-    """Save market to database"""
+def market_row(market: MarketData) -> Dict[str, Any]:
+    """Column values for a market"""
+    return {
+        "id": market.id,
+        "title": market.title,
+        "description": market.description,
+        "prompt": market.prompt,
+        "close_time_iso": market.close_time_iso,
+        "outcomes": market.outcomes,
+        "initial_prob": market.initial_prob,
+        "validation": market.validation.dict(),
+        "created_at": market.created_at,
+        "status": market.status,
+        "outcome": market.outcome,
+        "resolved_at": market.resolved_at,
+        "resolution_confidence": market.resolution_confidence
+    }
+
+def save_markets_to_db(db: Session, markets: List[MarketData], commit: bool = True):
+    """Insert or update markets with one upsert, committing them together
+
+    With commit=False the write joins the session's open transaction, so a
+    caller can save more markets and commit once.
+    """
     try:
-        db_market = Market(
-            id=market.id,
-            title=market.title,
-            description=market.description,
-            prompt=market.prompt,
-            close_time_iso=market.close_time_iso,
-            outcomes=market.outcomes,
-            initial_prob=market.initial_prob,
-            validation=market.validation.dict(),
-            created_at=market.created_at,
-            status=market.status,
-            outcome=market.outcome,
-            resolved_at=market.resolved_at,
-            resolution_confidence=market.resolution_confidence
-        )
-        
-        # Check if market exists
-        existing_market = db.query(Market).filter(Market.id == market.id).first()
-        if existing_market:
-            # Update existing market
-            for key, value in market.dict().items():
-                if key == "validation":
-                    setattr(existing_market, key, market.validation.dict())
-                else:
-                    setattr(existing_market, key, value)
-        else:
-            # Add new market
-            db.add(db_market)
-        
+        mark_changed(db, "markets", *(f"market:{market.id}" for market in markets))
+        upsert(db, Market, [market_row(market) for market in markets])
+        if commit:
+            db.commit()
+        logger.info(f"Saved {len(markets)} markets to database")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error saving markets to database: {e}")
+        raise
+
+def save_market_to_db(db: Session, market: MarketData, commit: bool = True):
+    """Save a single market to the database (see save_markets_to_db)"""
+    save_markets_to_db(db, [market], commit)
+
+def import_markets(db: Session, markets: List[MarketData]) -> List[MarketData]:
+    """Insert the markets whose ids are not taken yet, in one statement; returns those inserted
+
+    Existing markets, hot or archived, are skipped rather than overwritten,
+    so re-sending an import is harmless.
+    """
+    ids = [market.id for market in markets]
+    # Archived ids cannot conflict in the hot table, so exclude them up front
+    archived = set(db.scalars(select(MarketArchive.id).where(MarketArchive.id.in_(ids))))
+    try:
+        inserted = set(insert_missing(db, Market, [market_row(market) for market in markets if market.id not in archived]))
+        mark_changed(db, "markets", *(f"market:{market_id}" for market_id in inserted))
         db.commit()
-        logger.info(f"Saved market to database: {market.id}")
     except Exception as e:
         db.rollback()
-        logger.error(f"Error saving market to database: {e}")
+        logger.error(f"Error importing markets: {e}")
         raise
+    logger.info(f"Inserted {len(inserted)} imported markets")
+    return [market for market in markets if market.id in inserted]
+
+def market_page_statement(
+    statement,
+    cursor: Optional[str],
+    limit: int,
+    status: Optional[str] = None,
+    close_before: Optional[str] = None,
+    close_after: Optional[str] = None,
+    created_after: Optional[str] = None,
+    model=Market
+):
+    """Apply list filters and keyset pagination (by creation time) to a market select"""
+    close_before = parse_time_filter(close_before, "close_before")
+    close_after = parse_time_filter(close_after, "close_after")
+    created_after = parse_time_filter(created_after, "created_after")
+    
+    if status:
+        statement = statement.where(model.status == status)
+    if close_before:
+        statement = statement.where(model.close_time < close_before)
+    if close_after:
+        statement = statement.where(model.close_time > close_after)
+    if created_after:
+        statement = statement.where(model.created_time > created_after)
+    return paginate(statement, model.created_time, model.id, cursor, limit)
 
+# Columns a listing can be projected to with ?fields= (MarketData field names)
+MARKET_FIELDS = list(MarketData.model_fields)
+# Columns returned by ?view=summary
+SUMMARY_FIELDS = ["id", "title", "status", "close_time_iso", "initial_prob"]
 
-def archive_expired_markets(db: Session):
+def market_projection(view: Optional[str], fields: Optional[str]) -> Optional[List[str]]:
+    """Resolve ?view= and ?fields= into the columns to return, None for full markets"""
+    if fields:
+        names = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in names if name not in MARKET_FIELDS]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(MARKET_FIELDS)}"
+            )
+        # The id is always returned so rows can be identified and paginated
+        return ["id"] + [name for name in dict.fromkeys(names) if name != "id"]
+    if view in (None, "full"):
+        return None
+    if view == "summary":
+        return SUMMARY_FIELDS
+    raise HTTPException(status_code=400, detail="View must be full or summary")
+
+def market_select(projection: Optional[List[str]]):
+    """Select full Market rows, or only the projected columns plus the pagination key"""
+    if projection is None:
+        return select(Market)
+    return select(Market.created_time, *(getattr(Market, name) for name in projection))
+
+def all_markets_page_statement(
+    projection: Optional[List[str]],
+    cursor: Optional[str],
+    limit: int,
+    archived_only: bool = False,
+    **filters
+):
+    """One page over markets and markets_archive together, in creation order
+
+    Each table is paginated on its own index and only the two pages are
+    merged. Rows are plain column rows (full markets or the projection).
+    """
+    pages = []
+    for model in (Market, MarketArchive):
+        if projection is None:
+            statement = select(*model.__table__.columns)
+        else:
+            statement = select(model.created_time, *(getattr(model, name) for name in projection))
+        if archived_only:
+            statement = statement.where(model.status != "active")
+        page = market_page_statement(statement, cursor, limit, model=model, **filters)
+        pages.append(select(page.subquery()))
+    markets = union_all(*pages).subquery()
+    return select(markets).order_by(markets.c.created_time, markets.c.id).limit(limit + 1)
+
+def find_market(db: Session, market_id: str):
+    """A market by ID from the hot table, or from the archive"""
+    return (
+        db.query(Market).filter(Market.id == market_id).first()
+        or db.query(MarketArchive).filter(MarketArchive.id == market_id).first()
+    )
+
+def project_market_rows(rows, projection: List[str]) -> List[Dict[str, Any]]:
+    """Serialize projected rows directly, without building MarketData objects"""
+    return [{name: getattr(row, name) for name in projection} for row in rows]
+
+def archive_expired_markets(db: Session) -> int:
     """Move expired markets to archived status in database"""
     current_time = datetime.now()
-    updated = False
     
     try:
-        active_markets = db.query(Market).filter(Market.status == "active").all()
-        for db_market in active_markets:
-            try:
-                close_time = datetime.fromisoformat(db_market.close_time_iso.replace('Z', '+00:00'))
-                if close_time <= current_time:
-                    db_market.status = "expired"
-                    updated = True
-                    logger.info(f"Archived expired market: {db_market.title}")
-            except Exception as e:
-                logger.error(f"Error checking market expiration: {e}")
-        
-        if updated:
-            db.commit()
+        archived = batched_update(
+            db,
+            Market,
+            (Market.status == "active") & (Market.close_time <= current_time),
+            {"status": "expired"},
+            batch_size=MAINTENANCE_BATCH_SIZE
+        )
+        if archived:
+            # Batches commit separately, so invalidate once all of them are in;
+            # the archived IDs are not known, so every cached market detail goes
+            response_cache.bump(["markets", "market_details"])
+            logger.info(f"Archived {archived} expired markets")
+        return archived
     except Exception as e:
         db.rollback()
         logger.error(f"Error archiving expired markets: {e}")
+        return 0
+
+def move_markets_to_archive(db: Session, days_old: int = ARCHIVE_AFTER_DAYS) -> int:
+    """Move markets resolved or expired more than days_old days ago to markets_archive"""
+    cutoff_time = datetime.now() - timedelta(days=days_old)
     
-    return updated
+    try:
+        moved = move_to_archive(
+            db,
+            Market,
+            MarketArchive,
+            ((Market.status == "expired") & (Market.close_time <= cutoff_time))
+            | ((Market.status == "resolved") & (Market.resolved_time <= cutoff_time)),
+            batch_size=MAINTENANCE_BATCH_SIZE
+        )
+        if moved:
+            # Reads cover both tables, so cached responses stay valid
+            logger.info(f"Moved {moved} markets to the archive table")
+        return moved
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error moving markets to the archive table: {e}")
+        return 0
+
+def resolution_url(market_id: str) -> str:
+    """Outcome URL the contract queries to resolve a market"""
+    return f"{RESOLUTIONS_API_URL}/resolver/resolutions/{market_id}/outcome"
+
+class Deployment(NamedTuple):
+    """What deploy_market needs to create a market on chain"""
+    market_id: str
+    title: str
+    yes_probability: float
+    no_probability: float
+
+# Imported markets waiting to be deployed, in batches of IMPORT_DEPLOY_BATCH_SIZE.
+# The queue lives in memory; POST /markets/import/deploy re-queues active
+# markets that are still missing on chain after a failure or restart.
+deploy_queue: "queue.Queue[List[Deployment]]" = queue.Queue()
+# Ids queued or being deployed, so a retry does not queue them twice
+pending_deployments: set = set()
+pending_deployments_lock = threading.Lock()
+
+def enqueue_deployments(deployments: List[Deployment]) -> int:
+    """Queue chain deployments, skipping markets already queued; returns the number queued"""
+    with pending_deployments_lock:
+        deployments = [deployment for deployment in deployments if deployment.market_id not in pending_deployments]
+        pending_deployments.update(deployment.market_id for deployment in deployments)
+    for start in range(0, len(deployments), IMPORT_DEPLOY_BATCH_SIZE):
+        deploy_queue.put(deployments[start:start + IMPORT_DEPLOY_BATCH_SIZE])
+    return len(deployments)
+
+def market_deployment(market: MarketData) -> Deployment:
+    return Deployment(market.id, market.title, market.validation.yes_probability, market.validation.no_probability)
+
+def undeployed_markets(db: Session) -> List[Deployment]:
+    """Active markets that are not on chain yet, read in one batched multicall"""
+    reader = get_chain_state_reader()
+    if reader is None:
+        raise HTTPException(status_code=503, detail="Chain not configured")
+    rows = db.execute(
+        select(Market.id, Market.title, Market.validation).where(Market.status == "active")
+    ).all()
+    states = reader.get_markets([row.id for row in rows])
+    return [
+        Deployment(row.id, row.title, row.validation.get("yes_probability"), row.validation.get("no_probability"))
+        for row in rows
+        if states.get(row.id) is None
+    ]
+
+def run_deployment_worker():
+    """Deploy queued markets one batch at a time, pausing between batches
+
+    Transactions from the admin wallet are sent one after another, as each
+    needs the previous nonce to be used. Unlike /generate, a failed
+    deployment does not delete the market: it is logged, and
+    POST /markets/import/deploy queues it again.
+    """
+    while True:
+        batch = deploy_queue.get()
+        deployed = 0
+        for deployment in batch:
+            try:
+                if deploy_market(
+                    market_id=deployment.market_id,
+                    title=deployment.title,
+                    url=resolution_url(deployment.market_id),
+                    yes_probability=deployment.yes_probability,
+                    no_probability=deployment.no_probability,
+                ):
+                    deployed += 1
+                else:
+                    logger.error(f"❌ Failed to deploy imported market: {deployment.market_id}")
+            except Exception as e:
+                logger.error(f"❌ Error deploying imported market {deployment.market_id}: {e}")
+            finally:
+                with pending_deployments_lock:
+                    pending_deployments.discard(deployment.market_id)
+        logger.info(f"Deployed {deployed}/{len(batch)} imported markets ({deploy_queue.qsize()} batches queued)")
+        deploy_queue.task_done()
+        time.sleep(IMPORT_DEPLOY_PAUSE_SECONDS)
+
+def run_periodic_maintenance():
+    """Archive expired markets and move old ones to cold storage on a schedule instead of at startup"""
+    while True:
+        try:
+            db = SessionLocal()
+            try:
+                archive_expired_markets(db)
+                move_markets_to_archive(db)
+            finally:
+                db.close()
+        except Exception as e:
+            logger.error(f"Error in periodic maintenance: {e}")
+        
+        time.sleep(MAINTENANCE_INTERVAL_SECONDS)
+
+def run_pricing_indexer():
+    """Keep the pricing index current for every open active market"""
+    while True:
+        try:
+            index = get_pricing_index()
+            if index is not None:
+                with SessionLocal() as db:
+                    market_ids = db.scalars(
+                        select(Market.id).where((Market.status == "active") & (Market.close_time > datetime.now()))
+                    ).all()
+                index.sync(market_ids)
+        except Exception as e:
+            logger.error(f"Error refreshing pricing index: {e}")
+
+        time.sleep(PRICING_INDEX_INTERVAL_SECONDS)
 
 async def analyze_market_prompt(prompt: str) -> MarketValidation:
     """Use ASI-1 Mini to analyze market prompt and estimate probabilities"""
@@ -451,7 +772,8 @@ async def analyze_market_prompt(prompt: str) -> MarketValidation:
     """
     
     try:
-        response = requests.post(
+        response = await run_in_threadpool(
+            requests.post,
             ASI_API_URL,
             headers=get_asi_headers(),
             json={
@@ -612,7 +934,7 @@ def create_market_data(prompt: str, validation: MarketValidation, market_id: Opt
     )
 
 @app.post("/generate", response_model=MarketResponse)
-async def generate_market(request: MarketRequest, db: Session = Depends(get_db)):
+async def generate_market(request: MarketRequest, db: AsyncSession = Depends(get_async_db)):
     """Generate a prediction market based on the prompt"""
     
     if not ASI_API_KEY:
@@ -623,7 +945,7 @@ async def generate_market(request: MarketRequest, db: Session = Depends(get_db))
         
         # Check if market with this ID already exists
         if request.market_id:
-            existing_market = db.query(Market).filter(Market.id == request.market_id).first()
+            existing_market = await db.get(Market, request.market_id)
             if existing_market:
                 logger.info(f"Market with ID {request.market_id} already exists, returning existing market")
                 market_data = MarketData(
@@ -657,11 +979,11 @@ async def generate_market(request: MarketRequest, db: Session = Depends(get_db))
         market_data = create_market_data(request.prompt, validation, request.market_id)
         
         # Store market in database
-        save_market_to_db(db, market_data)
+        await db.run_sync(save_market_to_db, market_data)
         
         logger.info(f"✅ Market created and stored: {market_data.id}")
 
-        url = f"{RESOLUTIONS_API_URL}/resolver/resolutions/{market_data.id}/outcome"
+        url = resolution_url(market_data.id)
         logger.info(f"🔗 Resolution URL: {url}")
 
         # Deploy the market to the blockchain
@@ -669,7 +991,9 @@ async def generate_market(request: MarketRequest, db: Session = Depends(get_db))
         print("🚀 BLOCKCHAIN DEPLOYMENT STARTED")  # Railway will definitely show this
         blockchain_deployed = False
         try:            
-            blockchain_deployed = deploy_market(
+            # Waits for the receipt, so it runs off the event loop
+            blockchain_deployed = await run_in_threadpool(
+                deploy_market,
                 market_id=market_data.id,
                 title=market_data.title,
                 url=url,
@@ -684,15 +1008,16 @@ async def generate_market(request: MarketRequest, db: Session = Depends(get_db))
                 print(f"❌ BLOCKCHAIN FAILED: {market_data.id}")  # Railway will show this
                 # Delete the market from database since blockchain deployment failed
                 try:
-                    db_market = db.query(Market).filter(Market.id == market_data.id).first()
+                    db_market = await db.get(Market, market_data.id)
                     if db_market:
-                        db.delete(db_market)
-                        db.commit()
+                        mark_changed(db, "markets", f"market:{market_data.id}")
+                        await db.delete(db_market)
+                        await db.commit()
                         logger.info(f"🗑️ Deleted market from database due to blockchain deployment failure: {market_data.id}")
                         print(f"🗑️ MARKET DELETED: {market_data.id}")  # Railway will show this
                 except Exception as delete_error:
                     logger.error(f"Error deleting market from database: {delete_error}")
-                    db.rollback()
+                    await db.rollback()
                 
                 return MarketResponse(
                     success=False,
@@ -706,15 +1031,16 @@ async def generate_market(request: MarketRequest, db: Session = Depends(get_db))
             
             # Delete the market from database since blockchain deployment failed
             try:
-                db_market = db.query(Market).filter(Market.id == market_data.id).first()
+                db_market = await db.get(Market, market_data.id)
                 if db_market:
-                    db.delete(db_market)
-                    db.commit()
+                    mark_changed(db, "markets", f"market:{market_data.id}")
+                    await db.delete(db_market)
+                    await db.commit()
                     logger.info(f"🗑️ Deleted market from database due to blockchain deployment error: {market_data.id}")
                     print(f"🗑️ MARKET DELETED (ERROR): {market_data.id}")  # Railway will show this
             except Exception as delete_error:
                 logger.error(f"Error deleting market from database: {delete_error}")
-                db.rollback()
+                await db.rollback()
             
             return MarketResponse(
                 success=False,
@@ -736,10 +1062,10 @@ async def generate_market(request: MarketRequest, db: Session = Depends(get_db))
         )
 
 @app.post("/archive-expired")
-async def archive_expired(db: Session = Depends(get_db)):
+async def archive_expired(db: AsyncSession = Depends(get_async_db)):
     """Manually trigger archiving of expired markets"""
     try:
-        updated = archive_expired_markets(db)
+        updated = await db.run_sync(archive_expired_markets)
         return {
             "success": True,
             "message": f"Archived {updated} expired markets" if updated else "No expired markets to archive",
@@ -749,163 +1075,409 @@ async def archive_expired(db: Session = Depends(get_db)):
         logger.error(f"Error archiving expired markets: {e}")
         raise HTTPException(status_code=500, detail=f"Error archiving markets: {str(e)}")
 
+@app.get("/snapshot", dependencies=[Depends(require_admin_key)])
+def export_snapshot():
+    """Stream a compressed snapshot of all markets and resolutions (see snapshot.py)"""
+    return StreamingResponse(
+        snapshot_chunks(),
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": 'attachment; filename="markets.snapshot"'}
+    )
+
+@app.post("/snapshot", dependencies=[Depends(require_admin_key)])
+async def import_snapshot(request: Request, replace: bool = False):
+    """Bulk-load a snapshot sent as the request body, optionally replacing existing rows"""
+    with tempfile.SpooledTemporaryFile(max_size=SNAPSHOT_SPOOL_BYTES) as body:
+        async for chunk in request.stream():
+            body.write(chunk)
+        body.seek(0)
+        try:
+            counts = await run_in_threadpool(load_snapshot, body, replace)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except IntegrityError:
+            raise HTTPException(status_code=409, detail="Snapshot rows already exist; use replace=true to overwrite")
+        except Exception as e:
+            logger.error(f"Error importing snapshot: {e}")
+            raise HTTPException(status_code=500, detail=f"Error importing snapshot: {str(e)}")
+    
+    # Loaded outside the ORM, so invalidate every cached read
+    response_cache.bump(["markets", "market_details"])
+    return {"success": True, "imported": counts}
+
+@app.post("/markets/import", dependencies=[Depends(require_admin_key)])
+async def import_markets_endpoint(request: Request, deploy: bool = True, db: AsyncSession = Depends(get_async_db)):
+    """Bulk-insert pre-validated markets (a JSON array of MarketData) and queue their deployment
+
+    Skips the LLM analysis of /generate. Active markets that were inserted
+    are deployed to the chain in the background.
+    """
+    try:
+        markets = MARKET_IMPORT_ADAPTER.validate_json(await request.body())
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False)[:20])
+    if len(markets) > IMPORT_MAX_MARKETS:
+        raise HTTPException(status_code=413, detail=f"Too many markets: at most {IMPORT_MAX_MARKETS} per import")
+    if len({market.id for market in markets}) != len(markets):
+        raise HTTPException(status_code=400, detail="Duplicate market ids in import")
+
+    try:
+        inserted = await db.run_sync(import_markets, markets)
+    except Exception as e:
+        logger.error(f"Error importing markets: {e}")
+        raise HTTPException(status_code=500, detail=f"Error importing markets: {str(e)}")
+
+    queued = enqueue_deployments([market_deployment(market) for market in inserted if market.status == "active"]) if deploy else 0
+    logger.info(f"Imported {len(inserted)} markets ({len(markets) - len(inserted)} skipped, {queued} queued for deployment)")
+    return {
+        "success": True,
+        "imported": len(inserted),
+        "skipped": len(markets) - len(inserted),
+        "deployments_queued": queued
+    }
+
+@app.post("/markets/import/deploy", dependencies=[Depends(require_admin_key)])
+def retry_market_deployments(db: Session = Depends(get_db)):
+    """Queue deployment of every active market that is not on chain yet"""
+    try:
+        deployments = undeployed_markets(db)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error finding undeployed markets: {e}")
+        raise HTTPException(status_code=503, detail=f"Could not read chain state: {str(e)}")
+    queued = enqueue_deployments(deployments)
+    logger.info(f"Queued {queued} undeployed markets for deployment")
+    return {"success": True, "undeployed": len(deployments), "deployments_queued": queued}
+
 @app.get("/markets/active")
-async def get_active_markets(db: Session = Depends(get_db)):
+async def get_active_markets(
+    request: Request,
+    with_chain_state: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    close_before: Optional[str] = None,
+    close_after: Optional[str] = None,
+    created_after: Optional[str] = None,
+    view: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
     """Get only active markets"""
+    projection = market_projection(view, fields)
+    # Chain state changes independently of the database, so it is never cached
+    cache_key = None if with_chain_state else response_cache_key(request)
+    cached = cached_response(request, cache_key)
+    if cached is not None:
+        return cached
+    versions = response_cache.versions(["markets"])
+    statement = market_page_statement(
+        market_select(projection).where(Market.status == "active"),
+        cursor, limit,
+        close_before=close_before, close_after=close_after, created_after=created_after
+    )
     try:
-        db_markets = db.query(Market).filter(Market.status == "active").all()
-        markets = []
-        for db_market in db_markets:
-            market_data = MarketData(
-                id=db_market.id,
-                title=db_market.title,
-                description=db_market.description,
-                prompt=db_market.prompt,
-                close_time_iso=db_market.close_time_iso,
-                outcomes=db_market.outcomes,
-                initial_prob=db_market.initial_prob,
-                validation=MarketValidation(**db_market.validation),
-                created_at=db_market.created_at,
-                status=db_market.status,
-                outcome=db_market.outcome,
-                resolved_at=db_market.resolved_at,
-                resolution_confidence=db_market.resolution_confidence
+        if projection:
+            rows, next_cursor = page_results((await db.execute(statement)).all(), limit, "created_time")
+            markets = project_market_rows(rows, projection)
+        else:
+            db_markets, next_cursor = page_results(
+                (await db.scalars(statement)).all(), limit, "created_time"
             )
-            markets.append(market_data)
+            markets = [serialize_market(db_market) for db_market in db_markets]
         
-        return {
+        if with_chain_state:
+            # Blocking web3 call: keep it off the event loop
+            markets = await run_in_threadpool(attach_chain_state, markets)
+        return cache_json_response(request, cache_key, versions, {
             "total": len(markets),
-            "markets": markets
-        }
+            "markets": markets,
+            "next_cursor": next_cursor
+        })
     except Exception as e:
         logger.error(f"Error getting active markets: {e}")
         raise HTTPException(status_code=500, detail=f"Error loading markets: {str(e)}")
 
 @app.get("/markets/archived")
-async def get_archived_markets(db: Session = Depends(get_db)):
+async def get_archived_markets(
+    request: Request,
+    with_chain_state: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    status: Optional[str] = None,
+    close_before: Optional[str] = None,
+    close_after: Optional[str] = None,
+    created_after: Optional[str] = None,
+    view: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
     """Get only archived markets"""
+    if status == "active":
+        raise HTTPException(status_code=400, detail="Archived markets cannot have status active")
+    projection = market_projection(view, fields)
+    # Chain state changes independently of the database, so it is never cached
+    cache_key = None if with_chain_state else response_cache_key(request)
+    cached = cached_response(request, cache_key)
+    if cached is not None:
+        return cached
+    versions = response_cache.versions(["markets"])
+    statement = all_markets_page_statement(
+        projection, cursor, limit, archived_only=True,
+        status=status, close_before=close_before, close_after=close_after, created_after=created_after
+    )
     try:
-        db_markets = db.query(Market).filter(Market.status != "active").all()
-        markets = []
-        for db_market in db_markets:
-            market_data = MarketData(
-                id=db_market.id,
-                title=db_market.title,
-                description=db_market.description,
-                prompt=db_market.prompt,
-                close_time_iso=db_market.close_time_iso,
-                outcomes=db_market.outcomes,
-                initial_prob=db_market.initial_prob,
-                validation=MarketValidation(**db_market.validation),
-                created_at=db_market.created_at,
-                status=db_market.status,
-                outcome=db_market.outcome,
-                resolved_at=db_market.resolved_at,
-                resolution_confidence=db_market.resolution_confidence
-            )
-            markets.append(market_data)
+        rows, next_cursor = page_results((await db.execute(statement)).all(), limit, "created_time")
+        if projection:
+            markets = project_market_rows(rows, projection)
+        else:
+            markets = [serialize_market(row) for row in rows]
         
-        return {
+        if with_chain_state:
+            # Blocking web3 call: keep it off the event loop
+            markets = await run_in_threadpool(attach_chain_state, markets)
+        return cache_json_response(request, cache_key, versions, {
             "total": len(markets),
-            "markets": markets
-        }
+            "markets": markets,
+            "next_cursor": next_cursor
+        })
     except Exception as e:
         logger.error(f"Error getting archived markets: {e}")
         raise HTTPException(status_code=500, detail=f"Error loading markets: {str(e)}")
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database and clean up expired markets on startup"""
+    """Initialize database and schedule archiving of expired markets"""
     try:
         init_db()
         logger.info("Database initialized successfully")
         
-        # Archive expired markets
-        db = SessionLocal()
-        try:
-            updated = archive_expired_markets(db)
-            if updated:
-                logger.info(f"Archived {updated} expired markets on startup")
-        finally:
-            db.close()
+        # Archive expired markets in the background so startup is not blocked
+        thread = threading.Thread(target=run_periodic_maintenance, daemon=True)
+        thread.start()
+        logger.info(f"Maintenance task started (every {MAINTENANCE_INTERVAL_SECONDS}s)")
+
+        threading.Thread(target=run_deployment_worker, daemon=True).start()
+        if RPC_URL and PMW_ADDRESS:
+            threading.Thread(target=run_pricing_indexer, daemon=True).start()
     except Exception as e:
         logger.error(f"Error during startup: {e}")
 
 @app.get("/markets")
-def list_markets(db: Session = Depends(get_db)):
-    """List all stored markets"""
-    db_markets = db.query(Market).all()
-    markets = []
-    for db_market in db_markets:
-        market_data = MarketData(
-            id=db_market.id,
-            title=db_market.title,
-            description=db_market.description,
-            prompt=db_market.prompt,
-            close_time_iso=db_market.close_time_iso,
-            outcomes=db_market.outcomes,
-            initial_prob=db_market.initial_prob,
-            validation=MarketValidation(**db_market.validation),
-            created_at=db_market.created_at,
-            status=db_market.status,
-            outcome=db_market.outcome,
-            resolved_at=db_market.resolved_at,
-            resolution_confidence=db_market.resolution_confidence
-        )
-        markets.append(market_data)
+def list_markets(
+    request: Request,
+    with_chain_state: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    status: Optional[str] = None,
+    close_before: Optional[str] = None,
+    close_after: Optional[str] = None,
+    created_after: Optional[str] = None,
+    view: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """List stored markets, one page at a time"""
+    projection = market_projection(view, fields)
+    # Chain state changes independently of the database, so it is never cached
+    cache_key = None if with_chain_state else response_cache_key(request)
+    cached = cached_response(request, cache_key)
+    if cached is not None:
+        return cached
+    versions = response_cache.versions(["markets"])
+    statement = all_markets_page_statement(
+        projection, cursor, limit,
+        status=status, close_before=close_before, close_after=close_after, created_after=created_after
+    )
+    rows, next_cursor = page_results(db.execute(statement).all(), limit, "created_time")
+    if projection:
+        markets = project_market_rows(rows, projection)
+    else:
+        markets = [serialize_market(row) for row in rows]
     
-    return {
+    if with_chain_state:
+        attach_chain_state(markets)
+    return cache_json_response(request, cache_key, versions, {
         "total": len(markets),
-        "markets": [market.dict() for market in markets]
-    }
+        "markets": markets,
+        "next_cursor": next_cursor
+    })
+
+@app.get("/markets/search")
+def search_markets(
+    request: Request,
+    q: str = Query(..., min_length=1),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    status: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Search market titles, prompts and descriptions, best matches first, one page at a time"""
+    cache_key = response_cache_key(request)
+    cached = cached_response(request, cache_key)
+    if cached is not None:
+        return cached
+    versions = response_cache.versions(["markets"])
+    
+    statement = market_search_statement(db, q, status)
+    if statement is None:
+        rows, next_cursor = [], None
+    else:
+        ranked = statement.subquery()
+        rows, next_cursor = page_results(
+            db.execute(paginate(select(ranked), ranked.c.rank, ranked.c.id, cursor, limit)).all(), limit, "rank"
+        )
+    markets = [serialize_market(row) for row in rows]
+    return cache_json_response(request, cache_key, versions, {
+        "total": len(markets),
+        "markets": markets,
+        "next_cursor": next_cursor
+    })
+
+@app.get("/markets/export")
+def export_markets(status: Optional[str] = None, compress: Optional[str] = None):
+    """Stream every market as NDJSON (one MarketData object per line)
+
+    Hot markets come first, then archived ones, each in id order.
+    ?compress=gzip returns a gzipped .ndjson.gz download.
+    """
+    statements = []
+    for model in (Market, MarketArchive):
+        statement = select(*model.__table__.columns).order_by(model.id)
+        if status:
+            statement = statement.where(model.status == status)
+        statements.append(statement)
+    return ndjson_export(statements, serialize_market, "markets", compress)
 
 @app.get("/markets/{market_id}")
-def get_market(market_id: str, db: Session = Depends(get_db)):
+def get_market(market_id: str, request: Request, db: Session = Depends(get_db)):
     """Get a specific market by ID"""
-    db_market = db.query(Market).filter(Market.id == market_id).first()
+    cache_key = response_cache_key(request)
+    cached = cached_response(request, cache_key)
+    if cached is not None:
+        return cached
+    versions = response_cache.versions([f"market:{market_id}", "market_details"])
+    
+    db_market = find_market(db, market_id)
     if db_market:
-        market_data = MarketData(
-            id=db_market.id,
-            title=db_market.title,
-            description=db_market.description,
-            prompt=db_market.prompt,
-            close_time_iso=db_market.close_time_iso,
-            outcomes=db_market.outcomes,
-            initial_prob=db_market.initial_prob,
-            validation=MarketValidation(**db_market.validation),
-            created_at=db_market.created_at,
-            status=db_market.status,
-            outcome=db_market.outcome,
-            resolved_at=db_market.resolved_at,
-            resolution_confidence=db_market.resolution_confidence
-        )
-        return market_data
+        return cache_json_response(request, cache_key, versions, serialize_market(db_market))
     raise HTTPException(status_code=404, detail="Market not found")
 
-@app.get("/markets/{market_id}/outcome")
-def get_market_outcome(market_id: str, db: Session = Depends(get_db)):
-    """Get the outcome of a market (1 for YES, 0 for NO, or undefined)"""
-    db_market = db.query(Market).filter(Market.id == market_id).first()
+def initial_market_state(validation: Dict[str, Any]) -> MarketState:
+    """Prices a market is created with on chain, from its validated probabilities"""
+    try:
+        yes_probability = float(validation["yes_probability"])
+        no_probability = float(validation["no_probability"])
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=422, detail="Market has no valid yes/no probabilities")
+    if not (math.isfinite(yes_probability) and math.isfinite(no_probability)) \
+            or yes_probability < 0 or no_probability < 0 or yes_probability + no_probability <= 0:
+        raise HTTPException(status_code=422, detail="Market has no valid yes/no probabilities")
+    state = probabilities_to_prices(yes_probability, no_probability)
+    if state.yes_price <= 0 or state.no_price <= 0:
+        raise HTTPException(status_code=422, detail="Market probabilities leave an outcome with no price")
+    return state
+
+def get_market_state(db: Session, market_id: str) -> MarketState:
+    """Current pricing state of an active market
+
+    Read from the local pricing index (prices from getMarket, supplies from
+    the outcome tokens' totalSupply, refreshed in the background), so a
+    quote does not wait on the chain. A market the index has not seen yet
+    (created since its last refresh) is indexed on the spot. Markets not
+    deployed yet, or services without chain access, are quoted from the
+    prices they are created with.
+    """
+    db_market = None
+    for model in (Market, MarketArchive):
+        db_market = db.query(model.status, model.close_time, model.validation).filter(model.id == market_id).first()
+        if db_market:
+            break
     if not db_market:
         raise HTTPException(status_code=404, detail="Market not found")
-    
+    if db_market.status != "active" or (db_market.close_time and db_market.close_time <= datetime.now()):
+        raise HTTPException(status_code=409, detail="Market is closed; quotes are only available for active markets")
+
+    index = get_pricing_index()
+    if index:
+        entry = index.get(market_id)
+        if entry is None:
+            try:
+                index.refresh([market_id])
+            except Exception as e:
+                logger.error(f"Error reading pricing state for market {market_id}: {e}")
+                raise HTTPException(status_code=503, detail="Could not read market state from chain")
+            entry = index.get(market_id)
+        if entry is None:
+            raise HTTPException(status_code=503, detail="Could not read market state from chain")
+        if entry.outcome is not None and entry.outcome != 2:
+            raise HTTPException(status_code=409, detail="Market is resolved on chain")
+        if entry.state:
+            if entry.state.yes_price <= 0 or entry.state.no_price <= 0:
+                # mint would revert dividing by the price
+                raise HTTPException(status_code=409, detail="Market has an outcome with no price on chain")
+            return entry.state
+    return initial_market_state(db_market.validation)
+
+@app.get("/markets/{market_id}/quote")
+def get_market_quote(market_id: str, amount: int, outcome: str, db: Session = Depends(get_db)):
+    """Preview a bet: tokens received, fee and prices after the mint (amounts in wei)"""
+    outcome = outcome.upper()
+    if outcome not in ["YES", "NO"]:
+        raise HTTPException(status_code=400, detail="Outcome must be YES or NO")
+    if amount <= 0:
+        raise HTTPException(status_code=400, detail="Amount must be greater than 0")
+
+    state = get_market_state(db, market_id)
+    quote = quote_mint(state, amount, outcome == "YES")
+
+    # uint256 values are returned as decimal strings to survive JSON number precision
+    return {
+        "market_id": market_id,
+        "outcome": outcome,
+        "amount": str(quote.amount),
+        "fee": str(quote.fee),
+        "bet_amount": str(quote.bet_amount),
+        "tokens": str(quote.tokens),
+        "yes_price_before": str(state.yes_price),
+        "no_price_before": str(state.no_price),
+        "yes_price": str(quote.state.yes_price),
+        "no_price": str(quote.state.no_price)
+    }
+
+def market_outcome_value(db_market: Market):
+    """Outcome reported for a market: 1 for YES, 0 for NO, or undefined"""
     # Check if market is resolved
     if db_market.status == "resolved" and db_market.outcome:
         if db_market.outcome == "YES":
-            return {"outcome": 1}
+            return 1
         elif db_market.outcome == "NO":
-            return {"outcome": 0}
+            return 0
         else:
-            return {"outcome": 0}  # Treat any other outcome as false
+            return 0  # Treat any other outcome as false
     elif db_market.status == "expired":
-        return {"outcome": 0}  # Expired markets are false
+        return 0  # Expired markets are false
     else:
-        return {"outcome": "undefined"}  # Market not yet resolved
+        return "undefined"  # Market not yet resolved
+
+@app.get("/markets/{market_id}/outcome")
+def get_market_outcome(market_id: str, request: Request, db: Session = Depends(get_db)):
+    """Get the outcome of a market (1 for YES, 0 for NO, or undefined)"""
+    cache_key = response_cache_key(request)
+    cached = cached_response(request, cache_key)
+    if cached is not None:
+        return cached
+    versions = response_cache.versions([f"market:{market_id}", "market_details"])
+    
+    db_market = find_market(db, market_id)
+    if not db_market:
+        raise HTTPException(status_code=404, detail="Market not found")
+    return cache_json_response(request, cache_key, versions, {"outcome": market_outcome_value(db_market)})
 
 @app.put("/markets/{market_id}/outcome")
 def update_market_outcome(market_id: str, outcome_data: dict, db: Session = Depends(get_db)):
     """Update the outcome of a market (called by resolver)"""
-    db_market = db.query(Market).filter(Market.id == market_id).first()
+    db_market = find_market(db, market_id)
     if not db_market:
         raise HTTPException(status_code=404, detail="Market not found")
     
@@ -916,6 +1488,7 @@ def update_market_outcome(market_id: str, outcome_data: dict, db: Session = Depe
     db_market.resolution_confidence = outcome_data.get("confidence")
     
     # Save updated market
+    mark_changed(db, "markets", f"market:{market_id}")
     db.commit()
     
     logger.info(f"Updated market {market_id} with outcome: {db_market.outcome}")
@@ -928,8 +1501,9 @@ def update_market_outcome(market_id: str, outcome_data: dict, db: Session = Depe
 @app.delete("/markets/{market_id}")
 def delete_market(market_id: str, db: Session = Depends(get_db)):
     """Delete a market by ID"""
-    db_market = db.query(Market).filter(Market.id == market_id).first()
+    db_market = find_market(db, market_id)
     if db_market:
+        mark_changed(db, "markets", f"market:{market_id}")
         db.delete(db_market)
         db.commit()
         return {"message": "Market deleted successfully"}
@@ -1005,8 +1579,9 @@ def root():
         },
         "endpoints": {
             "POST /generate": "Generate a prediction market",
-            "GET /markets": "List all markets",
+            "GET /markets": "List all markets (?with_chain_state=1 adds live on-chain prices)",
             "GET /markets/{id}": "Get specific market",
+            "GET /markets/{id}/quote": "Preview tokens, fee and prices for a bet",
             "DELETE /markets/{id}": "Delete market",
             "GET /health": "Health check"
         }
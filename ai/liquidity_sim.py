@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo liquidity simulator for PMWPool sizing
+
+Runs many order-flow paths at once through the bonding curve dynamics in
+bonding_curve.py and settles each path with the contract's redemption rule
+(one asset unit per winning token). Reports how much the pool may have to
+pay out beyond what it collected, per market.
+
+Usage:
+    python liquidity_sim.py --paths 5000 --trades 200
+    python liquidity_sim.py --sweep mean_trade=1,10,100 --sweep informed_fraction=0,0.2
+"""
+
+import argparse
+import itertools
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Any
+
+import numpy as np
+
+from bonding_curve import PRICE_SCALE, probabilities_to_prices, quote_mint_array
+
+QUANTILES = [0.5, 0.9, 0.95, 0.99]
+
+
+class SimulationParams(NamedTuple):
+    """Order-flow model for one market (trade sizes in asset units, not wei)"""
+    yes_probability: float
+    n_paths: int = 5000
+    n_trades: int = 200
+    mean_trade: float = 10.0  # mean bet size
+    trade_sigma: float = 1.0  # lognormal shape of bet sizes
+    informed_fraction: float = 0.2  # share of bets placed on the true outcome
+    seed: Optional[int] = None
+
+
+def _summarize(values: np.ndarray) -> Dict[str, float]:
+    """Mean, tail quantiles and max of a per-path distribution"""
+    summary = {"mean": float(values.mean()), "max": float(values.max())}
+    for q, value in zip(QUANTILES, np.quantile(values, QUANTILES)):
+        summary[f"p{int(q * 100)}"] = float(value)
+    return summary
+
+
+def simulate_market(params: SimulationParams) -> Dict[str, Any]:
+    """Simulate all paths for one market and report payout-at-risk"""
+    rng = np.random.default_rng(params.seed)
+    n = params.n_paths
+
+    initial = probabilities_to_prices(params.yes_probability, 1 - params.yes_probability)
+    yes_price = np.full(n, float(initial.yes_price))
+    no_price = np.full(n, float(initial.no_price))
+    yes_supply = np.zeros(n)
+    no_supply = np.zeros(n)
+    collected = np.zeros(n)
+
+    # Each path resolves according to the market's own probability
+    resolves_yes = rng.random(n) < params.yes_probability
+
+    # Lognormal sizes with the requested mean, scaled to wei
+    mu = np.log(params.mean_trade) - params.trade_sigma ** 2 / 2
+
+    for _ in range(params.n_trades):
+        amounts = np.floor(rng.lognormal(mu, params.trade_sigma, n) * PRICE_SCALE)
+        # Informed traders back the true outcome, noise traders follow the price
+        informed = rng.random(n) < params.informed_fraction
+        noise_yes = rng.random(n) * PRICE_SCALE < yes_price
+        is_yes = np.where(informed, resolves_yes, noise_yes)
+
+        _, _, yes_price, no_price, yes_supply, no_supply = quote_mint_array(
+            yes_price, no_price, yes_supply, no_supply, amounts, is_yes, exact=False
+        )
+        # The full amount, fee included, is transferred to the pool
+        collected += amounts
+
+    payout = np.where(resolves_yes, yes_supply, no_supply)
+    shortfall = (payout - collected) / PRICE_SCALE
+    payout_at_risk = np.maximum(shortfall, 0.0)
+
+    return {
+        "params": params._asdict(),
+        "collected": _summarize(collected / PRICE_SCALE),
+        "payout": _summarize(payout / PRICE_SCALE),
+        "payout_at_risk": _summarize(payout_at_risk),
+        "shortfall_probability": float((shortfall > 0).mean()),
+        "final_yes_price": _summarize(yes_price / PRICE_SCALE),
+    }
+
+
+def simulate_markets(
+    markets: Dict[str, SimulationParams],
+    processes: Optional[int] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Simulate several markets in parallel, one process per market"""
+    market_ids = list(markets)
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        reports = executor.map(simulate_market, [markets[market_id] for market_id in market_ids])
+        return dict(zip(market_ids, reports))
+
+
+def run_sweep(
+    base: SimulationParams,
+    grid: Dict[str, List[Any]],
+    processes: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Run the cartesian product of parameter values in a process pool"""
+    names = list(grid)
+    runs = [
+        base._replace(**dict(zip(names, values)))
+        for values in itertools.product(*(grid[name] for name in names))
+    ]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(simulate_market, runs))
+
+
+def load_market_params(base: SimulationParams) -> Dict[str, SimulationParams]:
+    """Build simulation params for every active market in the database"""
+    from database import SessionLocal, Market
+
+    db = SessionLocal()
+    try:
+        rows = db.query(Market.id, Market.validation).filter(Market.status == "active").all()
+    finally:
+        db.close()
+
+    # Independent, reproducible streams per market
+    seeds = np.random.SeedSequence(base.seed).spawn(len(rows))
+    return {
+        row.id: base._replace(
+            yes_probability=row.validation["yes_probability"],
+            seed=int(seed.generate_state(1)[0]),
+        )
+        for row, seed in zip(rows, seeds)
+    }
+
+
+def parse_sweep(values: List[str]) -> Dict[str, List[Any]]:
+    """Parse --sweep name=v1,v2 arguments into a parameter grid"""
+    grid = {}
+    for value in values:
+        name, _, options = value.partition("=")
+        if name not in SimulationParams._fields:
+            raise SystemExit(f"Unknown sweep parameter: {name}")
+        cast = int if name in ("n_paths", "n_trades", "seed") else float
+        grid[name] = [cast(option) for option in options.split(",")]
+    return grid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate PMWPool payout-at-risk under random order flow")
+    parser.add_argument("--paths", type=int, default=5000, help="order-flow paths per market")
+    parser.add_argument("--trades", type=int, default=200, help="bets per path")
+    parser.add_argument("--mean-trade", type=float, default=10.0, help="mean bet size in asset units")
+    parser.add_argument("--trade-sigma", type=float, default=1.0, help="lognormal sigma of bet sizes")
+    parser.add_argument("--informed", type=float, default=0.2, help="fraction of bets on the true outcome")
+    parser.add_argument("--yes-probability", type=float, default=None,
+                        help="simulate a single market with this probability instead of the database")
+    parser.add_argument("--sweep", action="append", default=[], metavar="NAME=V1,V2",
+                        help="sweep a SimulationParams field over several values")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    base = SimulationParams(
+        yes_probability=args.yes_probability if args.yes_probability is not None else 0.5,
+        n_paths=args.paths,
+        n_trades=args.trades,
+        mean_trade=args.mean_trade,
+        trade_sigma=args.trade_sigma,
+        informed_fraction=args.informed,
+        seed=args.seed,
+    )
+
+    if args.sweep:
+        report = run_sweep(base, parse_sweep(args.sweep), args.processes)
+    elif args.yes_probability is not None:
+        report = simulate_market(base)
+    else:
+        report = simulate_markets(load_market_params(base), args.processes)
+
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
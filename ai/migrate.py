@@ -1,31 +1,232 @@
 #!/usr/bin/env python3
 """
 Database migration script for Prove Me Wrong AI services
-This script creates the necessary database tables
+This script creates the necessary database tables and applies any
+pending schema migrations, recording each one in schema_migrations.
+
+Every migration is idempotent, and backfills run in small committed
+chunks so a large table is never locked for long.
 """
 
 import os
 import sys
-from database import init_db, engine, Base
-from sqlalchemy import text
+import logging
+from datetime import datetime
+from sqlalchemy import text, inspect, select, update, bindparam, or_, Table, Column, String, MetaData
+
+from database import (
+    engine, Base, Market, MarketArchive, Resolution, ResolutionArchive, market_validation_values,
+    typed_time_values, MARKET_TIME_COLUMNS, RESOLUTION_TIME_COLUMNS, TIME_COLUMNS, SORT_KEY_COLUMNS,
+)
+from search import create_search_index, drop_rowid_search_index
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_BATCH_SIZE = int(os.getenv("MIGRATION_BATCH_SIZE", 1000))
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", String, primary_key=True),
+    Column("applied_at", String, nullable=False),
+)
+
+def add_missing_columns(model):
+    """ALTER TABLE ADD COLUMN for model columns the live table does not have yet"""
+    table = model.__table__
+    existing = {column["name"] for column in inspect(engine).get_columns(table.name)}
+    with engine.begin() as conn:
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            column_type = column.type.compile(dialect=engine.dialect)
+            conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+            logger.info(f"Added column {table.name}.{column.name}")
+
+def create_missing_indexes(model):
+    """Create indexes declared on the model that the live table does not have yet"""
+    for index in model.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+
+def drop_index_if_exists(table_name: str, index_name: str):
+    """Drop an index superseded by a newer one"""
+    existing = {index["name"] for index in inspect(engine).get_indexes(table_name)}
+    if index_name in existing:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP INDEX {index_name}"))
+        logger.info(f"Dropped index {index_name}")
+
+def backfill_time_columns(model, columns: dict, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """Fill typed time columns from their ISO strings in id-ordered chunks
+
+    Walks the table by primary key so rows whose strings cannot be parsed
+    are not selected again. Each chunk is one executemany UPDATE committed
+    in its own transaction. Returns the number of rows visited.
+    """
+    table = model.__table__
+    iso_columns = [table.c[iso_column] for iso_column in columns]
+    pending = or_(*(table.c[typed_column].is_(None) for typed_column in columns.values()))
+    statement = (
+        update(table)
+        .where(table.c.id == bindparam("row_id"))
+        .values({typed_column: bindparam(typed_column) for typed_column in columns.values()})
+    )
+    last_id = ""
+    total = 0
+
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(table.c.id, *iso_columns)
+                .where(table.c.id > last_id, pending)
+                .order_by(table.c.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                return total
+            last_id = rows[-1].id
+
+            conn.execute(statement, [
+                {
+                    "row_id": row.id,
+                    **typed_time_values(model, {iso_column: getattr(row, iso_column) for iso_column in columns})
+                }
+                for row in rows
+            ])
+            total += len(rows)
+        logger.info(f"Backfilled {total} {table.name} rows")
+
+def backfill_validation_columns(model, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """Fill the validation columns from the validation JSON in id-ordered chunks
+
+    Rows still pending have auto_expire NULL, which the backfill always
+    sets. Returns the number of rows visited.
+    """
+    table = model.__table__
+    columns = list(market_validation_values({}))
+    statement = (
+        update(table)
+        .where(table.c.id == bindparam("row_id"))
+        .values({column: bindparam(column) for column in columns})
+    )
+    last_id = ""
+    total = 0
+
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(table.c.id, table.c.validation)
+                .where(table.c.id > last_id, table.c.auto_expire.is_(None))
+                .order_by(table.c.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                return total
+            last_id = rows[-1].id
+
+            conn.execute(statement, [
+                {"row_id": row.id, **market_validation_values(row.validation)}
+                for row in rows
+            ])
+            total += len(rows)
+        logger.info(f"Backfilled validation columns for {total} {table.name} rows")
+
+def migrate_typed_time_columns():
+    """Typed DateTime copies of the ISO time strings, with status/time indexes"""
+    for model, columns in ((Market, MARKET_TIME_COLUMNS), (Resolution, RESOLUTION_TIME_COLUMNS)):
+        add_missing_columns(model)
+        backfill_time_columns(model, columns)
+        create_missing_indexes(model)
+    # Superseded by the indexes on the typed columns
+    drop_index_if_exists("markets", "ix_markets_status_close_time_iso")
+    drop_index_if_exists("resolutions", "ix_resolutions_auto_expired_resolved_at")
+
+def migrate_market_search():
+    """Full-text index over market title, prompt and description (see search.py)"""
+    with engine.begin() as conn:
+        create_search_index(conn)
+
+def migrate_market_search_ids():
+    """Key the SQLite search index on stable integer ids instead of markets.rowid"""
+    with engine.begin() as conn:
+        drop_rowid_search_index(conn)
+        create_search_index(conn)
+
+def migrate_validation_columns():
+    """Indexed columns for the validation fields the resolver filters on"""
+    for model in (Market, MarketArchive):
+        add_missing_columns(model)
+        backfill_validation_columns(model)
+        create_missing_indexes(model)
+
+def migrate_sort_keys_not_null():
+    """Give every row a pagination key: unparseable timestamps sort first instead of NULL"""
+    for model in (Market, MarketArchive, Resolution, ResolutionArchive):
+        add_missing_columns(model)
+        sort_key = SORT_KEY_COLUMNS[model]
+        columns = {iso_column: typed_column for iso_column, typed_column in TIME_COLUMNS[model].items() if typed_column == sort_key}
+        backfill_time_columns(model, columns)
+        if engine.dialect.name == "postgresql":
+            # SQLite cannot change a column's nullability in place; the writers never leave it NULL
+            with engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE {model.__tablename__} ALTER COLUMN {sort_key} SET NOT NULL"))
+
+# Applied in order; versions are never renamed or reused
+MIGRATIONS = [
+    ("0001_typed_time_columns", migrate_typed_time_columns),
+    ("0002_market_search", migrate_market_search),
+    ("0003_validation_columns", migrate_validation_columns),
+    ("0004_sort_keys_not_null", migrate_sort_keys_not_null),
+    ("0005_market_search_ids", migrate_market_search_ids),
+]
+
+def run_migrations():
+    """Apply all migrations not yet recorded in schema_migrations"""
+    schema_migrations.create(bind=engine, checkfirst=True)
+    with engine.connect() as conn:
+        applied = set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+    for version, migration in MIGRATIONS:
+        if version in applied:
+            continue
+        logger.info(f"Applying migration {version}")
+        migration()
+        try:
+            with engine.begin() as conn:
+                conn.execute(schema_migrations.insert().values(
+                    version=version,
+                    applied_at=datetime.now().isoformat()
+                ))
+        except Exception as e:
+            # Another service applied it concurrently; the steps are idempotent
+            logger.info(f"Migration {version} already recorded: {e}")
+
+    # New indexes on tables that already existed
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
 
 def main():
     """Initialize the database tables"""
     print("🚀 Initializing database tables...")
-    
+
     try:
         # Create all tables
         Base.metadata.create_all(bind=engine)
         print("✅ Database tables created successfully!")
-        
+
+        # Bring existing tables up to date
+        run_migrations()
+        print("✅ Database migrations applied successfully!")
+
         # Test connection
         with engine.connect() as conn:
             result = conn.execute(text("SELECT 1"))
             print("✅ Database connection test successful!")
-            
+
     except Exception as e:
         print(f"❌ Error initializing database: {e}")
         sys.exit(1)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
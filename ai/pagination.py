@@ -0,0 +1,73 @@
+"""
+Keyset (cursor) pagination for list endpoints
+
+Pages are ordered by an indexed (timestamp, id) key, or (rank, id) for
+search results, and continue strictly after the last row of the previous
+page, so the cost of a page does not grow with its position in the table.
+Cursors are opaque URL-safe strings encoding that key.
+"""
+
+import os
+import json
+import base64
+from datetime import datetime
+from typing import Any, List, Optional, Tuple, Union
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+from database import parse_iso_datetime
+
+DEFAULT_PAGE_LIMIT = int(os.getenv("DEFAULT_PAGE_LIMIT", 100))
+MAX_PAGE_LIMIT = int(os.getenv("MAX_PAGE_LIMIT", 1000))
+
+
+def encode_cursor(sort_value: Union[datetime, float, None], row_id: str) -> str:
+    """Opaque cursor for the position just after a row (sorted by a time or a score)"""
+    payload = json.dumps([sort_value.isoformat() if isinstance(sort_value, datetime) else sort_value, row_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Union[datetime, float, None], str]:
+    """Decode a cursor from encode_cursor, raising a 400 if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if isinstance(sort_value, str):
+            sort_value = parse_iso_datetime(sort_value)
+        elif sort_value is not None and not isinstance(sort_value, (int, float)):
+            raise ValueError(sort_value)
+        return sort_value, str(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def parse_time_filter(value: Optional[str], name: str) -> Optional[datetime]:
+    """Parse an ISO timestamp query parameter, raising a 400 if it is invalid"""
+    if value is None:
+        return None
+    parsed = parse_iso_datetime(value)
+    if parsed is None:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}: expected an ISO 8601 timestamp")
+    return parsed
+
+
+def paginate(statement, sort_column, id_column, cursor: Optional[str], limit: int):
+    """Order a select by (sort_column, id_column) and restrict it to one page
+
+    Fetches one extra row so page_results can tell whether another page
+    follows.
+    """
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        statement = statement.where(tuple_(sort_column, id_column) > tuple_(sort_value, row_id))
+    return statement.order_by(sort_column, id_column).limit(limit + 1)
+
+
+def page_results(rows: List[Any], limit: int, sort_attr: str) -> Tuple[List[Any], Optional[str]]:
+    """Trim the extra row fetched by paginate and build the next cursor"""
+    if len(rows) <= limit:
+        return list(rows), None
+    rows = list(rows[:limit])
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, sort_attr), last.id)
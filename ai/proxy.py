@@ -1,5 +1,6 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, StreamingResponse
+from starlette.background import BackgroundTask
 import httpx
 import os
 import logging
@@ -24,6 +25,58 @@ GENERATOR_URL = "http://localhost:8000"  # Generator service port
 RESOLVER_URL = "http://localhost:8001"   # Resolver service port
 COORDINATOR_URL = "http://localhost:8002"  # Coordinator agent port
 
+# Downloads and uploads that can be larger than memory or outlast a normal
+# timeout; their bodies are passed through chunk by chunk
+STREAMED_PATHS = {
+    "generator": {"markets/export", "snapshot"},
+    "resolver": {"resolutions/export"},
+}
+# No read timeout: an export keeps sending for as long as the table takes
+STREAM_TIMEOUT = httpx.Timeout(60.0, read=None)
+# Per-connection headers that must not be forwarded, and ones the proxy's server sets itself
+DROPPED_RESPONSE_HEADERS = {"connection", "keep-alive", "transfer-encoding", "te", "trailer", "upgrade", "date", "server"}
+
+async def stream_proxy(request: Request, url: str, service: str) -> StreamingResponse:
+    """Proxy a request without buffering either body
+
+    Upstream headers (Content-Type, Content-Encoding, Content-Disposition)
+    are kept and the raw, still-encoded bytes are passed through.
+    """
+    logger = logging.getLogger(__name__)
+    logger.info(f"🔀 Streaming {service}: {request.method} {url}")
+
+    headers = dict(request.headers)
+    headers.pop("host", None)  # Remove host header
+
+    client = httpx.AsyncClient(timeout=STREAM_TIMEOUT)
+    try:
+        upstream = await client.send(
+            client.build_request(
+                method=request.method,
+                url=url,
+                headers=headers,
+                content=request.stream() if request.method in ["POST", "PUT"] else None,
+                params=request.query_params
+            ),
+            stream=True
+        )
+    except Exception as e:
+        await client.aclose()
+        logger.error(f"❌ {service.capitalize()} proxy error: {e}")
+        raise
+    logger.info(f"✅ {service.capitalize()} response: {upstream.status_code}")
+
+    async def close():
+        await upstream.aclose()
+        await client.aclose()
+
+    return StreamingResponse(
+        upstream.aiter_raw(),
+        status_code=upstream.status_code,
+        headers={key: value for key, value in upstream.headers.items() if key.lower() not in DROPPED_RESPONSE_HEADERS},
+        background=BackgroundTask(close)
+    )
+
 # Updated proxy with coordinator agent support
 @app.get("/")
 async def root():
@@ -48,6 +101,8 @@ async def root():
 async def generator_proxy(request: Request, path: str):
     """Proxy requests to generator service"""
     url = f"{GENERATOR_URL}/{path}"
+    if path in STREAMED_PATHS["generator"]:
+        return await stream_proxy(request, url, "generator")
     
     # Log the request for debugging
     import logging
@@ -89,6 +144,8 @@ async def generator_proxy(request: Request, path: str):
 async def resolver_proxy(request: Request, path: str):
     """Proxy requests to resolver service"""
     url = f"{RESOLVER_URL}/{path}"
+    if path in STREAMED_PATHS["resolver"]:
+        return await stream_proxy(request, url, "resolver")
     
     # Log the request for debugging
     import logging
@@ -1,10 +1,11 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 import requests
 import json
 import os
 import re
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta
 import logging
 import asyncio
@@ -16,11 +17,26 @@ import threading
 from web3 import Web3
 from eth_account import Account
 import hashlib
+import orjson
+from sqlalchemy import event, exists, select, union, union_all
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.pool import NullPool
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from database import get_db, init_db, Resolution, SessionLocal
+from database import (
+    get_db, get_async_db, new_async_engine, init_db, batched_update, move_to_archive, upsert,
+    Market, MarketArchive, Resolution, ResolutionArchive, SessionLocal
+)
+from pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, paginate, page_results, parse_time_filter
+from serialization import compile_serializer
+from export import ndjson_export
+from response_cache import (
+    ResponseCache, response_cache, response_cache_key, cached_response, cache_json_response, conditional_response, make_etag, mark_changed
+)
+from chain_tx import TransactionSimulationError, send_transaction, suggest_fees
+from fdc_client import fdc_client
 
 # Configure logging for Railway
 logging.basicConfig(
@@ -56,6 +72,23 @@ FDC_FEE_CONFIG_ADDRESS = os.getenv("FDC_FEE_CONFIG_ADDRESS", None)
 ADMIN_PRIVATE_KEY = os.getenv("ADMIN_PRIVATE_KEY", None)
 CHAIN_ID = int(os.getenv("CHAIN_ID", 0))
 
+# Where the resolver reads markets from: "db" (shared DATABASE_URL) or "http" (generator API)
+RESOLVER_MARKET_SOURCE = os.getenv("RESOLVER_MARKET_SOURCE", "db")
+
+# Markets closing within this many days (or with high validation confidence) are resolved
+RESOLVE_WITHIN_DAYS = 3
+RESOLVE_CONFIDENCE_THRESHOLD = 0.8
+
+# Maintenance job configuration
+MAINTENANCE_INTERVAL_SECONDS = int(os.getenv("MAINTENANCE_INTERVAL_SECONDS", 300))
+MAINTENANCE_BATCH_SIZE = int(os.getenv("MAINTENANCE_BATCH_SIZE", 1000))
+# Archived resolutions move to resolutions_archive after this many days
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", 30))
+
+# Final (YES/NO) outcome cache for the FDC-facing outcome endpoint
+FINAL_OUTCOME_TTL_SECONDS = float(os.getenv("FINAL_OUTCOME_TTL_SECONDS", 60))
+FINAL_OUTCOME_MAX_ENTRIES = int(os.getenv("FINAL_OUTCOME_MAX_ENTRIES", 100000))
+
 # Database storage for resolutions (replaces file storage)
 
 # Constants for file storage (kept for compatibility)
@@ -88,6 +121,9 @@ class ResolutionResult(BaseModel):
     resolved_at: str
     auto_expired: bool = False
 
+# Row -> ResolutionResult.dict() without re-validating stored resolutions
+serialize_resolution = compile_serializer(ResolutionResult)
+
 class ResolutionResponse(BaseModel):
     success: bool
     resolution: Optional[ResolutionResult] = None
@@ -271,66 +307,12 @@ def get_request_attestation_abi():
 def prepare_fdc_request(
     url: str
 ) -> Optional[str]:
-    """Prepare a request for the Flare FDC"""
-    
-    try:
-        body = {
-            "attestationType": "0x494a736f6e417069000000000000000000000000000000000000000000000000",
-            "sourceId": "0x5745423200000000000000000000000000000000000000000000000000000000",
-            "requestBody": {
-                "url": url,
-                "postprocessJq": ".",
-                "abi_signature": "{\"components\": [{\"internalType\": \"uint256\",\"name\": \"outcome\",\"type\": \"uint256\"}],\"name\": \"task\",\"type\": \"tuple\"}"
-            }
-        }
+    """Prepare a request for the Flare FDC (cached per URL)"""
+    return fdc_client.prepare_request(url)
 
-        response = requests.post(
-            "https://jq-verifier-test.flare.rocks/JsonApi/prepareRequest",
-            headers={
-                "X-API-KEY": "flare-oxford-2025",
-                "Content-Type": "application/json"
-            },
-            json=body
-        )
-        
-        if not response.ok:
-            logger.error(f"FDC request failed with status: {response.status_code}")
-            return None
-        
-        data = response.json()
-        if data.get("status") != "VALID":
-            logger.error(f"FDC request returned invalid status: {data.get('status')}")
-            return None
-        
-        return data.get("abiEncodedRequest")
-        
-    except Exception as e:
-        logger.error(f"Error preparing FDC request: {e}")
-        return None
-
-def get_fdc_proof(voting_round_id: int, request_bytes: str) -> Optional[str]:
-    try:
-        response = requests.post(
-            "https://ctn2-data-availability.flare.network/api/v1/fdc/proof-by-request-round",
-            headers={
-                "X-API-KEY": "flare-oxford-2025",
-                "Content-Type": "application/json"
-            },
-            json={
-                "votingRoundId": voting_round_id,
-                "requestBytes": request_bytes
-            }
-        )
-
-        if not response.ok:
-            logger.error(f"FDC proof request failed with status: {response.status_code}")
-            return None
-        
-        data = response.json()
-        return data
-    except Exception as e:
-        logger.error(f"Error getting FDC proof: {e}")
-        return None
+def get_fdc_proof(voting_round_id: int, request_bytes: str, market_id: Optional[str] = None) -> Optional[str]:
+    """Get the FDC proof for a request, fetching it from the DA layer only once"""
+    return fdc_client.get_proof(voting_round_id, request_bytes, market_id)
 
 def resolve_market_onchain(market_id: str, url: str) -> bool:
     """Resolve a market on the blockchain using admin wallet"""
@@ -368,10 +350,7 @@ def resolve_market_onchain(market_id: str, url: str) -> bool:
             logger.error("Failed to prepare FDC request")
             return False
 
-        request_fee = w3.eth.contract(
-            address=Web3.to_checksum_address(FDC_FEE_CONFIG_ADDRESS), 
-            abi=get_request_fee_abi()
-        ).functions.getRequestFee(encoded_request).call()
+        request_fee = fdc_client.get_request_fee(w3, FDC_FEE_CONFIG_ADDRESS, get_request_fee_abi(), encoded_request)
         logger.info(f"Request fee: {request_fee}")
 
         attestation_tx = w3.eth.contract(
@@ -380,15 +359,16 @@ def resolve_market_onchain(market_id: str, url: str) -> bool:
         ).functions.requestAttestation(encoded_request).build_transaction({
             'from': account.address,
             'gas': 500000,  # Adjust gas limit as needed
-            'gasPrice': w3.eth.gas_price,
-            'nonce': w3.eth.get_transaction_count(account.address),
+            'nonce': w3.eth.get_transaction_count(account.address, 'pending'),
             'chainId': CHAIN_ID,
-            'value': request_fee
+            'value': request_fee,
+            **suggest_fees(w3)
         })
 
-        signed_attestation_txn = w3.eth.account.sign_transaction(attestation_tx, ADMIN_PRIVATE_KEY)
-        attestation_tx_hash = w3.eth.send_raw_transaction(signed_attestation_txn.rawTransaction)
-        attestation_receipt = w3.eth.wait_for_transaction_receipt(attestation_tx_hash)
+        # Rejects attestation requests that would revert (e.g. insufficient fee) before signing,
+        # and speeds the transaction up if it is not mined promptly
+        attestation_receipt = send_transaction(w3, attestation_tx, ADMIN_PRIVATE_KEY)
+        attestation_tx_hash = attestation_receipt['transactionHash']
         block_number = attestation_receipt.get('blockNumber')
         # Get block details to extract timestamp
         block = w3.eth.get_block(block_number)
@@ -409,7 +389,7 @@ def resolve_market_onchain(market_id: str, url: str) -> bool:
 
         time.sleep(150)
 
-        proof = get_fdc_proof(voting_round_id, encoded_request)
+        proof = get_fdc_proof(voting_round_id, encoded_request, market_id)
         if not proof:
             logger.error("Failed to get FDC proof")
             return False
@@ -417,6 +397,9 @@ def resolve_market_onchain(market_id: str, url: str) -> bool:
         logger.info(f"FDC proof: {proof}")
 
         return True
+    except TransactionSimulationError as e:
+        logger.error(f"Attestation request rejected by pre-flight simulation: {e.reason}")
+        return False
     except Exception as e:
         logger.error(f"Error resolving market on blockchain: {e}")
         return False
@@ -438,105 +421,268 @@ def load_resolutions() -> Dict[str, ResolutionResult]:
     active_file = os.path.join(RESOLUTIONS_DIR, ACTIVE_RESOLUTIONS_FILE)
     archived_file = os.path.join(RESOLUTIONS_DIR, ARCHIVED_RESOLUTIONS_FILE)
 
+def to_resolution_result(db_resolution) -> ResolutionResult:
+    """ResolutionResult for a hot or archived resolution row"""
+    return ResolutionResult(
+        market_id=db_resolution.market_id,
+        outcome=db_resolution.outcome,
+        confidence=db_resolution.confidence,
+        reasoning=db_resolution.reasoning,
+        evidence_sources=db_resolution.evidence_sources,
+        resolved_at=db_resolution.resolved_at,
+        auto_expired=db_resolution.auto_expired
+    )
+
 def load_resolutions_from_db(db: Session) -> Dict[str, ResolutionResult]:
-    """Load resolutions from database"""
+    """Load resolutions from database, including the archive table"""
     resolutions = {}
     try:
-        db_resolutions = db.query(Resolution).all()
-        for db_resolution in db_resolutions:
-            resolution_data = {
-                "market_id": db_resolution.market_id,
-                "outcome": db_resolution.outcome,
-                "confidence": db_resolution.confidence,
-                "reasoning": db_resolution.reasoning,
-                "evidence_sources": db_resolution.evidence_sources,
-                "resolved_at": db_resolution.resolved_at,
-                "auto_expired": db_resolution.auto_expired
-            }
-            resolutions[db_resolution.market_id] = ResolutionResult(**resolution_data)
+        # Hot rows last, so they win over an archived copy
+        for model in (ResolutionArchive, Resolution):
+            for db_resolution in db.query(model).all():
+                resolutions[db_resolution.market_id] = to_resolution_result(db_resolution)
     except Exception as e:
         logger.error(f"Error loading resolutions from database: {e}")
     
     return resolutions
 
-def save_resolution_to_db(db: Session, resolution: ResolutionResult):
-    """Save resolution to database"""
-    try:
-        db_resolution = Resolution(
-            id=resolution.market_id,  # Use market_id as the primary key
-            market_id=resolution.market_id,
-            outcome=resolution.outcome,
-            confidence=resolution.confidence,
-            reasoning=resolution.reasoning,
-            evidence_sources=resolution.evidence_sources,
-            resolved_at=resolution.resolved_at,
-            auto_expired=resolution.auto_expired
-        )
-        
-        # Check if resolution exists
-        existing_resolution = db.query(Resolution).filter(Resolution.market_id == resolution.market_id).first()
-        if existing_resolution:
-            # Update existing resolution
-            existing_resolution.outcome = resolution.outcome
-            existing_resolution.confidence = resolution.confidence
-            existing_resolution.reasoning = resolution.reasoning
-            existing_resolution.evidence_sources = resolution.evidence_sources
-            existing_resolution.resolved_at = resolution.resolved_at
-            existing_resolution.auto_expired = resolution.auto_expired
+def load_resolution_from_db(db: Session, market_id: str) -> Optional[ResolutionResult]:
+    """A market's resolution from the hot or archive table"""
+    db_resolution = find_resolution(db, market_id)
+    return to_resolution_result(db_resolution) if db_resolution else None
+
+# Encoded /resolutions/{id}/outcome responses (body, ETag) for YES/NO
+FINAL_OUTCOME_RESPONSES = {
+    outcome: (body, make_etag(body))
+    for outcome, body in (("YES", orjson.dumps({"outcome": 1})), ("NO", orjson.dumps({"outcome": 0})))
+}
+
+# market_id -> entry of FINAL_OUTCOME_RESPONSES. FDC verifiers poll the
+# outcome endpoint many times per voting round, and a YES/NO outcome only
+# changes on a forced re-resolution. Writers in this process replace or
+# drop entries on commit (see remember_outcomes); the TTL bounds how long
+# a change made by another process (another worker, a snapshot replace)
+# can go unseen, and the LRU bound keeps memory flat as markets accumulate.
+final_outcomes = ResponseCache(ttl=FINAL_OUTCOME_TTL_SECONDS, max_entries=FINAL_OUTCOME_MAX_ENTRIES)
+
+def remember_outcomes(db: Session, outcomes: Dict[str, str]):
+    """Update final_outcomes with market_id -> outcome once the session commits"""
+    session = getattr(db, "sync_session", db)
+    session.info.setdefault("resolved_outcomes", {}).update(outcomes)
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed_outcomes(session: Session):
+    for market_id, outcome in session.info.pop("resolved_outcomes", {}).items():
+        if outcome in FINAL_OUTCOME_RESPONSES:
+            final_outcomes.set(market_id, (), *FINAL_OUTCOME_RESPONSES[outcome])
         else:
-            # Add new resolution
-            db.add(db_resolution)
-        
-        db.commit()
-        logger.info(f"Saved resolution to database: {resolution.market_id}")
+            final_outcomes.discard(market_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_outcomes(session: Session):
+    session.info.pop("resolved_outcomes", None)
+
+def resolution_row(resolution: ResolutionResult) -> Dict[str, Any]:
+    """Column values for a resolution (market_id is the primary key)"""
+    return {
+        "id": resolution.market_id,
+        "market_id": resolution.market_id,
+        "outcome": resolution.outcome,
+        "confidence": resolution.confidence,
+        "reasoning": resolution.reasoning,
+        "evidence_sources": resolution.evidence_sources,
+        "resolved_at": resolution.resolved_at,
+        "auto_expired": resolution.auto_expired
+    }
+
+def save_resolutions_to_db(db: Session, resolutions: List[ResolutionResult], commit: bool = True):
+    """Insert or update resolutions with one upsert, committing them together
+
+    With commit=False the write joins the session's open transaction, so a
+    caller can save more resolutions and commit once.
+    """
+    try:
+        upsert(db, Resolution, [resolution_row(resolution) for resolution in resolutions])
+        mark_changed(db, "resolutions", *(f"resolution:{resolution.market_id}" for resolution in resolutions))
+        remember_outcomes(db, {resolution.market_id: resolution.outcome for resolution in resolutions})
+        if commit:
+            db.commit()
+        logger.info(f"Saved {len(resolutions)} resolutions to database")
     except Exception as e:
         db.rollback()
-        logger.error(f"Error saving resolution to database: {e}")
+        logger.error(f"Error saving resolutions to database: {e}")
         raise
 
-def archive_old_resolutions_db(db: Session, days_old: int = 30):
+def save_resolution_to_db(db: Session, resolution: ResolutionResult, commit: bool = True):
+    """Save a single resolution to the database (see save_resolutions_to_db)"""
+    save_resolutions_to_db(db, [resolution], commit)
+
+def archive_old_resolutions_db(db: Session, days_old: int = 30) -> int:
     """Move old resolutions to archived status in database"""
-    current_time = datetime.now()
-    cutoff_time = current_time - timedelta(days=days_old)
-    updated = False
+    cutoff_time = datetime.now() - timedelta(days=days_old)
     
     try:
-        active_resolutions = db.query(Resolution).filter(Resolution.auto_expired == False).all()
-        for db_resolution in active_resolutions:
-            try:
-                resolved_time = datetime.fromisoformat(db_resolution.resolved_at.replace('Z', '+00:00'))
-                if resolved_time <= cutoff_time:
-                    db_resolution.auto_expired = True
-                    updated = True
-                    logger.info(f"Archived old resolution for market: {db_resolution.market_id}")
-            except Exception as e:
-                logger.error(f"Error checking resolution age: {e}")
-        
-        if updated:
-            db.commit()
+        archived = batched_update(
+            db,
+            Resolution,
+            (Resolution.auto_expired == False) & (Resolution.resolved_time <= cutoff_time),
+            {"auto_expired": True},
+            batch_size=MAINTENANCE_BATCH_SIZE
+        )
+        if archived:
+            # Bulk UPDATEs carry no per-row tags, so drop every cached resolution
+            response_cache.bump(["resolutions", "resolution_details"])
+            logger.info(f"Archived {archived} old resolutions")
+        return archived
     except Exception as e:
         db.rollback()
         logger.error(f"Error archiving old resolutions: {e}")
-    
-    return updated
+        return 0
 
 def get_markets_from_generator() -> Dict[str, MarketData]:
-    """Get markets from the generator API"""
+    """Get markets from the generator API, following its pagination cursors"""
     try:
-        response = requests.get(f"{GENERATOR_API_URL}/markets")
-        if response.status_code == 200:
+        markets = {}
+        params = {"limit": MAX_PAGE_LIMIT}
+        while True:
+            response = requests.get(f"{GENERATOR_API_URL}/markets", params=params)
+            if response.status_code != 200:
+                logger.error(f"Failed to get markets from generator: {response.status_code}")
+                return {}
             data = response.json()
-            markets = {}
             for market_data in data.get("markets", []):
                 markets[market_data["id"]] = MarketData(**market_data)
-            return markets
-        else:
-            logger.error(f"Failed to get markets from generator: {response.status_code}")
-            return {}
+            if not data.get("next_cursor"):
+                return markets
+            params["cursor"] = data["next_cursor"]
     except Exception as e:
         logger.error(f"Error getting markets from generator: {e}")
         return {}
 
+def is_market_due(market: MarketData) -> bool:
+    """Whether a market is close enough to its resolution date (or confident enough) to resolve"""
+    close_time = datetime.fromisoformat(market.close_time_iso.replace('Z', '+00:00'))
+    days_until_close = (close_time - datetime.now()).days
+    return days_until_close <= RESOLVE_WITHIN_DAYS or market.validation.get("confidence", 0) > RESOLVE_CONFIDENCE_THRESHOLD
+
+class MarketSource:
+    """Where the resolver reads markets from
+
+    The async methods are called from the endpoints with their AsyncSession;
+    database reads go through run_sync and HTTP calls through the threadpool,
+    so neither blocks the event loop.
+    """
+
+    async def get_market(self, db: AsyncSession, market_id: str) -> Optional[MarketData]:
+        raise NotImplementedError
+
+    async def get_due_markets(self, db: AsyncSession) -> Dict[str, MarketData]:
+        """Unresolved markets that are due for resolution"""
+        raise NotImplementedError
+
+    def count_markets(self, db: Session) -> int:
+        raise NotImplementedError
+
+class DatabaseMarketSource(MarketSource):
+    """Reads markets from the database shared with the generator"""
+
+    @staticmethod
+    def to_market_data(db_market) -> MarketData:
+        """MarketData from a Market or a row with its columns"""
+        return MarketData(
+            id=db_market.id,
+            title=db_market.title,
+            description=db_market.description,
+            prompt=db_market.prompt,
+            close_time_iso=db_market.close_time_iso,
+            outcomes=db_market.outcomes,
+            initial_prob=db_market.initial_prob,
+            validation=db_market.validation,
+            created_at=db_market.created_at,
+            status=db_market.status
+        )
+
+    def load_market(self, db: Session, market_id: str) -> Optional[MarketData]:
+        # Archived markets stay resolvable (and their resolutions readable) like in the generator
+        db_market = db.get(Market, market_id) or db.get(MarketArchive, market_id)
+        return self.to_market_data(db_market) if db_market else None
+
+    async def get_market(self, db: AsyncSession, market_id: str) -> Optional[MarketData]:
+        return await db.run_sync(self.load_market, market_id)
+
+    @staticmethod
+    def due_markets_statement():
+        """Select of unresolved markets that are due for resolution"""
+        # A union of two range scans, one on the close_time index and one on
+        # the confidence index (an OR of the two would walk a whole index),
+        # each anti-joined on the resolutions primary keys, hot and archived
+        # (resolutions are keyed by market ID). Selects plain rows of the
+        # MarketData columns, without ORM instances, and no ORDER BY: callers
+        # key the result by market ID.
+        due_before = datetime.now() + timedelta(days=RESOLVE_WITHIN_DAYS + 1)
+        unresolved = (
+            ~exists().where(Resolution.id == Market.id),
+            ~exists().where(ResolutionArchive.id == Market.id),
+        )
+        due_ids = union(
+            select(Market.id).where(Market.close_time < due_before, *unresolved),
+            select(Market.id).where(Market.confidence > RESOLVE_CONFIDENCE_THRESHOLD, *unresolved),
+        ).subquery()
+        return (
+            select(*(Market.__table__.c[field] for field in MarketData.model_fields))
+            .join(due_ids, Market.id == due_ids.c.id)
+        )
+
+    def load_due_markets(self, db: Session) -> Dict[str, MarketData]:
+        return {row.id: self.to_market_data(row) for row in db.execute(self.due_markets_statement())}
+
+    async def get_due_markets(self, db: AsyncSession) -> Dict[str, MarketData]:
+        return await db.run_sync(self.load_due_markets)
+
+    def count_markets(self, db: Session) -> int:
+        return db.query(Market).count()
+
+def resolved_market_ids(db: Session) -> set:
+    """IDs of markets with a resolution, hot or archived"""
+    return set(db.scalars(union_all(select(Resolution.id), select(ResolutionArchive.id))))
+
+class HttpMarketSource(MarketSource):
+    """Reads markets from the generator API, for deployments without a shared database"""
+
+    @staticmethod
+    def fetch_market(market_id: str) -> Optional[MarketData]:
+        try:
+            response = requests.get(f"{GENERATOR_API_URL}/markets/{market_id}")
+            if response.status_code == 200:
+                return MarketData(**response.json())
+            if response.status_code != 404:
+                logger.error(f"Failed to get market from generator: {response.status_code}")
+        except Exception as e:
+            logger.error(f"Error getting market from generator: {e}")
+        return None
+
+    async def get_market(self, db: AsyncSession, market_id: str) -> Optional[MarketData]:
+        return await run_in_threadpool(self.fetch_market, market_id)
+
+    async def get_due_markets(self, db: AsyncSession) -> Dict[str, MarketData]:
+        markets = await run_in_threadpool(get_markets_from_generator)
+        resolved = await db.run_sync(resolved_market_ids)
+        due = {}
+        for market_id, market in markets.items():
+            if market_id in resolved:
+                continue
+            try:
+                if is_market_due(market):
+                    due[market_id] = market
+            except ValueError as e:
+                logger.error(f"Invalid close time for market {market_id}: {e}")
+        return due
+
+    def count_markets(self, db: Session) -> int:
+        return len(get_markets_from_generator())
+
+market_source: MarketSource = HttpMarketSource() if RESOLVER_MARKET_SOURCE == "http" else DatabaseMarketSource()
+
 async def search_for_evidence(market: MarketData) -> List[Dict[str, Any]]:
     """Search for evidence about the market outcome"""
     
@@ -574,7 +720,8 @@ async def search_for_evidence(market: MarketData) -> List[Dict[str, Any]]:
     """
     
     try:
-        response = requests.post(
+        response = await run_in_threadpool(
+            requests.post,
             ASI_API_URL,
             headers=get_asi_headers(),
             json={
@@ -684,7 +831,8 @@ async def analyze_outcome(market: MarketData, evidence_sources: List[Dict[str, A
     """
     
     try:
-        response = requests.post(
+        response = await run_in_threadpool(
+            requests.post,
             ASI_API_URL,
             headers=get_asi_headers(),
             json={
@@ -770,7 +918,7 @@ def check_auto_expiration(market: MarketData) -> bool:
         return False
 
 @app.post("/resolve", response_model=ResolutionResponse)
-async def resolve_market(request: ResolutionRequest, db: Session = Depends(get_db)):
+async def resolve_market(request: ResolutionRequest, db: AsyncSession = Depends(get_async_db)):
     """Resolve a specific market"""
     
     if not ASI_API_KEY:
@@ -779,23 +927,20 @@ async def resolve_market(request: ResolutionRequest, db: Session = Depends(get_d
     try:
         logger.info(f"Resolving market: {request.market_id}")
         
-        # Get markets from generator
-        markets = get_markets_from_generator()
+        market = await market_source.get_market(db, request.market_id)
         
-        if request.market_id not in markets:
+        if market is None:
             return ResolutionResponse(
                 success=False,
                 error="Market not found"
             )
         
-        market = markets[request.market_id]
-        
         # Check if already resolved
-        resolutions = load_resolutions_from_db(db)
-        if request.market_id in resolutions and not request.force_resolve:
+        existing = await db.run_sync(load_resolution_from_db, request.market_id)
+        if existing and not request.force_resolve:
             return ResolutionResponse(
                 success=True,
-                resolution=resolutions[request.market_id]
+                resolution=existing
             )
         
         # Check for auto-expiration
@@ -818,12 +963,12 @@ async def resolve_market(request: ResolutionRequest, db: Session = Depends(get_d
             resolution = await analyze_outcome(market, evidence_sources)
         
         # Store resolution in database
-        save_resolution_to_db(db, resolution)
+        await db.run_sync(save_resolution_to_db, resolution)
 
         url = f"{RESOLUTIONS_API_URL}/resolver/resolutions/{market.id}/outcome"
 
         # Resolve the market onchain
-        resolve_market_onchain(market.id, url)  
+        await run_in_threadpool(resolve_market_onchain, market.id, url)
         
         logger.info(f"Market resolved: {resolution.outcome} (confidence: {resolution.confidence})")
         
@@ -840,7 +985,7 @@ async def resolve_market(request: ResolutionRequest, db: Session = Depends(get_d
         )
 
 @app.post("/resolve-all")
-async def resolve_all_markets(db: Session = Depends(get_db)):
+async def resolve_all_markets(db: AsyncSession = Depends(get_async_db)):
     """Resolve all active markets (for cron job)"""
     
     if not ASI_API_KEY:
@@ -849,70 +994,67 @@ async def resolve_all_markets(db: Session = Depends(get_db)):
     try:
         logger.info("Starting batch resolution of all markets")
         
-        # Get markets from generator
-        markets = get_markets_from_generator()
-        resolutions = load_resolutions_from_db(db)
+        # Unresolved markets that are due, from the configured market source
+        markets = await market_source.get_due_markets(db)
         
         results = []
         
+        # Auto-expire first, committed together as one batch before any
+        # YES/NO resolution, so a failure below cannot roll them back
+        expired = [
+            ResolutionResult(
+                market_id=market.id,
+                outcome="NO",
+                confidence=1.0,
+                reasoning="Market expired without definitive outcome",
+                evidence_sources=[],
+                resolved_at=datetime.now().isoformat(),
+                auto_expired=True
+            )
+            for market in markets.values()
+            if check_auto_expiration(market)
+        ]
+        if expired:
+            await db.run_sync(save_resolutions_to_db, expired)
+            results.extend({"market_id": resolution.market_id, "outcome": "EXPIRED", "auto_expired": True} for resolution in expired)
+        expired_ids = {resolution.market_id for resolution in expired}
+        
         for market_id, market in markets.items():
-            # Skip if already resolved
-            if market_id in resolutions:
-                continue
-            
-            # Check for auto-expiration first
-            if check_auto_expiration(market):
-                resolution = ResolutionResult(
-                    market_id=market.id,
-                    outcome="NO",
-                    confidence=1.0,
-                    reasoning="Market expired without definitive outcome",
-                    evidence_sources=[],
-                    resolved_at=datetime.now().isoformat(),
-                    auto_expired=True
-                )
-                save_resolution_to_db(db, resolution)
-                results.append({"market_id": market_id, "outcome": "EXPIRED", "auto_expired": True})
+            if market_id in expired_ids:
                 continue
             
-            # Only resolve markets that are close to their resolution date or have high probability of resolution
-            close_time = datetime.fromisoformat(market.close_time_iso.replace('Z', '+00:00'))
-            days_until_close = (close_time - datetime.now()).days
-            
-            # Resolve if close date is within 3 days or if it's a high-profile market
-            if days_until_close <= 3 or market.validation.get("confidence", 0) > 0.8:
-                try:
-                    evidence_sources = await search_for_evidence(market)
-                    resolution = await analyze_outcome(market, evidence_sources)
+            try:
+                evidence_sources = await search_for_evidence(market)
+                resolution = await analyze_outcome(market, evidence_sources)
 
-                    url = f"{RESOLUTIONS_API_URL}/resolver/resolutions/{market_id}/outcome"
+                url = f"{RESOLUTIONS_API_URL}/resolver/resolutions/{market_id}/outcome"
+                
+                if resolution.outcome in ["YES", "NO"]:
+                    # Committed now: the FDC verifiers read it back from the outcome URL
+                    await db.run_sync(save_resolution_to_db, resolution)
                     
-                    if resolution.outcome in ["YES", "NO"]:
-                        save_resolution_to_db(db, resolution)
-
-                        resolutions[market_id] = resolution
-                        
-                        results.append({
-                            "market_id": market_id, 
-                            "outcome": resolution.outcome, 
-                            "confidence": resolution.confidence
-                        })
-
-                        # Resolve the market onchain
-                        resolve_market_onchain(market_id, url)                        
-                    else:
-                        results.append({
-                            "market_id": market_id, 
-                            "outcome": "INSUFFICIENT_EVIDENCE"
-                        })
-                except Exception as e:
-                    logger.error(f"Error resolving market {market_id}: {e}")
                     results.append({
                         "market_id": market_id, 
-                        "outcome": "ERROR", 
-                        "error": str(e)
+                        "outcome": resolution.outcome, 
+                        "confidence": resolution.confidence
+                    })
+
+                    # Resolve the market onchain
+                    await run_in_threadpool(resolve_market_onchain, market_id, url)                        
+                else:
+                    results.append({
+                        "market_id": market_id, 
+                        "outcome": "INSUFFICIENT_EVIDENCE"
                     })
+            except Exception as e:
+                logger.error(f"Error resolving market {market_id}: {e}")
+                results.append({
+                    "market_id": market_id, 
+                    "outcome": "ERROR", 
+                    "error": str(e)
+                })
         
+        await db.commit()
         logger.info(f"Batch resolution complete. Processed {len(results)} markets")
         
         return {
@@ -929,10 +1071,10 @@ async def resolve_all_markets(db: Session = Depends(get_db)):
         }
 
 @app.post("/archive-old")
-async def archive_old_resolutions_endpoint(days_old: int = 30, db: Session = Depends(get_db)):
+async def archive_old_resolutions_endpoint(days_old: int = 30, db: AsyncSession = Depends(get_async_db)):
     """Manually trigger archiving of old resolutions"""
     try:
-        updated = archive_old_resolutions_db(db, days_old)
+        updated = await db.run_sync(archive_old_resolutions_db, days_old)
         return {
             "success": True,
             "message": f"Archived {updated} old resolutions" if updated else "No old resolutions to archive",
@@ -943,82 +1085,176 @@ async def archive_old_resolutions_endpoint(days_old: int = 30, db: Session = Dep
         logger.error(f"Error archiving old resolutions: {e}")
         raise HTTPException(status_code=500, detail=f"Error archiving resolutions: {str(e)}")
 
+def resolution_page_statement(
+    statement,
+    cursor: Optional[str],
+    limit: int,
+    outcome: Optional[str] = None,
+    resolved_before: Optional[str] = None,
+    resolved_after: Optional[str] = None,
+    model=Resolution
+):
+    """Apply list filters and keyset pagination (by resolution time) to a resolution select"""
+    resolved_before = parse_time_filter(resolved_before, "resolved_before")
+    resolved_after = parse_time_filter(resolved_after, "resolved_after")
+    
+    if outcome:
+        statement = statement.where(model.outcome == outcome.upper())
+    if resolved_before:
+        statement = statement.where(model.resolved_time < resolved_before)
+    if resolved_after:
+        statement = statement.where(model.resolved_time > resolved_after)
+    return paginate(statement, model.resolved_time, model.id, cursor, limit)
+
+def all_resolutions_page_statement(cursor: Optional[str], limit: int, archived_only: bool = False, **filters):
+    """One page over resolutions and resolutions_archive together, by resolution time
+
+    Each table is paginated on its own index and only the two pages are
+    merged.
+    """
+    pages = []
+    for model in (Resolution, ResolutionArchive):
+        statement = select(*model.__table__.columns)
+        if archived_only:
+            statement = statement.where(model.auto_expired == True)
+        page = resolution_page_statement(statement, cursor, limit, model=model, **filters)
+        pages.append(select(page.subquery()))
+    resolutions = union_all(*pages).subquery()
+    return select(resolutions).order_by(resolutions.c.resolved_time, resolutions.c.id).limit(limit + 1)
+
+def find_resolution(db: Session, market_id: str):
+    """A market's resolution from the hot table, or from the archive"""
+    return (
+        db.query(Resolution).filter(Resolution.market_id == market_id).first()
+        or db.query(ResolutionArchive).filter(ResolutionArchive.market_id == market_id).first()
+    )
+
 @app.get("/resolutions")
-def list_resolutions(db: Session = Depends(get_db)):
-    """List all resolved markets"""
-    resolutions = load_resolutions_from_db(db)
-    return {
+def list_resolutions(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    outcome: Optional[str] = None,
+    resolved_before: Optional[str] = None,
+    resolved_after: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """List resolved markets, one page at a time"""
+    cache_key = response_cache_key(request)
+    cached = cached_response(request, cache_key)
+    if cached is not None:
+        return cached
+    versions = response_cache.versions(["resolutions"])
+    statement = all_resolutions_page_statement(
+        cursor, limit,
+        outcome=outcome, resolved_before=resolved_before, resolved_after=resolved_after
+    )
+    db_resolutions, next_cursor = page_results(db.execute(statement).all(), limit, "resolved_time")
+    resolutions = [serialize_resolution(db_resolution) for db_resolution in db_resolutions]
+    return cache_json_response(request, cache_key, versions, {
         "total": len(resolutions),
-        "resolutions": [resolution.dict() for resolution in resolutions.values()]
-    }
+        "resolutions": resolutions,
+        "next_cursor": next_cursor
+    })
 
 @app.get("/resolutions/active")
-async def get_active_resolutions(db: Session = Depends(get_db)):
+async def get_active_resolutions(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    outcome: Optional[str] = None,
+    resolved_before: Optional[str] = None,
+    resolved_after: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
     """Get only active resolutions (not auto-expired)"""
+    cache_key = response_cache_key(request)
+    cached = cached_response(request, cache_key)
+    if cached is not None:
+        return cached
+    versions = response_cache.versions(["resolutions"])
+    statement = resolution_page_statement(
+        select(Resolution).where(Resolution.auto_expired == False),
+        cursor, limit,
+        outcome=outcome, resolved_before=resolved_before, resolved_after=resolved_after
+    )
     try:
-        db_resolutions = db.query(Resolution).filter(Resolution.auto_expired == False).all()
-        resolutions = []
-        for db_resolution in db_resolutions:
-            resolution_data = ResolutionResult(
-                market_id=db_resolution.market_id,
-                outcome=db_resolution.outcome,
-                confidence=db_resolution.confidence,
-                reasoning=db_resolution.reasoning,
-                evidence_sources=db_resolution.evidence_sources,
-                resolved_at=db_resolution.resolved_at,
-                auto_expired=db_resolution.auto_expired
-            )
-            resolutions.append(resolution_data)
+        db_resolutions, next_cursor = page_results(
+            (await db.scalars(statement)).all(), limit, "resolved_time"
+        )
+        resolutions = [serialize_resolution(db_resolution) for db_resolution in db_resolutions]
         
-        return {
+        return cache_json_response(request, cache_key, versions, {
             "total": len(resolutions),
-            "resolutions": resolutions
-        }
+            "resolutions": resolutions,
+            "next_cursor": next_cursor
+        })
     except Exception as e:
         logger.error(f"Error getting active resolutions: {e}")
         raise HTTPException(status_code=500, detail=f"Error loading resolutions: {str(e)}")
 
 @app.get("/resolutions/archived")
-async def get_archived_resolutions(db: Session = Depends(get_db)):
+async def get_archived_resolutions(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    outcome: Optional[str] = None,
+    resolved_before: Optional[str] = None,
+    resolved_after: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
     """Get only archived resolutions (auto-expired)"""
+    cache_key = response_cache_key(request)
+    cached = cached_response(request, cache_key)
+    if cached is not None:
+        return cached
+    versions = response_cache.versions(["resolutions"])
+    statement = all_resolutions_page_statement(
+        cursor, limit, archived_only=True,
+        outcome=outcome, resolved_before=resolved_before, resolved_after=resolved_after
+    )
     try:
-        db_resolutions = db.query(Resolution).filter(Resolution.auto_expired == True).all()
-        resolutions = []
-        for db_resolution in db_resolutions:
-            resolution_data = ResolutionResult(
-                market_id=db_resolution.market_id,
-                outcome=db_resolution.outcome,
-                confidence=db_resolution.confidence,
-                reasoning=db_resolution.reasoning,
-                evidence_sources=db_resolution.evidence_sources,
-                resolved_at=db_resolution.resolved_at,
-                auto_expired=db_resolution.auto_expired
-            )
-            resolutions.append(resolution_data)
+        db_resolutions, next_cursor = page_results(
+            (await db.execute(statement)).all(), limit, "resolved_time"
+        )
+        resolutions = [serialize_resolution(db_resolution) for db_resolution in db_resolutions]
         
-        return {
+        return cache_json_response(request, cache_key, versions, {
             "total": len(resolutions),
-            "resolutions": resolutions
-        }
+            "resolutions": resolutions,
+            "next_cursor": next_cursor
+        })
     except Exception as e:
         logger.error(f"Error getting archived resolutions: {e}")
         raise HTTPException(status_code=500, detail=f"Error loading resolutions: {str(e)}")
 
+@app.get("/resolutions/export")
+def export_resolutions(outcome: Optional[str] = None, compress: Optional[str] = None):
+    """Stream every resolution as NDJSON (one ResolutionResult object per line)
+
+    Hot resolutions come first, then archived ones, each in id order.
+    ?compress=gzip returns a gzipped .ndjson.gz download.
+    """
+    statements = []
+    for model in (Resolution, ResolutionArchive):
+        statement = select(*model.__table__.columns).order_by(model.id)
+        if outcome:
+            statement = statement.where(model.outcome == outcome.upper())
+        statements.append(statement)
+    return ndjson_export(statements, serialize_resolution, "resolutions", compress)
+
 @app.get("/resolutions/{market_id}")
-def get_resolution(market_id: str, db: Session = Depends(get_db)):
+def get_resolution(market_id: str, request: Request, db: Session = Depends(get_db)):
     """Get a specific resolution by market ID"""
-    db_resolution = db.query(Resolution).filter(Resolution.market_id == market_id).first()
+    cache_key = response_cache_key(request)
+    cached = cached_response(request, cache_key)
+    if cached is not None:
+        return cached
+    versions = response_cache.versions([f"resolution:{market_id}", "resolution_details"])
+    
+    db_resolution = find_resolution(db, market_id)
     if db_resolution:
-        resolution_data = ResolutionResult(
-            market_id=db_resolution.market_id,
-            outcome=db_resolution.outcome,
-            confidence=db_resolution.confidence,
-            reasoning=db_resolution.reasoning,
-            evidence_sources=db_resolution.evidence_sources,
-            resolved_at=db_resolution.resolved_at,
-            auto_expired=db_resolution.auto_expired
-        )
-        return resolution_data
+        return cache_json_response(request, cache_key, versions, serialize_resolution(db_resolution))
     raise HTTPException(status_code=404, detail="Resolution not found")
 
 @app.post("/resolutions/{market_id}/create")
@@ -1030,7 +1266,7 @@ def create_resolution(market_id: str, outcome: str, db: Session = Depends(get_db
             raise HTTPException(status_code=400, detail="Outcome must be YES or NO")
         
         # Check if resolution already exists
-        existing_resolution = db.query(Resolution).filter(Resolution.market_id == market_id).first()
+        existing_resolution = find_resolution(db, market_id)
         if existing_resolution:
             # Only allow update if current outcome is not YES/NO and not auto_expired
             if existing_resolution.outcome in ["YES", "NO"] or existing_resolution.auto_expired:
@@ -1042,6 +1278,8 @@ def create_resolution(market_id: str, outcome: str, db: Session = Depends(get_db
             existing_resolution.evidence_sources = ["Manual resolution"]
             existing_resolution.resolved_at = datetime.now().isoformat()
             existing_resolution.auto_expired = False
+            mark_changed(db, "resolutions", f"resolution:{market_id}")
+            remember_outcomes(db, {market_id: outcome})
             db.commit()
             logger.info(f"Updated manual resolution for market {market_id}: {outcome}")
             return {
@@ -1080,20 +1318,37 @@ def create_resolution(market_id: str, outcome: str, db: Session = Depends(get_db
         logger.error(f"Error creating resolution: {e}")
         raise HTTPException(status_code=500, detail=f"Error creating resolution: {str(e)}")
 
-@app.get("/resolutions/{market_id}/outcome")
-def get_market_outcome(market_id: str, db: Session = Depends(get_db)):
-    """Get the outcome of a market (true, false, or undefined)"""
-    db_resolution = db.query(Resolution).filter(Resolution.market_id == market_id).first()
-    if not db_resolution:
-        raise HTTPException(status_code=404, detail="Resolution not found")
-    
+def resolution_outcome_value(db_resolution: Resolution) -> int:
+    """Outcome reported for a resolution: 1 for YES, 0 for NO, 2 otherwise"""
     # Check if market is resolved
     if db_resolution.outcome == "YES":
-        return {"outcome": 1}
+        return 1
     elif db_resolution.outcome == "NO":
-        return {"outcome": 0}
+        return 0
     else:
-        return {"outcome": 2}  # INSUFFICIENT_EVIDENCE, EXPIRED, etc.
+        return 2  # INSUFFICIENT_EVIDENCE, EXPIRED, etc.
+
+@app.get("/resolutions/{market_id}/outcome")
+def get_market_outcome(market_id: str, request: Request, db: Session = Depends(get_db)):
+    """Get the outcome of a market (true, false, or undefined)"""
+    final = final_outcomes.get(market_id)
+    if final is not None:
+        return conditional_response(request, *final)
+    cache_key = response_cache_key(request)
+    cached = cached_response(request, cache_key)
+    if cached is not None:
+        return cached
+    versions = response_cache.versions([f"resolution:{market_id}", "resolution_details"])
+    
+    db_resolution = find_resolution(db, market_id)
+    if not db_resolution:
+        raise HTTPException(status_code=404, detail="Resolution not found")
+    if db_resolution.outcome in FINAL_OUTCOME_RESPONSES:
+        # Committed by another process, before this one started, or expired
+        final = FINAL_OUTCOME_RESPONSES[db_resolution.outcome]
+        final_outcomes.set(market_id, (), *final)
+        return conditional_response(request, *final)
+    return cache_json_response(request, cache_key, versions, {"outcome": resolution_outcome_value(db_resolution)})
 
 @app.get("/health")
 def health():
@@ -1103,14 +1358,15 @@ def health():
         db = SessionLocal()
         try:
             resolution_count = db.query(Resolution).count()
-            markets = get_markets_from_generator()
+            market_count = market_source.count_markets(db)
             w3 = get_web3_instance()
             return {
                 "status": "healthy",
                 "asi_api_configured": bool(ASI_API_KEY),
                 "model": MODEL_NAME,
                 "stored_resolutions": resolution_count,
-                "total_markets": len(markets),
+                "total_markets": market_count,
+                "market_source": RESOLVER_MARKET_SOURCE,
                 "generator_api_url": GENERATOR_API_URL,
                 "blockchain_configured": bool(RPC_URL and PMW_ADDRESS and ADMIN_PRIVATE_KEY),
                 "blockchain_connected": bool(w3),
@@ -1164,22 +1420,71 @@ def test_logging():
     return {"message": "Logging test completed", "timestamp": datetime.now().isoformat()}
 
 # Background task for periodic resolution
+async def resolve_all_markets_in_background():
+    """Run a batch resolution on this thread's own event loop"""
+    # Pooled async connections are tied to the app's event loop, so the
+    # background loop gets an unpooled engine of its own
+    engine = new_async_engine(poolclass=NullPool)
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            await resolve_all_markets(db)
+    finally:
+        await engine.dispose()
+
 def run_periodic_resolution():
     """Run resolution every hour"""
     while True:
         try:
             logger.info("Running periodic market resolution")
-            # Create a new database session for the background task
+            asyncio.run(resolve_all_markets_in_background())
+        except Exception as e:
+            logger.error(f"Error in periodic resolution: {e}")
+        
+        # Wait for 1 hour
+        time.sleep(3600)
+
+# Background task for periodic archiving
+def move_resolutions_to_archive(db: Session, days_old: int = ARCHIVE_AFTER_DAYS) -> int:
+    """Move archived resolutions older than days_old days to resolutions_archive
+
+    Resolutions of markets still in the hot markets table stay put, so the
+    market and its resolution are always read from the same tier.
+    """
+    cutoff_time = datetime.now() - timedelta(days=days_old)
+    
+    try:
+        moved = move_to_archive(
+            db,
+            Resolution,
+            ResolutionArchive,
+            (Resolution.auto_expired == True)
+            & (Resolution.resolved_time <= cutoff_time)
+            & ~exists().where(Market.id == Resolution.market_id),
+            batch_size=MAINTENANCE_BATCH_SIZE
+        )
+        if moved:
+            # Reads cover both tables, so cached responses stay valid
+            logger.info(f"Moved {moved} resolutions to the archive table")
+        return moved
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error moving resolutions to the archive table: {e}")
+        return 0
+
+def run_periodic_maintenance():
+    """Archive resolutions older than 30 days and move old archived ones to cold storage on a schedule"""
+    while True:
+        try:
             db = SessionLocal()
             try:
-                asyncio.run(resolve_all_markets(db))
+                archive_old_resolutions_db(db, 30)
+                move_resolutions_to_archive(db)
             finally:
                 db.close()
         except Exception as e:
-            logger.error(f"Error in periodic resolution: {e}")
+            logger.error(f"Error in periodic maintenance: {e}")
         
-        # Wait for 1 hour
-        time.sleep(3600)
+        time.sleep(MAINTENANCE_INTERVAL_SECONDS)
 
 # Start background task
 @app.on_event("startup")
@@ -1188,10 +1493,14 @@ async def start_background_tasks():
     thread = threading.Thread(target=run_periodic_resolution, daemon=True)
     thread.start()
     logger.info("Background resolution task started")
+    
+    maintenance_thread = threading.Thread(target=run_periodic_maintenance, daemon=True)
+    maintenance_thread.start()
+    logger.info(f"Background maintenance task started (every {MAINTENANCE_INTERVAL_SECONDS}s)")
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database and clean up old resolutions on startup"""
+    """Initialize database on startup"""
     try:
         # Force flush to ensure startup logs are visible
         sys.stdout.flush()
@@ -1204,15 +1513,6 @@ async def startup_event():
         init_db()
         logger.info("Database initialized successfully")
         
-        # Archive old resolutions
-        db = SessionLocal()
-        try:
-            updated = archive_old_resolutions_db(db, 30)  # Archive resolutions older than 30 days
-            if updated:
-                logger.info(f"Archived {updated} old resolutions on startup")
-        finally:
-            db.close()
-            
         logger.info("=== Market Resolver Agent Startup Complete ===")
         sys.stdout.flush()
     except Exception as e:
@@ -0,0 +1,161 @@
+"""
+Versioned in-memory cache of encoded responses, with ETags
+
+Entries hold pre-encoded response bodies and are tagged with the versions
+of what they were built from, e.g. "markets" for list pages or
+"market:<id>" for one market. Writers mark the tags they touch on their
+database session, and the versions are bumped when that session commits,
+so a cached body is never served after a committed change to its data in
+this process. A short TTL bounds staleness from writers in other
+processes sharing the database.
+
+Every body gets a strong ETag (a hash of its bytes) stored next to it, so
+a poller's If-None-Match is answered with 304 Not Modified from the cache
+without touching the database or the serializer.
+"""
+
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import orjson
+from fastapi import Request
+from fastapi.responses import Response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from serialization import json_response
+
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", 30))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 1024))
+
+
+class ResponseCache:
+    """LRU of encoded bodies, invalidated by per-tag version counters"""
+
+    def __init__(self, ttl: float = RESPONSE_CACHE_TTL_SECONDS, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._versions: Dict[str, int] = {}
+        # key -> (expires_at, tag versions, body, etag)
+        self._entries: "OrderedDict[tuple, Tuple[float, Tuple[Tuple[str, int], ...], bytes, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def versions(self, tags: Iterable[str]) -> Tuple[Tuple[str, int], ...]:
+        """Current versions of the given tags
+
+        Read these before querying the database and pass them to set(),
+        so a write that commits during the query invalidates the entry.
+        """
+        with self._lock:
+            return tuple((tag, self._versions.get(tag, 0)) for tag in tags)
+
+    def bump(self, tags: Iterable[str]):
+        """Invalidate every entry built from any of the given tags"""
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def discard(self, key: tuple):
+        """Drop one entry, if present"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def get(self, key: tuple) -> Optional[Tuple[bytes, str]]:
+        """Cached (body, etag) for key, if its tags are unchanged and it has not expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, versions, body, etag = entry
+            if expires_at <= time.monotonic() or any(self._versions.get(tag, 0) != version for tag, version in versions):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return body, etag
+
+    def set(self, key: tuple, versions: Tuple[Tuple[str, int], ...], body: bytes, etag: str):
+        """Store a body built while the tags had the given versions"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, versions, body, etag)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+response_cache = ResponseCache()
+
+
+def response_cache_key(request: Request) -> tuple:
+    """Cache key for a read: endpoint path plus normalized query parameters"""
+    return (request.url.path, tuple(sorted(request.query_params.multi_items())))
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag for an encoded body"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match already names this ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def conditional_response(request: Request, body: bytes, etag: str) -> Response:
+    """304 if the client already has this body, otherwise the body with its ETag"""
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return json_response(body, headers={"ETag": etag})
+
+
+def cached_response(request: Request, cache_key: Optional[tuple]) -> Optional[Response]:
+    """Answer a read from the cache (a 304 or the stored body), None on a miss"""
+    if cache_key is None:
+        return None
+    entry = response_cache.get(cache_key)
+    if entry is None:
+        return None
+    return conditional_response(request, *entry)
+
+
+def cache_json_response(request: Request, cache_key: Optional[tuple], versions: tuple, content: Any) -> Response:
+    """Encode a response once, keep the bytes and ETag in the cache and return it
+
+    With cache_key None the response is not cached but still gets an ETag.
+    """
+    body = orjson.dumps(content)
+    etag = make_etag(body)
+    if cache_key is not None:
+        response_cache.set(cache_key, versions, body, etag)
+    return conditional_response(request, body, etag)
+
+
+def mark_changed(db, *tags: str):
+    """Invalidate tags once the session's current transaction commits (sync or async session)"""
+    session = getattr(db, "sync_session", db)
+    session.info.setdefault("response_cache_tags", set()).update(tags)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed_tags(session: Session):
+    tags = session.info.pop("response_cache_tags", None)
+    if tags:
+        response_cache.bump(tags)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_tags(session: Session):
+    session.info.pop("response_cache_tags", None)
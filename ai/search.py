@@ -0,0 +1,185 @@
+"""
+Full-text search over market titles, prompts and descriptions
+
+Backed by the database's own index, created by migrate.py:
+- SQLite: an FTS5 table (markets_fts) kept in sync with markets by
+  triggers, ranked with bm25(). markets has a TEXT primary key, whose
+  implicit rowid VACUUM may renumber, so FTS rows are keyed by
+  markets_fts_ids, which gives each market id a stable INTEGER PRIMARY KEY
+- PostgreSQL: a generated tsvector column (markets.search_vector) with a
+  GIN index, ranked with ts_rank_cd()
+
+Other databases, or SQLite builds without FTS5, fall back to an unranked
+substring match. Matches in titles weigh more than prompts, which weigh
+more than descriptions. Lower rank is better in every backend, so results
+can be keyset-paginated by (rank, id).
+"""
+
+import re
+import logging
+from typing import List, Optional
+
+from sqlalchemy import Float, column, func, inspect, literal, literal_column, or_, select, table, text
+from sqlalchemy.orm import Session
+
+from database import Market
+
+logger = logging.getLogger(__name__)
+
+MARKETS_FTS_TABLE = "markets_fts"
+MARKETS_FTS_IDS_TABLE = "markets_fts_ids"
+SEARCH_VECTOR_COLUMN = "search_vector"
+SEARCH_LANGUAGE = "english"
+
+# Relative weight of title, prompt and description matches (bm25 column weights)
+SEARCH_COLUMN_WEIGHTS = (10.0, 5.0, 1.0)
+
+_backends = {}
+
+
+def search_backend(db: Session) -> str:
+    """"fts5", "tsvector" or "like", depending on which index exists"""
+    bind = db.get_bind()
+    if bind.url not in _backends:
+        dialect = bind.dialect.name
+        inspector = inspect(bind)
+        if dialect == "sqlite" and inspector.has_table(MARKETS_FTS_TABLE):
+            backend = "fts5"
+        elif dialect == "postgresql" and any(
+            col["name"] == SEARCH_VECTOR_COLUMN for col in inspector.get_columns(Market.__tablename__)
+        ):
+            backend = "tsvector"
+        else:
+            logger.warning("No full-text index on markets; search falls back to substring matching")
+            backend = "like"
+        _backends[bind.url] = backend
+    return _backends[bind.url]
+
+
+def search_terms(query: str) -> List[str]:
+    """Words of a free-text query, without any search operators"""
+    return re.findall(r"\w+", query)
+
+
+def market_search_statement(db: Session, query: str, status: Optional[str] = None):
+    """Select of market columns plus a rank column for markets matching every term
+
+    Returns None if the query has no searchable terms.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return None
+    backend = search_backend(db)
+    columns = Market.__table__.columns
+
+    if backend == "fts5":
+        fts = table(MARKETS_FTS_TABLE, column("rowid"))
+        fts_ids = table(MARKETS_FTS_IDS_TABLE, column("fts_rowid"), column("market_id"))
+        # Quoted terms are matched literally, so the query cannot inject FTS5 syntax
+        match = " ".join('"' + term + '"' for term in terms)
+        rank = func.bm25(literal_column(MARKETS_FTS_TABLE), *SEARCH_COLUMN_WEIGHTS)
+        statement = (
+            select(*columns, rank.label("rank"))
+            .select_from(
+                fts.join(fts_ids, fts_ids.c.fts_rowid == fts.c.rowid)
+                .join(Market.__table__, Market.id == fts_ids.c.market_id)
+            )
+            .where(literal_column(MARKETS_FTS_TABLE).op("MATCH")(match))
+        )
+    elif backend == "tsvector":
+        tsquery = func.plainto_tsquery(SEARCH_LANGUAGE, " ".join(terms))
+        vector = literal_column(f"markets.{SEARCH_VECTOR_COLUMN}")
+        statement = (
+            select(*columns, (-func.ts_rank_cd(vector, tsquery)).label("rank"))
+            .where(vector.op("@@")(tsquery))
+        )
+    else:
+        statement = select(*columns, literal(0.0, Float).label("rank"))
+        for term in terms:
+            pattern = f"%{term}%"
+            statement = statement.where(or_(
+                Market.title.ilike(pattern), Market.prompt.ilike(pattern), Market.description.ilike(pattern)
+            ))
+
+    if status:
+        statement = statement.where(Market.status == status)
+    return statement
+
+
+def drop_rowid_search_index(connection):
+    """Drop a SQLite FTS5 index keyed on markets.rowid (migration 0002's first layout)"""
+    if connection.dialect.name != "sqlite":
+        return
+    sql = connection.execute(
+        text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": MARKETS_FTS_TABLE}
+    ).scalar()
+    if sql is None or "content_rowid" not in sql:
+        return
+    for trigger in ("insert", "delete", "update"):
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {MARKETS_FTS_TABLE}_{trigger}"))
+    connection.execute(text(f"DROP TABLE {MARKETS_FTS_TABLE}"))
+    logger.info(f"Dropped rowid-keyed {MARKETS_FTS_TABLE}")
+
+
+def create_search_index(connection):
+    """Create the dialect's full-text index on markets and fill it (idempotent)"""
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        try:
+            connection.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {MARKETS_FTS_TABLE} USING fts5("
+                "title, prompt, description, tokenize='porter unicode61')"
+            ))
+        except Exception as e:
+            logger.warning(f"SQLite FTS5 unavailable, market search will use substring matching: {e}")
+            return
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {MARKETS_FTS_IDS_TABLE} ("
+            "fts_rowid INTEGER PRIMARY KEY, market_id TEXT NOT NULL UNIQUE)"
+        ))
+        columns = "title, prompt, description"
+        fts_rowid = f"(SELECT fts_rowid FROM {MARKETS_FTS_IDS_TABLE} WHERE market_id = {{}}.id)"
+        insert_new = (
+            f"INSERT OR IGNORE INTO {MARKETS_FTS_IDS_TABLE}(market_id) VALUES (new.id); "
+            f"INSERT INTO {MARKETS_FTS_TABLE}(rowid, {columns}) "
+            f"VALUES ({fts_rowid.format('new')}, new.title, new.prompt, new.description); "
+        )
+        delete_old = f"DELETE FROM {MARKETS_FTS_TABLE} WHERE rowid = {fts_rowid.format('old')}; "
+        connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {MARKETS_FTS_TABLE}_insert AFTER INSERT ON markets BEGIN "
+            f"{insert_new}END"
+        ))
+        connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {MARKETS_FTS_TABLE}_delete AFTER DELETE ON markets BEGIN "
+            f"{delete_old}DELETE FROM {MARKETS_FTS_IDS_TABLE} WHERE market_id = old.id; END"
+        ))
+        connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {MARKETS_FTS_TABLE}_update "
+            f"AFTER UPDATE OF id, {columns} ON markets BEGIN "
+            f"{delete_old}DELETE FROM {MARKETS_FTS_IDS_TABLE} WHERE market_id = old.id; {insert_new}END"
+        ))
+        # Index the rows that existed before the table
+        connection.execute(text(
+            f"INSERT OR IGNORE INTO {MARKETS_FTS_IDS_TABLE}(market_id) SELECT id FROM markets"
+        ))
+        connection.execute(text(f"DELETE FROM {MARKETS_FTS_TABLE}"))
+        connection.execute(text(
+            f"INSERT INTO {MARKETS_FTS_TABLE}(rowid, {columns}) "
+            f"SELECT ids.fts_rowid, markets.title, markets.prompt, markets.description "
+            f"FROM markets JOIN {MARKETS_FTS_IDS_TABLE} AS ids ON ids.market_id = markets.id"
+        ))
+    elif dialect == "postgresql":
+        language = f"'{SEARCH_LANGUAGE}'::regconfig"
+        connection.execute(text(
+            f"ALTER TABLE markets ADD COLUMN IF NOT EXISTS {SEARCH_VECTOR_COLUMN} tsvector GENERATED ALWAYS AS ("
+            f"setweight(to_tsvector({language}, coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector({language}, coalesce(prompt, '')), 'B') || "
+            f"setweight(to_tsvector({language}, coalesce(description, '')), 'C')) STORED"
+        ))
+        connection.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_markets_{SEARCH_VECTOR_COLUMN} "
+            f"ON markets USING GIN ({SEARCH_VECTOR_COLUMN})"
+        ))
+    else:
+        logger.warning(f"No full-text index for {dialect}; market search will use substring matching")
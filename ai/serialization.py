@@ -0,0 +1,91 @@
+"""
+Fast JSON serialization for hot read endpoints
+
+Read endpoints used to build a pydantic model per ORM row, re-validating
+data that was validated when it was written, and then let FastAPI's
+encoder walk the result again. Here each response model is compiled once
+into a plain function that copies a row's fields in model order, applying
+only the coercions and defaults validation would have applied, and the
+result is encoded to bytes with orjson.
+"""
+
+import typing
+from typing import Any, Callable, Dict, Optional, Type
+
+import orjson
+from fastapi.responses import Response
+from pydantic import BaseModel
+from pydantic_core import PydanticUndefined
+
+
+def _is_model(annotation) -> bool:
+    return isinstance(annotation, type) and issubclass(annotation, BaseModel)
+
+
+def _unwrap_optional(annotation):
+    """X for Optional[X], otherwise the annotation itself"""
+    if typing.get_origin(annotation) is typing.Union:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def _compile_field(annotation) -> Optional[Callable[[Any], Any]]:
+    """Conversion validation would apply to a stored value, None if it is kept as is"""
+    annotation = _unwrap_optional(annotation)
+    if annotation is float:
+        # Stored JSON numbers may be ints; the models always emit floats
+        return lambda value: float(value) if value is not None and not isinstance(value, bool) else value
+    if _is_model(annotation):
+        serialize = compile_serializer(annotation)
+        return lambda value: serialize(value) if value is not None else None
+    return None
+
+
+def compile_serializer(model: Type[BaseModel]) -> Callable[[Any], Dict[str, Any]]:
+    """Build a function turning an ORM row or stored dict into model.dict() output
+
+    Fields come out in model order, missing fields take their defaults and
+    extra keys are dropped, so the JSON matches what the model would have
+    produced for data that already passed validation on write.
+    """
+    fields = []
+    for name, info in model.model_fields.items():
+        if info.default_factory is not None:
+            default_factory = info.default_factory
+        elif info.default is PydanticUndefined:
+            default_factory = lambda: None
+        else:
+            default_factory = (lambda default: lambda: default)(info.default)
+        fields.append((name, _compile_field(info.annotation), default_factory))
+
+    missing = object()
+
+    def serialize(source: Any) -> Dict[str, Any]:
+        get = source.get if isinstance(source, dict) else (lambda name, default: getattr(source, name, default))
+        result = {}
+        for name, convert, default_factory in fields:
+            value = get(name, missing)
+            if value is missing:
+                value = default_factory()
+            elif convert is not None:
+                value = convert(value)
+            result[name] = value
+        return result
+
+    return serialize
+
+
+def json_response(content: Any, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Encode content with orjson, bypassing FastAPI's response encoder
+
+    Bytes are taken as already encoded JSON.
+    """
+    return Response(
+        content=content if isinstance(content, bytes) else orjson.dumps(content),
+        status_code=status_code,
+        media_type="application/json",
+        headers=headers
+    )
+
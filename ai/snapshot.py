@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Compact snapshots of markets and resolutions for bootstrapping environments
+
+A snapshot is a gzipped stream of msgpack objects: a header, then chunks
+of up to SNAPSHOT_BATCH_SIZE rows per table stored column by column
+({"table", "columns", "data": [values of column 0, values of column 1, ...]}).
+Export reads each table through a server-side cursor, so memory stays
+flat. Import inserts each chunk with one executemany in a single
+transaction.
+
+Usage:
+    python snapshot.py export markets.snapshot
+    python snapshot.py import markets.snapshot [--replace]
+"""
+
+import os
+import sys
+import gzip
+import zlib
+import logging
+import argparse
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterator
+
+import msgpack
+from sqlalchemy import DateTime, select, delete
+
+from database import engine, init_db, with_derived_columns, SessionLocal, Market, MarketArchive, Resolution, ResolutionArchive
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = "pmw-snapshot"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_BATCH_SIZE = int(os.getenv("SNAPSHOT_BATCH_SIZE", 5000))
+
+# Models of the tables in a snapshot, in load order
+SNAPSHOT_MODELS = {model.__tablename__: model for model in (Market, MarketArchive, Resolution, ResolutionArchive)}
+SNAPSHOT_TABLES = {name: model.__table__ for name, model in SNAPSHOT_MODELS.items()}
+
+
+def _datetime_columns(table) -> set:
+    return {column.name for column in table.columns if isinstance(column.type, DateTime)}
+
+
+def snapshot_objects(batch_size: int = SNAPSHOT_BATCH_SIZE) -> Iterator[dict]:
+    """Header and column-wise row chunks of every snapshot table"""
+    yield {"format": SNAPSHOT_FORMAT, "version": SNAPSHOT_VERSION, "created_at": datetime.now().isoformat()}
+
+    db = SessionLocal()
+    try:
+        for name, table in SNAPSHOT_TABLES.items():
+            columns = [column.name for column in table.columns]
+            datetime_columns = _datetime_columns(table)
+            result = db.execute(select(table).order_by(table.c.id).execution_options(yield_per=batch_size))
+            for rows in result.partitions():
+                data = []
+                for column, values in zip(columns, zip(*rows)):
+                    if column in datetime_columns:
+                        values = [value.isoformat() if value is not None else None for value in values]
+                    data.append(list(values))
+                yield {"table": name, "columns": columns, "data": data}
+    finally:
+        db.close()
+
+
+def snapshot_chunks(batch_size: int = SNAPSHOT_BATCH_SIZE) -> Iterator[bytes]:
+    """Encoded, gzipped snapshot as a stream of byte chunks"""
+    packer = msgpack.Packer()
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for obj in snapshot_objects(batch_size):
+        compressed = compressor.compress(packer.pack(obj))
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def load_snapshot(source: BinaryIO, replace: bool = False) -> Dict[str, int]:
+    """Bulk-load a snapshot; returns rows inserted per table
+
+    Runs in one transaction: with replace=True the snapshot tables are
+    emptied first, otherwise rows whose ids already exist make the whole
+    import fail and roll back. Columns unknown to this schema are
+    ignored, and the typed time and validation columns are derived from
+    the stored strings and JSON as on any other write, so snapshots taken
+    before those columns existed load too.
+    """
+    unpacker = msgpack.Unpacker(gzip.GzipFile(fileobj=source, mode="rb"), raw=False)
+    try:
+        header = next(unpacker, None)
+    except (OSError, msgpack.UnpackException) as e:
+        raise ValueError(f"Not a snapshot file: {e}")
+    if not isinstance(header, dict) or header.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError("Not a snapshot file")
+    if header.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {header.get('version')}")
+
+    counts = {name: 0 for name in SNAPSHOT_TABLES}
+    with engine.begin() as conn:
+        if replace:
+            for table in reversed(list(SNAPSHOT_TABLES.values())):
+                conn.execute(delete(table))
+
+        for chunk in unpacker:
+            model = SNAPSHOT_MODELS.get(chunk.get("table"))
+            if model is None:
+                raise ValueError(f"Unknown snapshot table: {chunk.get('table')}")
+            table = model.__table__
+            datetime_columns = _datetime_columns(table)
+            columns, data = [], []
+            for column, values in zip(chunk["columns"], chunk["data"]):
+                if column not in table.c:
+                    continue
+                if column in datetime_columns:
+                    values = [datetime.fromisoformat(value) if value else None for value in values]
+                columns.append(column)
+                data.append(values)
+            rows = [with_derived_columns(model, dict(zip(columns, values))) for values in zip(*data)]
+            if rows:
+                conn.execute(table.insert(), rows)
+                counts[table.name] += len(rows)
+
+    logger.info(f"Loaded snapshot: {counts}")
+    return counts
+
+
+def main():
+    """Export or import a snapshot file"""
+    parser = argparse.ArgumentParser(description="Export or import a markets/resolutions snapshot")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    export_parser = subcommands.add_parser("export", help="Write a snapshot of the database")
+    export_parser.add_argument("path")
+    import_parser = subcommands.add_parser("import", help="Load a snapshot into the database")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--replace", action="store_true", help="Delete existing rows first")
+    args = parser.parse_args()
+
+    try:
+        init_db()
+        if args.command == "export":
+            with open(args.path, "wb") as output:
+                for chunk in snapshot_chunks():
+                    output.write(chunk)
+            print(f"✅ Snapshot written to {args.path}")
+        else:
+            with open(args.path, "rb") as source:
+                counts = load_snapshot(source, replace=args.replace)
+            print(f"✅ Snapshot loaded: {counts}")
+    except Exception as e:
+        print(f"❌ Snapshot {args.command} failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for moving markets and resolutions to their archive tables
+
+Readers cover both tables, so a move must not change what any endpoint
+returns, including responses cached before the move.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from database import Market, MarketArchive, Resolution, ResolutionArchive, upsert
+from response_cache import ResponseCache, response_cache
+
+LONG_AGO = (datetime.now() - timedelta(days=90)).isoformat()
+
+
+@pytest.fixture
+def generator(db):
+    from generator import server
+    response_cache.clear()
+    return server
+
+
+@pytest.fixture
+def resolver(db, monkeypatch):
+    from resolver import server
+    monkeypatch.setattr(server, "final_outcomes", ResponseCache())
+    response_cache.clear()
+    return server
+
+
+def market_row(market_id: str, status: str, close_time_iso: str, resolved_at=None):
+    # Rows in one upsert share their keys, so resolved_at is always present
+    return {
+        "id": market_id,
+        "title": f"Market {market_id}",
+        "description": "",
+        "prompt": "",
+        "close_time_iso": close_time_iso,
+        "outcomes": ["YES", "NO"],
+        "initial_prob": 0.5,
+        "validation": {"confidence": 0.7},
+        "created_at": LONG_AGO,
+        "status": status,
+        "resolved_at": resolved_at,
+    }
+
+
+def resolution_row(market_id: str):
+    return {
+        "id": market_id,
+        "market_id": market_id,
+        "outcome": "NO",
+        "confidence": 1.0,
+        "reasoning": "",
+        "evidence_sources": [],
+        "resolved_at": LONG_AGO,
+        "auto_expired": True,
+    }
+
+
+def market_ids(client, path: str):
+    return sorted(market["id"] for market in client.get(path).json()["markets"])
+
+
+def test_moved_markets_are_still_served(generator, db):
+    upsert(db, Market, [
+        market_row("expired", "expired", LONG_AGO),
+        market_row("resolved", "resolved", LONG_AGO, resolved_at=LONG_AGO),
+        market_row("live", "active", (datetime.now() + timedelta(days=30)).isoformat()),
+    ])
+    db.commit()
+    client = TestClient(generator.app)
+    # Listings plus the detail of each market that moves
+    paths = ["/markets", "/markets/archived", "/markets/expired", "/markets/resolved"]
+    before = {path: client.get(path).json() for path in paths}
+
+    assert generator.move_markets_to_archive(db) == 2
+    assert sorted(db.scalars(select(MarketArchive.id))) == ["expired", "resolved"]
+    assert db.get(Market, "live") is not None
+
+    for path in paths:
+        assert client.get(path).json() == before[path], path
+    response_cache.clear()
+    for path in paths:
+        assert client.get(path).json() == before[path], path
+    assert market_ids(client, "/markets") == ["expired", "live", "resolved"]
+    assert client.get("/markets/resolved").json()["id"] == "resolved"
+
+
+def test_resolution_moves_once_its_market_has(generator, resolver, db):
+    upsert(db, Market, [market_row("m", "expired", LONG_AGO)])
+    upsert(db, Resolution, [resolution_row("m")])
+    db.commit()
+
+    # The market is still hot, so its resolution stays with it
+    assert resolver.move_resolutions_to_archive(db) == 0
+
+    assert generator.move_markets_to_archive(db) == 1
+    assert resolver.move_resolutions_to_archive(db) == 1
+    assert db.get(Resolution, "m") is None
+    assert db.get(ResolutionArchive, "m") is not None
+
+
+def test_moved_resolutions_are_still_served(resolver, db):
+    upsert(db, MarketArchive, [market_row("m", "expired", LONG_AGO)])
+    upsert(db, Resolution, [resolution_row("m")])
+    db.commit()
+    client = TestClient(resolver.app)
+    paths = ["/resolutions", "/resolutions/archived", "/resolutions/m", "/resolutions/m/outcome"]
+    before = {path: client.get(path).json() for path in paths}
+    assert before["/resolutions/m/outcome"] == {"outcome": 0}
+
+    assert resolver.move_resolutions_to_archive(db) == 1
+
+    response_cache.clear()
+    for path in paths:
+        assert client.get(path).json() == before[path], path
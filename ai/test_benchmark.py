@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Tests for the full-scan detection in benchmark.py's query plan report
+"""
+
+import pytest
+
+from benchmark import plan_full_scan
+
+
+@pytest.mark.parametrize("plan", [
+    ["SCAN markets"],
+    ["SCAN markets USING INDEX ix_markets_close_time", "SEARCH resolutions USING INDEX sqlite_autoindex_resolutions_1 (id=?)"],
+    ["SCAN resolutions USING COVERING INDEX ix_resolutions_resolved_time"],
+])
+def test_sqlite_scans_of_hot_tables_are_flagged(plan):
+    assert plan_full_scan("sqlite", plan)
+
+
+@pytest.mark.parametrize("plan", [
+    ["SEARCH markets USING INDEX ix_markets_close_time (close_time<?)"],
+    ["SEARCH markets USING COVERING INDEX ix_markets_confidence (confidence>?)"],
+    ["SCAN markets_fts VIRTUAL TABLE INDEX 0:M3", "SEARCH markets USING INDEX sqlite_autoindex_markets_1 (id=?)"],
+    ["SCAN markets_archive", "SCAN anon_1"],
+])
+def test_sqlite_searches_and_other_tables_are_not_flagged(plan):
+    assert not plan_full_scan("sqlite", plan)
+
+
+def test_postgres_sequential_scans_are_flagged():
+    assert plan_full_scan("postgresql", ["Seq Scan on markets  (cost=0.00..4.00 rows=100 width=8)"])
+    assert not plan_full_scan("postgresql", ["Index Scan using ix_markets_close_time on markets"])
+    assert not plan_full_scan("postgresql", ["Seq Scan on markets_archive  (cost=0.00..4.00 rows=100 width=8)"])
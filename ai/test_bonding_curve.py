@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Parity tests for bonding_curve.py against ProveMeWrong.sol
+
+reference_mint is a line-by-line transcription of the contract's `mint`
+and `_updatePricesWithBondingCurve` with checked uint256 arithmetic (any
+underflow, overflow or division by zero reverts, as in Solidity 0.8), and
+the token supplies read through totalSupply after the mint. quote_mint and
+quote_mint_array must agree with it exactly over random trade sequences.
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from bonding_curve import MarketState, probabilities_to_prices, quote_mint, quote_mint_array
+
+UINT256_MAX = 2**256 - 1
+
+# ProveMeWrong.sol constants
+PRICE_SCALE = 10**18
+CURVE_FACTOR = 10**15
+FEE_PERCENTAGE = 10**15
+
+
+class Revert(Exception):
+    pass
+
+
+def u(value: int) -> int:
+    """Checked uint256 result"""
+    if value < 0 or value > UINT256_MAX:
+        raise Revert("arithmetic overflow/underflow")
+    return value
+
+
+def div(a: int, b: int) -> int:
+    if b == 0:
+        raise Revert("division by zero")
+    return a // b
+
+
+def reference_mint(market: dict, amount: int, outcome: bool) -> int:
+    """ProveMeWrong.mint on a dict holding the market and its token supplies; returns tokensToMint"""
+    if amount == 0:
+        raise Revert("Amount must be greater than 0")
+
+    feeAmount = div(u(amount * FEE_PERCENTAGE), PRICE_SCALE)
+    betAmount = u(amount - feeAmount)
+
+    if outcome == True:
+        tokensToMint = div(u(betAmount * PRICE_SCALE), market["yesPrice"])
+    else:
+        tokensToMint = div(u(betAmount * PRICE_SCALE), market["noPrice"])
+
+    if outcome == True:
+        market["yesSupply"] = u(market["yesSupply"] + tokensToMint)
+    else:
+        market["noSupply"] = u(market["noSupply"] + tokensToMint)
+
+    # _updatePricesWithBondingCurve
+    yesSupply = market["yesSupply"]
+    noSupply = market["noSupply"]
+    totalSupply = u(yesSupply + noSupply)
+
+    adjustmentFactor = CURVE_FACTOR
+    if totalSupply > PRICE_SCALE:
+        adjustmentFactor = div(
+            u(CURVE_FACTOR * PRICE_SCALE),
+            u(PRICE_SCALE + div(u(totalSupply - PRICE_SCALE), 10))
+        )
+
+    if outcome == True:
+        yesIncrease = div(u(adjustmentFactor * market["yesPrice"]), PRICE_SCALE)
+        noDecrease = div(u(adjustmentFactor * market["noPrice"]), PRICE_SCALE)
+        market["yesPrice"] = u(market["yesPrice"] + yesIncrease)
+        market["noPrice"] = u(market["noPrice"] - noDecrease)
+    else:
+        noIncrease = div(u(adjustmentFactor * market["noPrice"]), PRICE_SCALE)
+        yesDecrease = div(u(adjustmentFactor * market["yesPrice"]), PRICE_SCALE)
+        market["noPrice"] = u(market["noPrice"] + noIncrease)
+        market["yesPrice"] = u(market["yesPrice"] - yesDecrease)
+
+    totalPrice = u(market["yesPrice"] + market["noPrice"])
+    market["yesPrice"] = div(u(market["yesPrice"] * PRICE_SCALE), totalPrice)
+    market["noPrice"] = div(u(market["noPrice"] * PRICE_SCALE), totalPrice)
+
+    return tokensToMint
+
+
+def random_amount(rng: random.Random) -> int:
+    # From dust to whale-sized bets, so supplies cross PRICE_SCALE and the curve flattens
+    return rng.randint(1, 10 ** rng.randint(1, 24))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_quote_mint_matches_contract(seed):
+    rng = random.Random(seed)
+    state = probabilities_to_prices(rng.uniform(0.01, 0.99), rng.uniform(0.01, 0.99))
+    market = {"yesPrice": state.yes_price, "noPrice": state.no_price, "yesSupply": 0, "noSupply": 0}
+
+    for _ in range(200):
+        amount = random_amount(rng)
+        outcome = rng.random() < 0.5
+        tokens = reference_mint(market, amount, outcome)
+        quote = quote_mint(state, amount, outcome)
+
+        assert quote.tokens == tokens
+        assert quote.fee == amount * FEE_PERCENTAGE // PRICE_SCALE
+        assert quote.state == MarketState(market["yesPrice"], market["noPrice"], market["yesSupply"], market["noSupply"])
+        state = quote.state
+
+
+def test_quote_mint_array_matches_contract():
+    rng = random.Random(1234)
+    states, amounts, outcomes, expected = [], [], [], []
+    for _ in range(500):
+        state = MarketState(
+            *probabilities_to_prices(rng.uniform(0.01, 0.99), rng.uniform(0.01, 0.99))[:2],
+            yes_supply=rng.randint(0, 10**24),
+            no_supply=rng.randint(0, 10**24),
+        )
+        amount = random_amount(rng)
+        outcome = rng.random() < 0.5
+        market = {"yesPrice": state.yes_price, "noPrice": state.no_price, "yesSupply": state.yes_supply, "noSupply": state.no_supply}
+        tokens = reference_mint(market, amount, outcome)
+        states.append(state)
+        amounts.append(amount)
+        outcomes.append(outcome)
+        expected.append((tokens, market["yesPrice"], market["noPrice"], market["yesSupply"], market["noSupply"]))
+
+    yes_price, no_price, yes_supply, no_supply = (list(column) for column in zip(*states))
+    fee, tokens, yes_price, no_price, yes_supply, no_supply = quote_mint_array(
+        yes_price, no_price, yes_supply, no_supply, amounts, np.array(outcomes)
+    )
+
+    assert list(fee) == [amount * FEE_PERCENTAGE // PRICE_SCALE for amount in amounts]
+    assert list(zip(tokens, yes_price, no_price, yes_supply, no_supply)) == expected
+
+
+def test_quote_mint_rejects_zero_amount():
+    with pytest.raises(ValueError):
+        quote_mint(probabilities_to_prices(0.5, 0.5), 0, True)
+
+
+def test_quote_mint_rejects_zero_price():
+    with pytest.raises(ValueError):
+        quote_mint(MarketState(yes_price=0, no_price=PRICE_SCALE), 10**18, True)
+
+
+@pytest.mark.parametrize("yes_probability, no_probability, expected", [
+    (0.45, 0.55, (450000000000000000, 550000000000000000)),
+    (0.3, 0.3, (500000000000000000, 500000000000000000)),
+    (1 / 3, 2 / 3, (333333333333333333, 666666666666666667)),
+])
+def test_probabilities_to_prices_is_exact(yes_probability, no_probability, expected):
+    assert probabilities_to_prices(yes_probability, no_probability)[:2] == expected
+
+
+def test_probabilities_to_prices_sum_to_price_scale():
+    rng = random.Random(7)
+    for _ in range(1000):
+        state = probabilities_to_prices(rng.uniform(0.001, 0.999), rng.uniform(0.001, 0.999))
+        assert state.yes_price + state.no_price == PRICE_SCALE
+        assert all(isinstance(price, int) for price in state[:2])
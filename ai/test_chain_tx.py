@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for the fee engine in chain_tx.py and its use in deploy_market
+
+The chain is a stub exposing only the eth_* calls the code under test
+makes, so both the EIP-1559 path and the legacy gasPrice path (chains
+without a base fee) can be exercised without an RPC endpoint.
+"""
+
+import pytest
+
+import chain_tx
+from chain_tx import bump_fees, fee_fields, suggest_fees
+
+ADMIN_KEY = "0x" + "11" * 32
+ADDRESS = "0x" + "22" * 20
+
+
+class StubContractFunction:
+    def build_transaction(self, transaction):
+        return {**transaction, "to": ADDRESS, "data": "0x", "value": 0}
+
+
+class StubFunctions:
+    def createMarket(self, *args):
+        return StubContractFunction()
+
+
+class StubContract:
+    functions = StubFunctions()
+
+
+class StubEth:
+    def __init__(self, base_fee: int):
+        self.base_fee = base_fee
+        self.gas_price = 7_000_000_000
+        self.max_priority_fee = 1_000_000_000
+
+    def fee_history(self, block_count, newest_block, percentiles):
+        return {
+            "baseFeePerGas": [self.base_fee] * (block_count + 1),
+            "reward": [[2_000_000_000]] * block_count,
+        }
+
+    def get_transaction_count(self, address, block):
+        return 3
+
+    def contract(self, address, abi):
+        return StubContract()
+
+
+class StubProvider:
+    def __init__(self, endpoint_uri: str):
+        self.endpoint_uri = endpoint_uri
+
+
+class StubWeb3:
+    def __init__(self, base_fee: int, endpoint_uri: str):
+        self.eth = StubEth(base_fee)
+        self.provider = StubProvider(endpoint_uri)
+
+
+@pytest.fixture(autouse=True)
+def clear_fee_cache():
+    chain_tx._fee_cache.clear()
+    yield
+    chain_tx._fee_cache.clear()
+
+
+def test_suggest_fees_eip1559():
+    fees = suggest_fees(StubWeb3(base_fee=10_000_000_000, endpoint_uri="eip1559"))
+    assert fees == {"maxPriorityFeePerGas": 2_000_000_000, "maxFeePerGas": 22_000_000_000}
+
+
+def test_suggest_fees_legacy_chain():
+    assert suggest_fees(StubWeb3(base_fee=0, endpoint_uri="legacy")) == {"gasPrice": 7_000_000_000}
+
+
+def test_fee_fields_and_bump_legacy_transaction():
+    transaction = {"nonce": 3, "gas": 21000, "gasPrice": 100}
+    assert fee_fields(transaction) == {"gasPrice": 100}
+
+    bumped = bump_fees(transaction, {"gasPrice": 90})
+    assert fee_fields(bumped) == {"gasPrice": 100 * (100 + chain_tx.TX_FEE_BUMP_PERCENT) // 100 + 1}
+    assert "maxFeePerGas" not in bumped
+
+
+@pytest.mark.parametrize("base_fee, fields", [
+    (0, {"gasPrice"}),
+    (10_000_000_000, {"maxFeePerGas", "maxPriorityFeePerGas"}),
+])
+def test_deploy_market_sends_suggested_fees(monkeypatch, base_fee, fields):
+    from generator import server
+
+    w3 = StubWeb3(base_fee=base_fee, endpoint_uri=f"deploy-{base_fee}")
+    sent = []
+
+    def send_transaction(w3, transaction, private_key):
+        sent.append(transaction)
+        return {"transactionHash": b"\x01" * 32, "blockNumber": 1, "gasUsed": 21000, "status": 1}
+
+    monkeypatch.setattr(server, "get_web3_instance", lambda: w3)
+    monkeypatch.setattr(server, "send_transaction", send_transaction)
+    monkeypatch.setattr(server, "ADMIN_PRIVATE_KEY", ADMIN_KEY)
+    monkeypatch.setattr(server, "PMW_ADDRESS", ADDRESS)
+    monkeypatch.setattr(server, "PMW_POOL_ADDRESS", ADDRESS)
+
+    assert server.deploy_market("market-1", "Title", "https://example.com/outcome", 0.4, 0.6) is True
+    assert set(fee_fields(sent[0])) == fields
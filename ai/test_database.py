@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests for the row-level write helpers in database.py and the batched saves built on them
+"""
+
+from datetime import datetime
+
+import pytest
+
+from database import Market, Resolution, upsert
+
+
+def market_row(market_id: str, **overrides):
+    row = {
+        "id": market_id,
+        "title": f"Market {market_id}",
+        "description": "",
+        "prompt": "",
+        "close_time_iso": "2030-01-01T00:00:00",
+        "outcomes": ["YES", "NO"],
+        "initial_prob": 0.5,
+        "validation": {"confidence": 0.7, "yes_probability": 0.5, "auto_expire": False, "resolution_date": "2030-01-02T00:00:00"},
+        "created_at": "2026-01-01T00:00:00",
+        "status": "active",
+    }
+    row.update(overrides)
+    return row
+
+
+def test_upsert_inserts_then_overwrites(db):
+    upsert(db, Market, [market_row("a"), market_row("b")])
+    upsert(db, Market, [market_row("a", title="Renamed", close_time_iso="2031-06-01T00:00:00")])
+    db.commit()
+
+    a, b = db.get(Market, "a"), db.get(Market, "b")
+    assert (a.title, b.title) == ("Renamed", "Market b")
+    assert db.query(Market).count() == 2
+
+
+def test_upsert_derives_typed_and_validation_columns(db):
+    upsert(db, Market, [market_row("a")])
+    upsert(db, Market, [market_row("a", close_time_iso="2031-06-01T00:00:00", validation={"confidence": 0.95})])
+    db.commit()
+
+    market = db.get(Market, "a")
+    assert market.close_time == datetime(2031, 6, 1)
+    assert market.created_time == datetime(2026, 1, 1)
+    assert market.confidence == 0.95
+    assert market.auto_expire is False
+    assert market.resolution_date is None
+
+
+def test_upsert_joins_the_open_transaction(db):
+    upsert(db, Market, [market_row("a")])
+    upsert(db, Market, [market_row("b")])
+    db.rollback()
+
+    assert db.query(Market).count() == 0
+
+
+@pytest.fixture
+def generator(db):
+    from generator import server
+    return server
+
+
+@pytest.fixture
+def resolver(db):
+    from resolver import server
+    return server
+
+
+def market_data(generator, market_id: str, **overrides):
+    return generator.MarketData(**market_row(market_id, validation={
+        "is_valid": True,
+        "confidence": 0.7,
+        "reasoning": "",
+        "yes_probability": 0.5,
+        "no_probability": 0.5,
+        "reliable_sources": [],
+        "resolution_date": "2030-01-02T00:00:00",
+    }, **overrides))
+
+
+def test_save_markets_commits_a_batch_once(generator, db):
+    generator.save_markets_to_db(db, [market_data(generator, "a"), market_data(generator, "b")], commit=False)
+    generator.save_market_to_db(db, market_data(generator, "a", status="resolved"), commit=False)
+    db.commit()
+
+    assert {market.id: market.status for market in db.query(Market)} == {"a": "resolved", "b": "active"}
+
+
+def test_uncommitted_saves_roll_back_together(generator, db):
+    generator.save_markets_to_db(db, [market_data(generator, "a")], commit=False)
+    generator.save_market_to_db(db, market_data(generator, "b"), commit=False)
+    db.rollback()
+
+    assert db.query(Market).count() == 0
+
+
+def test_save_resolutions_upserts_by_market_id(resolver, db):
+    def resolution(outcome):
+        return resolver.ResolutionResult(
+            market_id="a", outcome=outcome, confidence=0.9, reasoning="", evidence_sources=[],
+            resolved_at="2026-02-01T00:00:00", auto_expired=False,
+        )
+
+    resolver.save_resolution_to_db(db, resolution("INSUFFICIENT_EVIDENCE"))
+    resolver.save_resolutions_to_db(db, [resolution("YES")])
+
+    assert [(row.id, row.outcome, row.resolved_time) for row in db.query(Resolution)] == [("a", "YES", datetime(2026, 2, 1))]
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for ETag / If-None-Match handling on the generator and resolver reads
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from response_cache import ResponseCache, response_cache
+
+
+@pytest.fixture
+def generator(db):
+    from generator import server
+    response_cache.clear()
+    return server
+
+
+@pytest.fixture
+def resolver(db, monkeypatch):
+    from resolver import server
+    monkeypatch.setattr(server, "final_outcomes", ResponseCache())
+    response_cache.clear()
+    return server
+
+
+def market_data(generator, market_id: str, title: str):
+    now = datetime.now()
+    return generator.MarketData(
+        id=market_id,
+        title=title,
+        description="",
+        prompt="",
+        close_time_iso=(now + timedelta(days=30)).isoformat(),
+        outcomes=["YES", "NO"],
+        initial_prob=0.5,
+        validation={
+            "is_valid": True,
+            "confidence": 0.7,
+            "reasoning": "",
+            "yes_probability": 0.5,
+            "no_probability": 0.5,
+            "reliable_sources": [],
+            "resolution_date": (now + timedelta(days=31)).isoformat(),
+        },
+        created_at=now.isoformat(),
+        status="active",
+    )
+
+
+def resolution(resolver, market_id: str, outcome: str):
+    return resolver.ResolutionResult(
+        market_id=market_id,
+        outcome=outcome,
+        confidence=0.9,
+        reasoning="",
+        evidence_sources=[],
+        resolved_at=datetime.now().isoformat(),
+        auto_expired=False,
+    )
+
+
+def assert_revalidates(client, path, write):
+    """A matching If-None-Match gets 304 until write() commits, then a new body and ETag"""
+    first = client.get(path)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    # Answered from the cache on the second request
+    for _ in range(2):
+        not_modified = client.get(path, headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.headers["etag"] == etag
+        assert not_modified.content == b""
+    assert client.get(path, headers={"If-None-Match": f'"stale", W/{etag}'}).status_code == 304
+
+    write()
+    changed = client.get(path, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+@pytest.mark.parametrize("path", ["/markets", "/markets/active", "/markets/a"])
+def test_generator_reads_revalidate(generator, db, path):
+    generator.save_market_to_db(db, market_data(generator, "a", "First"))
+
+    assert_revalidates(
+        TestClient(generator.app), path,
+        lambda: generator.save_market_to_db(db, market_data(generator, "a", "Second")),
+    )
+
+
+@pytest.mark.parametrize("path", ["/resolutions", "/resolutions/a", "/resolutions/a/outcome"])
+def test_resolver_reads_revalidate(resolver, db, path):
+    resolver.save_resolutions_to_db(db, [resolution(resolver, "a", "INSUFFICIENT_EVIDENCE")])
+
+    assert_revalidates(
+        TestClient(resolver.app), path,
+        lambda: resolver.save_resolutions_to_db(db, [resolution(resolver, "a", "YES")]),
+    )
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests for the bulk market import endpoint (POST /markets/import)
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+import auth
+from database import Market, MarketArchive, insert_missing, upsert
+
+ADMIN_KEY = "test-admin-key"
+
+
+@pytest.fixture
+def generator(db, monkeypatch):
+    from generator import server
+    monkeypatch.setattr(auth, "ADMIN_API_KEY", ADMIN_KEY)
+    return server
+
+
+@pytest.fixture
+def client(generator):
+    return TestClient(generator.app)
+
+
+def market_json(market_id: str, **overrides):
+    now = datetime.now()
+    market = {
+        "id": market_id,
+        "title": f"Market {market_id}",
+        "description": "Imported market",
+        "prompt": f"Will {market_id} happen?",
+        "close_time_iso": (now + timedelta(days=30)).isoformat(),
+        "initial_prob": 0.4,
+        "validation": {
+            "is_valid": True,
+            "confidence": 0.9,
+            "reasoning": "Vetted by partner",
+            "yes_probability": 0.4,
+            "no_probability": 0.6,
+            "reliable_sources": ["example.com"],
+            "resolution_date": (now + timedelta(days=31)).isoformat(),
+        },
+        "created_at": now.isoformat(),
+    }
+    market.update(overrides)
+    return market
+
+
+def post_import(client, markets):
+    return client.post("/markets/import", params={"deploy": False}, json=markets, headers={"X-API-Key": ADMIN_KEY})
+
+
+@pytest.mark.parametrize("field", ["close_time_iso", "created_at"])
+def test_import_rejects_non_iso_timestamps(client, db, field):
+    response = post_import(client, [market_json("bad", **{field: "next tuesday"})])
+
+    assert response.status_code == 422
+    assert db.get(Market, "bad") is None
+
+
+def test_stored_markets_with_legacy_timestamps_still_read(generator, client, db):
+    legacy = market_json("legacy", created_at="June 1st", close_time_iso="soon")
+    legacy["outcomes"] = ["YES", "NO"]
+    legacy["status"] = "active"
+    upsert(db, Market, [legacy])
+    db.commit()
+
+    assert "legacy" in generator.load_markets_from_db(db)
+    assert client.get("/markets/legacy").status_code == 200
+    assert [market["id"] for market in client.get("/markets").json()["markets"]] == ["legacy"]
+
+
+def stored_row(market_id: str, title: str):
+    market = market_json(market_id, title=title)
+    market["outcomes"] = ["YES", "NO"]
+    market["status"] = "active"
+    return market
+
+
+def test_insert_missing_skips_existing_rows(db):
+    upsert(db, Market, [stored_row("taken", "Original")])
+    db.commit()
+
+    inserted = insert_missing(db, Market, [stored_row("taken", "Overwrite"), stored_row("new", "New")])
+    db.commit()
+
+    assert inserted == ["new"]
+    assert db.get(Market, "taken").title == "Original"
+    assert db.get(Market, "new").close_time is not None
+
+
+def test_import_inserts_then_skips_resent_and_archived_markets(client, db):
+    upsert(db, MarketArchive, [stored_row("archived", "Archived")])
+    db.commit()
+    markets = [market_json("a"), market_json("b"), market_json("archived", title="Reused id")]
+
+    first = post_import(client, markets)
+    assert first.status_code == 200
+    assert (first.json()["imported"], first.json()["skipped"]) == (2, 1)
+
+    markets[0]["title"] = "Changed on resend"
+    again = post_import(client, markets)
+    assert (again.json()["imported"], again.json()["skipped"]) == (0, 3)
+    assert db.get(Market, "a").title == "Market a"
+    assert db.get(Market, "archived") is None
+    assert db.get(MarketArchive, "archived").title == "Archived"
+
+
+def test_import_rejects_duplicate_ids_in_one_batch(client, db):
+    response = post_import(client, [market_json("a"), market_json("b"), market_json("a", title="Again")])
+
+    assert response.status_code == 400
+    assert db.get(Market, "a") is None
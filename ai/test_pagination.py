@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests for keyset pagination of the market and resolution listings
+
+Rows share timestamps on purpose: the (time, id) cursor must page through
+ties, and through rows from the hot and archive tables merged, without
+repeating or skipping any.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from database import Market, MarketArchive, Resolution, ResolutionArchive, upsert
+from response_cache import response_cache
+
+CREATED_AT = "2026-03-01T12:00:00"
+
+
+@pytest.fixture
+def generator(db):
+    from generator import server
+    response_cache.clear()
+    return server
+
+
+@pytest.fixture
+def resolver(db):
+    from resolver import server
+    response_cache.clear()
+    return server
+
+
+def market_row(market_id: str, status: str = "active", created_at: str = CREATED_AT):
+    return {
+        "id": market_id,
+        "title": f"Market {market_id}",
+        "description": "",
+        "prompt": "",
+        "close_time_iso": "2030-01-01T00:00:00",
+        "outcomes": ["YES", "NO"],
+        "initial_prob": 0.5,
+        "validation": {"confidence": 0.7},
+        "created_at": created_at,
+        "status": status,
+    }
+
+
+def resolution_row(market_id: str, resolved_at: str = CREATED_AT):
+    return {
+        "id": market_id,
+        "market_id": market_id,
+        "outcome": "YES",
+        "confidence": 0.9,
+        "reasoning": "",
+        "evidence_sources": [],
+        "resolved_at": resolved_at,
+        "auto_expired": False,
+    }
+
+
+def page_through(client, path: str, key: str, limit: int, id_field: str = "id"):
+    """Ids of every row in a listing, following next_cursor to the end"""
+    ids, params = [], {"limit": limit}
+    while True:
+        page = client.get(path, params=params).json()
+        assert len(page[key]) <= limit
+        ids.extend(row[id_field] for row in page[key])
+        if page["next_cursor"] is None:
+            return ids
+        params = {"limit": limit, "cursor": page["next_cursor"]}
+
+
+@pytest.fixture
+def markets(db):
+    """Hot and archived markets, all created in the same second, plus legacy rows"""
+    hot = [f"hot-{i:02d}" for i in range(20)]
+    archived = [f"old-{i:02d}" for i in range(15)]
+    legacy = [f"legacy-{i}" for i in range(3)]
+    upsert(db, Market, [market_row(market_id) for market_id in hot])
+    upsert(db, Market, [market_row(market_id, created_at="unknown") for market_id in legacy])
+    upsert(db, MarketArchive, [market_row(market_id, status="resolved") for market_id in archived])
+    db.commit()
+    return hot, archived, legacy
+
+
+@pytest.mark.parametrize("limit", [1, 7, 20, 100])
+def test_market_listing_pages_through_ties_across_tables(generator, markets, limit):
+    hot, archived, legacy = markets
+
+    ids = page_through(TestClient(generator.app), "/markets", "markets", limit)
+
+    # Unparseable creation times sort first, then ties by id across both tables
+    assert ids == sorted(legacy) + sorted(hot + archived)
+
+
+def test_active_and_archived_listings_page_through_ties(generator, markets):
+    hot, archived, legacy = markets
+    client = TestClient(generator.app)
+
+    assert page_through(client, "/markets/active", "markets", 6) == sorted(legacy) + sorted(hot)
+    assert page_through(client, "/markets/archived", "markets", 4) == sorted(archived)
+
+
+def test_resolution_listing_pages_through_ties_across_tables(resolver, db):
+    upsert(db, Resolution, [resolution_row(f"r-{i:02d}") for i in range(0, 30, 2)])
+    upsert(db, ResolutionArchive, [resolution_row(f"r-{i:02d}") for i in range(1, 30, 2)])
+    upsert(db, Resolution, [resolution_row("legacy", resolved_at="yesterday")])
+    db.commit()
+
+    ids = page_through(TestClient(resolver.app), "/resolutions", "resolutions", 4, "market_id")
+
+    assert ids == ["legacy"] + [f"r-{i:02d}" for i in range(30)]
+
+
+def test_malformed_cursor_is_rejected(generator):
+    assert TestClient(generator.app).get("/markets", params={"cursor": "not-a-cursor"}).status_code == 400
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Tests for the local pricing index (chain_reader.PricingIndex) and the
+/markets/{id}/quote endpoint that reads it
+
+The chain is a dict of markets answered by a ChainStateReader whose
+aggregate3 call is replaced, so the tests can count round trips.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from eth_abi import encode
+from fastapi.testclient import TestClient
+from web3 import Web3
+
+from bonding_curve import MarketState, probabilities_to_prices, quote_mint
+from chain_reader import (
+    GET_MARKET_OUTPUT_TYPES, GET_MARKET_SELECTOR, TOTAL_SUPPLY_SELECTOR, ChainStateReader, PricingIndex, chain_market_id
+)
+from database import Market, upsert
+
+PMW_ADDRESS = "0x" + "22" * 20
+
+
+class StubEth:
+    def contract(self, address, abi):
+        return None
+
+
+class StubWeb3:
+    eth = StubEth()
+
+
+class FakeChainReader(ChainStateReader):
+    """ChainStateReader over an in-memory chain: market_id -> (MarketState, outcome)"""
+
+    def __init__(self, markets):
+        super().__init__(StubWeb3(), PMW_ADDRESS)
+        self.markets = markets
+        self.round_trips = 0
+
+    def tokens(self, market_id):
+        index = sorted(self.markets).index(market_id)
+        return (
+            Web3.to_checksum_address("0x" + f"{2 * index + 1:040x}"),
+            Web3.to_checksum_address("0x" + f"{2 * index + 2:040x}"),
+        )
+
+    def _aggregate(self, calls):
+        self.round_trips += 1
+        by_chain_id = {chain_market_id(market_id): market_id for market_id in self.markets}
+        supplies = {}
+        for market_id, (state, outcome) in self.markets.items():
+            yes_token, no_token = self.tokens(market_id)
+            supplies[yes_token] = state.yes_supply
+            supplies[no_token] = state.no_supply
+
+        results = []
+        for target, calldata in calls:
+            if calldata[:4] == GET_MARKET_SELECTOR:
+                market_id = by_chain_id.get(calldata[4:])
+                if market_id is None:
+                    results.append((True, encode(GET_MARKET_OUTPUT_TYPES, [b"\x00" * 32, "0x" + "00" * 20, "0x" + "00" * 20, 0, 0, "0x" + "00" * 20, 0])))
+                    continue
+                state, outcome = self.markets[market_id]
+                yes_token, no_token = self.tokens(market_id)
+                results.append((True, encode(GET_MARKET_OUTPUT_TYPES, [
+                    b"\x01" * 32, yes_token, no_token, state.yes_price, state.no_price, PMW_ADDRESS, outcome
+                ])))
+            else:
+                assert calldata == TOTAL_SUPPLY_SELECTOR
+                results.append((True, encode(["uint256"], [supplies[target]])))
+        return results
+
+
+LIVE = MarketState(yes_price=6 * 10**17, no_price=4 * 10**17, yes_supply=10**20, no_supply=5 * 10**19)
+
+
+def test_refresh_batches_known_markets_into_one_round_trip():
+    reader = FakeChainReader({"a": (LIVE, 2), "b": (LIVE._replace(yes_supply=7), 2)})
+    index = PricingIndex(reader)
+
+    index.refresh(["a", "b", "undeployed"])
+    assert reader.round_trips == 2  # getMarket to learn the token addresses, then prices and supplies
+    assert index.get("a").state == LIVE
+    assert index.get("b").state.yes_supply == 7
+    assert index.get("undeployed").state is None
+
+    reader.markets["a"] = (LIVE._replace(yes_supply=LIVE.yes_supply + 1), 2)
+    reader.round_trips = 0
+    index.refresh(["a", "b"])
+    assert reader.round_trips == 1
+    assert index.get("a").state.yes_supply == LIVE.yes_supply + 1
+
+
+def test_sync_forgets_markets_that_are_no_longer_active():
+    index = PricingIndex(FakeChainReader({"a": (LIVE, 2), "b": (LIVE, 2)}))
+    index.refresh(["a", "b"])
+    index.sync(["a"])
+
+    assert index.get("a") is not None
+    assert index.get("b") is None
+
+
+@pytest.fixture
+def generator(db):
+    from generator import server
+    return server
+
+
+def market_row(market_id: str, status: str = "active"):
+    now = datetime.now()
+    return {
+        "id": market_id,
+        "title": market_id,
+        "description": "",
+        "prompt": "",
+        "close_time_iso": (now + timedelta(days=30)).isoformat(),
+        "outcomes": ["YES", "NO"],
+        "initial_prob": 0.45,
+        "validation": {"yes_probability": 0.45, "no_probability": 0.55},
+        "created_at": now.isoformat(),
+        "status": status,
+    }
+
+
+@pytest.fixture
+def chain(generator, db, monkeypatch):
+    """A fake chain and a pricing index over it, installed in the generator"""
+    upsert(db, Market, [market_row(market_id) for market_id in ("live", "resolved", "zero", "undeployed")])
+    db.commit()
+    reader = FakeChainReader({
+        "live": (LIVE, 2),
+        "resolved": (LIVE, 1),
+        "zero": (LIVE._replace(yes_price=0, no_price=10**18), 2),
+    })
+    index = PricingIndex(reader)
+    monkeypatch.setattr(generator, "get_pricing_index", lambda: index)
+    return reader, index
+
+
+def quote(generator, market_id, amount=10**18, outcome="YES"):
+    return TestClient(generator.app).get(f"/markets/{market_id}/quote", params={"amount": amount, "outcome": outcome})
+
+
+def test_quote_reads_the_index_without_round_trips(generator, chain):
+    reader, index = chain
+    index.sync(["live", "resolved", "zero", "undeployed"])
+    reader.round_trips = 0
+
+    response = quote(generator, "live")
+
+    assert response.status_code == 200
+    assert response.json()["tokens"] == str(quote_mint(LIVE, 10**18, True).tokens)
+    assert reader.round_trips == 0
+
+
+def test_quote_indexes_unseen_markets_on_the_spot(generator, chain):
+    reader, index = chain
+
+    assert quote(generator, "live").status_code == 200
+    assert index.get("live").state == LIVE
+    # Not on chain yet: quoted from the exact prices it will be created with
+    response = quote(generator, "undeployed", outcome="NO")
+    assert response.status_code == 200
+    assert response.json()["no_price_before"] == str(probabilities_to_prices(0.45, 0.55).no_price)
+
+
+@pytest.mark.parametrize("market_id", ["resolved", "zero"])
+def test_quote_conflicts_for_unpriceable_markets(generator, chain, market_id):
+    assert quote(generator, market_id).status_code == 409
+
+
+def test_quote_is_unavailable_when_the_chain_cannot_be_read(generator, chain, monkeypatch):
+    reader, index = chain
+
+    def fail(calls):
+        raise ConnectionError("RPC down")
+
+    monkeypatch.setattr(reader, "_aggregate", fail)
+    assert quote(generator, "live").status_code == 503
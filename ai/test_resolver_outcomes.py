@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for the resolver's FDC-facing outcome endpoint and its final-outcome cache
+"""
+
+import time
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+from database import Resolution
+from response_cache import ResponseCache, response_cache
+
+
+@pytest.fixture
+def resolver(db, monkeypatch):
+    from resolver import server
+    monkeypatch.setattr(server, "final_outcomes", ResponseCache(ttl=0.2, max_entries=2))
+    response_cache.clear()
+    return server
+
+
+@pytest.fixture
+def client(resolver):
+    return TestClient(resolver.app)
+
+
+def resolution(resolver, market_id: str, outcome: str):
+    return resolver.ResolutionResult(
+        market_id=market_id,
+        outcome=outcome,
+        confidence=0.9,
+        reasoning="",
+        evidence_sources=[],
+        resolved_at=datetime.now().isoformat(),
+        auto_expired=False,
+    )
+
+
+def outcome(client, market_id: str):
+    response = client.get(f"/resolutions/{market_id}/outcome")
+    return response.json()["outcome"] if response.status_code == 200 else response.status_code
+
+
+def test_final_outcome_is_cached_on_commit(resolver, client, db):
+    resolver.save_resolutions_to_db(db, [resolution(resolver, "m1", "YES")])
+
+    assert resolver.final_outcomes.get("m1") is not None
+    assert outcome(client, "m1") == 1
+
+    # Re-resolution in this process replaces the entry on commit
+    resolver.save_resolutions_to_db(db, [resolution(resolver, "m1", "INSUFFICIENT_EVIDENCE")])
+    assert resolver.final_outcomes.get("m1") is None
+    assert outcome(client, "m1") == 2
+
+
+def test_change_by_another_process_is_seen_after_ttl(resolver, client, db):
+    resolver.save_resolutions_to_db(db, [resolution(resolver, "m1", "YES")])
+    assert outcome(client, "m1") == 1
+
+    # Written without this process's session hooks, as another worker would
+    db.execute(update(Resolution).where(Resolution.id == "m1").values(outcome="NO"))
+    db.commit()
+    assert outcome(client, "m1") == 1
+
+    time.sleep(0.3)
+    assert outcome(client, "m1") == 0
+
+
+def test_final_outcomes_are_bounded(resolver, client, db):
+    resolver.save_resolutions_to_db(db, [resolution(resolver, f"m{i}", "NO") for i in range(5)])
+
+    assert [resolver.final_outcomes.get(f"m{i}") is not None for i in range(5)] == [False, False, False, True, True]
+    # Evicted entries are read back from the database
+    assert outcome(client, "m0") == 0
+    assert resolver.final_outcomes.get("m0") is not None
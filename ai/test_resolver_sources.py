@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Tests for the resolver's market sources
+
+Both sources are driven the way the async endpoints drive them: with an
+AsyncSession inside a running event loop.
+"""
+
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.pool import NullPool
+
+from fastapi.testclient import TestClient
+
+from database import Market, MarketArchive, Resolution, ResolutionArchive, engine, new_async_engine, upsert
+
+
+@pytest.fixture
+def resolver(db):
+    from resolver import server
+    return server
+
+
+def run_with_session(source_call):
+    """Run source_call(session) on a fresh event loop; returns (loop thread id, result)"""
+    async def run():
+        engine = new_async_engine(poolclass=NullPool)
+        try:
+            async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+                return threading.get_ident(), await source_call(session)
+        finally:
+            await engine.dispose()
+    return asyncio.run(run())
+
+
+def market_data(resolver, market_id: str, close_in_days: int = 1):
+    return resolver.MarketData(
+        id=market_id,
+        title=f"Market {market_id}",
+        description="",
+        prompt="",
+        close_time_iso=(datetime.now() + timedelta(days=close_in_days)).isoformat(),
+        outcomes=["YES", "NO"],
+        initial_prob=0.5,
+        validation={"confidence": 0.5},
+        created_at=datetime.now().isoformat(),
+        status="active",
+    )
+
+
+def market_row(market_id: str, close_in_days: int, confidence: float = 0.5):
+    now = datetime.now()
+    return {
+        "id": market_id,
+        "title": f"Market {market_id}",
+        "description": "",
+        "prompt": "",
+        "close_time_iso": (now + timedelta(days=close_in_days)).isoformat(),
+        "outcomes": ["YES", "NO"],
+        "initial_prob": 0.5,
+        "validation": {"confidence": confidence},
+        "created_at": now.isoformat(),
+        "status": "active",
+    }
+
+
+def resolution_row(market_id: str):
+    return {
+        "id": market_id,
+        "market_id": market_id,
+        "outcome": "NO",
+        "confidence": 1.0,
+        "reasoning": "",
+        "evidence_sources": [],
+        "resolved_at": datetime.now().isoformat(),
+        "auto_expired": True,
+    }
+
+
+def test_database_source_due_markets(resolver, db):
+    upsert(db, Market, [
+        market_row("closing", close_in_days=1),
+        market_row("closed", close_in_days=-30),
+        market_row("confident", close_in_days=90, confidence=0.95),
+        market_row("later", close_in_days=90),
+        market_row("resolved", close_in_days=-30),
+        market_row("archived", close_in_days=1, confidence=0.95),
+    ])
+    upsert(db, Resolution, [resolution_row("resolved")])
+    upsert(db, ResolutionArchive, [resolution_row("archived")])
+    db.commit()
+
+    loop_thread, due = run_with_session(resolver.DatabaseMarketSource().get_due_markets)
+
+    assert sorted(due) == ["closed", "closing", "confident"]
+    assert due["confident"].validation == {"confidence": 0.95}
+
+
+def test_database_source_finds_archived_markets(resolver, db):
+    upsert(db, MarketArchive, [market_row("archived", close_in_days=-60)])
+    upsert(db, ResolutionArchive, [resolution_row("archived")])
+    db.commit()
+
+    loop_thread, market = run_with_session(lambda session: resolver.DatabaseMarketSource().get_market(session, "archived"))
+    assert market.id == "archived"
+
+    response = TestClient(resolver.app).post("/resolve", json={"market_id": "archived"})
+    assert response.json()["success"] is True
+    assert response.json()["resolution"]["outcome"] == "NO"
+
+
+def test_due_markets_query_uses_index_ranges(resolver):
+    statement = resolver.DatabaseMarketSource.due_markets_statement()
+    sql = str(statement.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        plan = [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+    assert not any(line.startswith("SCAN markets") for line in plan), plan
+    assert any("ix_markets_close_time (close_time<?)" in line for line in plan), plan
+    assert any("ix_markets_confidence (confidence>?)" in line for line in plan), plan
+
+
+def test_http_source_crawls_generator_off_the_event_loop(resolver, monkeypatch):
+    crawl_threads = []
+    markets = {"due": market_data(resolver, "due"), "later": market_data(resolver, "later", close_in_days=90)}
+
+    def get_markets_from_generator():
+        crawl_threads.append(threading.get_ident())
+        return markets
+
+    monkeypatch.setattr(resolver, "get_markets_from_generator", get_markets_from_generator)
+    loop_thread, due = run_with_session(resolver.HttpMarketSource().get_due_markets)
+
+    assert list(due) == ["due"]
+    assert crawl_threads and crawl_threads[0] != loop_thread
+
+
+def test_asi_requests_run_off_the_event_loop(resolver, monkeypatch):
+    post_threads = []
+
+    class ErrorResponse:
+        status_code = 500
+
+    def post(*args, **kwargs):
+        post_threads.append(threading.get_ident())
+        return ErrorResponse()
+
+    monkeypatch.setattr(resolver.requests, "post", post)
+    market = market_data(resolver, "m")
+
+    async def run():
+        evidence = await resolver.search_for_evidence(market)
+        resolution = await resolver.analyze_outcome(market, evidence)
+        return threading.get_ident(), evidence, resolution
+
+    loop_thread, evidence, resolution = asyncio.run(run())
+
+    assert evidence == []
+    assert resolution.outcome == "INSUFFICIENT_EVIDENCE"
+    assert len(post_threads) == 2
+    assert loop_thread not in post_threads
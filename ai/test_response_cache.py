@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests for the versioned response cache and its invalidation on commit
+"""
+
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+from database import Market
+from response_cache import ResponseCache, response_cache
+
+
+def test_bumped_tags_invalidate_entries():
+    cache = ResponseCache(ttl=60, max_entries=10)
+    versions = cache.versions(["markets", "market:a"])
+    cache.set(("a",), versions, b"{}", '"a"')
+    cache.set(("all",), cache.versions(["markets"]), b"[]", '"all"')
+
+    cache.bump(["market:a"])
+
+    assert cache.get(("a",)) is None
+    assert cache.get(("all",)) == (b"[]", '"all"')
+
+
+def test_entry_built_before_a_bump_is_never_served():
+    cache = ResponseCache(ttl=60, max_entries=10)
+    versions = cache.versions(["markets"])
+    cache.bump(["markets"])  # a write committed while the response was being built
+    cache.set(("all",), versions, b"[]", '"all"')
+
+    assert cache.get(("all",)) is None
+
+
+def test_entries_expire_and_are_evicted_least_recently_used_first():
+    cache = ResponseCache(ttl=0.1, max_entries=2)
+    for key in ("a", "b"):
+        cache.set((key,), (), b"", key)
+    cache.get(("a",))
+    cache.set(("c",), (), b"", "c")
+
+    assert [cache.get((key,)) is not None for key in ("a", "b", "c")] == [True, False, True]
+    time.sleep(0.2)
+    assert cache.get(("a",)) is None
+
+
+@pytest.fixture
+def generator(db):
+    from generator import server
+    response_cache.clear()
+    return server
+
+
+@pytest.fixture
+def client(generator):
+    return TestClient(generator.app)
+
+
+def market_data(generator, market_id: str, title: str):
+    now = datetime.now()
+    return generator.MarketData(
+        id=market_id,
+        title=title,
+        description="",
+        prompt="",
+        close_time_iso=(now + timedelta(days=30)).isoformat(),
+        outcomes=["YES", "NO"],
+        initial_prob=0.5,
+        validation={
+            "is_valid": True,
+            "confidence": 0.7,
+            "reasoning": "",
+            "yes_probability": 0.5,
+            "no_probability": 0.5,
+            "reliable_sources": [],
+            "resolution_date": (now + timedelta(days=31)).isoformat(),
+        },
+        created_at=now.isoformat(),
+        status="active",
+    )
+
+
+def titles(client):
+    return [market["title"] for market in client.get("/markets").json()["markets"]]
+
+
+def rename_behind_the_cache(db, market_id: str, title: str):
+    """Write without the session's cache hooks, as another process would"""
+    db.execute(update(Market).where(Market.id == market_id).values(title=title))
+    db.commit()
+
+
+def test_committed_save_invalidates_cached_listing(generator, client, db):
+    generator.save_market_to_db(db, market_data(generator, "a", "First"))
+    assert titles(client) == ["First"]
+
+    rename_behind_the_cache(db, "a", "Unseen")
+    assert titles(client) == ["First"]
+
+    generator.save_market_to_db(db, market_data(generator, "a", "Second"))
+    assert titles(client) == ["Second"]
+
+
+def test_rolled_back_save_keeps_cached_listing(generator, client, db):
+    generator.save_market_to_db(db, market_data(generator, "a", "First"))
+    assert titles(client) == ["First"]
+
+    generator.save_market_to_db(db, market_data(generator, "a", "Discarded"), commit=False)
+    db.rollback()
+    rename_behind_the_cache(db, "a", "Unseen")
+
+    # The rollback dropped the pending tags, so the commit above bumped nothing
+    assert titles(client) == ["First"]
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for /markets/search staying in step with the markets it indexes
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from database import Market, engine, upsert
+from response_cache import response_cache
+from search import search_backend
+
+
+@pytest.fixture
+def generator(db):
+    from generator import server
+    if search_backend(db) != "fts5":
+        pytest.skip("SQLite build without FTS5")
+    response_cache.clear()
+    return server
+
+
+@pytest.fixture
+def client(generator):
+    return TestClient(generator.app)
+
+
+def market_row(market_id: str, title: str):
+    return {
+        "id": market_id,
+        "title": title,
+        "description": "",
+        "prompt": "",
+        "close_time_iso": "2030-01-01T00:00:00",
+        "outcomes": ["YES", "NO"],
+        "initial_prob": 0.5,
+        "validation": {"confidence": 0.7},
+        "created_at": "2026-01-01T00:00:00",
+        "status": "active",
+    }
+
+
+def search(client, q: str):
+    # Rows are written with upsert, which does not tag the response cache
+    response_cache.clear()
+    response = client.get("/markets/search", params={"q": q})
+    assert response.status_code == 200
+    return [(market["id"], market["title"]) for market in response.json()["markets"]]
+
+
+def test_search_follows_updates_and_deletes(client, db):
+    upsert(db, Market, [market_row("a", "Bitcoin above 100k"), market_row("b", "Ethereum merge anniversary")])
+    db.commit()
+    assert search(client, "bitcoin") == [("a", "Bitcoin above 100k")]
+
+    upsert(db, Market, [market_row("a", "Solana above 500")])
+    db.commit()
+    assert search(client, "bitcoin") == []
+    assert search(client, "solana") == [("a", "Solana above 500")]
+
+    assert client.delete("/markets/b").status_code == 200
+    assert search(client, "ethereum") == []
+
+
+def test_search_survives_rowid_renumbering(client, db):
+    # VACUUM may renumber markets.rowid (TEXT primary key); do it outright too,
+    # since whether VACUUM does depends on the SQLite build
+    upsert(db, Market, [market_row(f"m{i:02d}", f"Filler {i}") for i in range(20)])
+    upsert(db, Market, [market_row("target", "Unique zeppelin question")])
+    db.commit()
+    for i in range(0, 20, 2):
+        db.delete(db.get(Market, f"m{i:02d}"))
+    db.commit()
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql("VACUUM")
+        conn.exec_driver_sql("UPDATE markets SET rowid = 1000 - rowid")
+
+    assert search(client, "zeppelin") == [("target", "Unique zeppelin question")]
+    assert sorted(market_id for market_id, _ in search(client, "filler")) == [f"m{i:02d}" for i in range(1, 20, 2)]
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Tests for snapshot export and import (snapshot.py and the /snapshot endpoints)
+"""
+
+import gzip
+import io
+from datetime import datetime
+
+import msgpack
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+import auth
+from database import Market, MarketArchive, Resolution, ResolutionArchive, upsert
+from response_cache import response_cache
+from snapshot import SNAPSHOT_FORMAT, SNAPSHOT_VERSION, load_snapshot, snapshot_chunks
+
+ADMIN_KEY = "test-admin-key"
+
+
+def market_row(market_id: str, status: str = "active"):
+    return {
+        "id": market_id,
+        "title": f"Market {market_id}",
+        "description": "",
+        "prompt": "",
+        "close_time_iso": "2030-01-01T00:00:00",
+        "outcomes": ["YES", "NO"],
+        "initial_prob": 0.5,
+        "validation": {"confidence": 0.8, "yes_probability": 0.5, "auto_expire": True, "resolution_date": "2030-01-02T00:00:00"},
+        "created_at": "2026-01-01T00:00:00",
+        "status": status,
+    }
+
+
+def resolution_row(market_id: str):
+    return {
+        "id": market_id,
+        "market_id": market_id,
+        "outcome": "YES",
+        "confidence": 0.9,
+        "reasoning": "",
+        "evidence_sources": [],
+        "resolved_at": "2026-02-01T00:00:00",
+        "auto_expired": False,
+    }
+
+
+def table_rows(db):
+    """Every column of every snapshot table, for comparison"""
+    return {
+        model.__tablename__: [dict(row._mapping) for row in db.execute(select(model.__table__).order_by(model.id))]
+        for model in (Market, MarketArchive, Resolution, ResolutionArchive)
+    }
+
+
+def snapshot_file(*chunks):
+    """A snapshot file holding the given table chunks, as an older exporter might have written"""
+    packer = msgpack.Packer()
+    body = packer.pack({"format": SNAPSHOT_FORMAT, "version": SNAPSHOT_VERSION})
+    body += b"".join(packer.pack(chunk) for chunk in chunks)
+    return io.BytesIO(gzip.compress(body))
+
+
+@pytest.fixture
+def populated(db):
+    upsert(db, Market, [market_row("a"), market_row("b")])
+    upsert(db, MarketArchive, [market_row("old", status="resolved")])
+    upsert(db, Resolution, [resolution_row("a")])
+    upsert(db, ResolutionArchive, [resolution_row("old")])
+    db.commit()
+    return table_rows(db)
+
+
+def test_round_trip_restores_every_column(db, populated):
+    snapshot = io.BytesIO(b"".join(snapshot_chunks(batch_size=1)))
+    upsert(db, Market, [market_row("c")])
+    db.execute(Market.__table__.delete().where(Market.id == "a"))
+    db.commit()
+
+    counts = load_snapshot(snapshot, replace=True)
+
+    db.expire_all()
+    assert counts == {"markets": 2, "markets_archive": 1, "resolutions": 1, "resolutions_archive": 1}
+    assert table_rows(db) == populated
+    market = populated["markets"][0]
+    assert (market["created_time"], market["close_time"], market["confidence"], market["auto_expire"]) == (
+        datetime(2026, 1, 1), datetime(2030, 1, 1), 0.8, True
+    )
+
+
+def test_legacy_snapshot_gets_derived_columns(db):
+    row = market_row("legacy")
+    columns = [name for name in row if name != "validation"] + ["validation", "retired_column"]
+    values = [row[name] for name in columns[:-1]] + [None]
+
+    load_snapshot(snapshot_file({"table": "markets", "columns": columns, "data": [[value] for value in values]}))
+
+    market = db.get(Market, "legacy")
+    assert market.created_time == datetime(2026, 1, 1)
+    assert market.close_time == datetime(2030, 1, 1)
+    assert market.confidence == 0.8
+    assert market.resolution_date == datetime(2030, 1, 2)
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    from generator import server
+    monkeypatch.setattr(auth, "ADMIN_API_KEY", ADMIN_KEY)
+    response_cache.clear()
+    return TestClient(server.app)
+
+
+def test_snapshot_endpoints(client, db, populated):
+    headers = {"X-API-Key": ADMIN_KEY}
+    exported = client.get("/snapshot", headers=headers)
+    assert exported.status_code == 200
+
+    # Existing ids conflict unless replace is set, and nothing is half-loaded
+    assert client.post("/snapshot", content=exported.content, headers=headers).status_code == 409
+    db.execute(Market.__table__.delete())
+    db.commit()
+    assert client.post("/snapshot", content=exported.content, headers=headers).status_code == 409
+    assert db.scalars(select(Market.id)).all() == []
+    response_cache.clear()
+    assert [market["id"] for market in client.get("/markets").json()["markets"]] == ["old"]
+
+    response = client.post("/snapshot", params={"replace": True}, content=exported.content, headers=headers)
+    assert response.status_code == 200
+    assert table_rows(db) == populated
+    # The import bypasses the ORM, so cached listings must not survive it
+    assert len(client.get("/markets").json()["markets"]) == 3
+
+    assert client.post("/snapshot", content=b"not a snapshot", headers=headers).status_code == 400